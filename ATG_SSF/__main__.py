@@ -1,21 +1,55 @@
 from .menu import Menu
+from .pipeline import run_batch, STAGES, ENGINES
+from .helpers.gen_d_algo import MAX_BACKTRACKS, MAX_DECISIONS, TIME_LIMIT
+import argparse
 import sys
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog = "python -m ATG_SSF",
+        description = "ATPG for single stuck-at faults. Interactive menu by default, or headless with --batch.",
+    )
+    parser.add_argument("circuits", nargs = "+", help = "path(s) to circuit file(s) - several only with --batch")
+    parser.add_argument("--debug", default = "false", help = "bool, default false")
+    parser.add_argument("--batch", action = "store_true", help = "run non-interactively and write machine-readable results")
+    parser.add_argument("--stages", default = ",".join(STAGES), help = f"comma separated stages to run (default: {','.join(STAGES)})")
+    parser.add_argument("--vectors", help = "vector file for the simulate stage (default: ATPG vectors)")
+    parser.add_argument("--faults", help = "fault selection file for the simulate stage (default: collapsed fault list)")
+    parser.add_argument("--engine", choices = tuple(ENGINES), default = "dalg", help = "test generation engine (default: dalg)")
+    parser.add_argument("--workers", type = int, default = 1, help = "worker processes for test generation (default: 1)")
+    parser.add_argument("--drop", action = "store_true", help = "drop faults detected by earlier test vectors during test generation")
+    parser.add_argument("--random", action = "store_true", help = "run a random-pattern phase before deterministic test generation")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed for the random-pattern phase (default: 0)")
+    parser.add_argument("--compact", action = "store_true", help = "compact the test set - dynamic during test generation, then static")
+    parser.add_argument("--learn", action = "store_true", help = "run static learning before test generation (D-Algorithm implication)")
+    parser.add_argument("--max-backtracks", type = int, default = MAX_BACKTRACKS, help = f"per-fault backtrack budget (default: {MAX_BACKTRACKS})")
+    parser.add_argument("--max-decisions", type = int, default = MAX_DECISIONS, help = "per-fault decision budget (default: unlimited)")
+    parser.add_argument("--time-limit", type = float, default = TIME_LIMIT, help = "per-fault time budget in seconds (default: unlimited)")
+    parser.add_argument("--retry", type = float, default = 0, help = "retry aborted faults once with budgets scaled by this factor (default: no retry)")
+    parser.add_argument("--no-cache", action = "store_true", help = "always re-parse and re-collapse - skip the on-disk circuit cache")
+    parser.add_argument("--out", help = "output file (JSON) or file prefix (CSV); default stdout")
+    parser.add_argument("--format", choices = ("json", "csv"), default = "json", help = "output format (default: json)")
+    args = parser.parse_args(argv)
+    if not args.batch and len(args.circuits) != 1:
+        parser.error("only one circuit file can be opened interactively - use --batch for several")
+    if args.learn and args.engine == "podem":
+        parser.error("--learn needs --engine dalg - PODEM does no backward implication to apply learned facts to")
+    args.debug = args.debug.lower() == "true"
+    return args
+
 # Program entrypoint
 if __name__ == "__main__":
-    debug = False
-    if len(sys.argv) != 2:
-        if len(sys.argv) == 3 and "--debug" in sys.argv[2]:
-            flag = sys.argv[2].split('=')[1].lower()
-            if flag == 'true':
-                debug = True
-        else:
-            print("Usage: python -m ATG_SSF <path_to_circuit_file> --debug = bool, default false")
-            sys.exit(1)
-        
-    fpath = sys.argv[1]
-    
-    
-    ui = Menu(fpath, debug = debug)
+    args = parse_args(sys.argv[1:])
+
+    if args.batch:
+        stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+        atpg_options = {
+            "drop": args.drop, "random_patterns": args.random, "seed": args.seed, "retry": args.retry, "learn": args.learn,
+            "compact": args.compact,
+            "max_backtracks": args.max_backtracks, "max_decisions": args.max_decisions, "time_limit": args.time_limit,
+        }
+        sys.exit(run_batch(args.circuits, stages, args.vectors, args.faults, args.out, args.format, args.debug, args.workers, atpg_options, args.engine, not args.no_cache))
+
+    ui = Menu(args.circuits[0], debug = args.debug, workers = args.workers, use_cache = not args.no_cache)
     ui.en_features()
     ui.print_menu()
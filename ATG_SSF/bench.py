@@ -0,0 +1,173 @@
+from .helpers.proc_netlist import process_netlist
+from .helpers.fault_collapse import Faults
+from .helpers.parallel_sim import ParallelSim
+from .helpers.fault_sim import FaultSim
+from .helpers.helpers import color as c
+from .pipeline import ENGINES
+from .circuit_gen import random_dag
+from typing import Dict, List, Optional
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# This modular file contains the benchmark / performance-regression suite
+# Each pipeline stage is timed on the bundled benchmarks/ circuits and on larger generated ones, with its
+# peak memory, and the results are saved as a JSON baseline or compared against one with a regression threshold
+#   python -m ATG_SSF.bench --save baseline.json       record a baseline on this machine
+#   python -m ATG_SSF.bench --baseline baseline.json   exit 1 if any stage regressed beyond --threshold
+
+STAGES = ("parse", "collapse", "simulate", "atpg")
+BENCH_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+# Generated circuit sizes (gates) and their PI counts - small enough that a default run takes seconds
+SCALES = {200: 16, 400: 24}
+SIM_VECTORS = 256
+# ATPG as a production run would do it - random phase first, then deterministic search with dropping,
+# under a backtrack budget so hard / redundant faults abort instead of dominating the timings.
+# The search targets a fixed, seeded sample of the collapsed faults, so its cost does not grow with the circuit.
+ATPG_OPTIONS = {"drop": True, "random_patterns": True}
+ENGINE_OPTIONS = {"max_backtracks": 100}
+ATPG_FAULTS = 32
+THRESHOLD = 0.25        # allowed relative slowdown / memory growth per stage
+MIN_DELTA = 0.005       # seconds - time differences below this are noise, never regressions
+
+# Fn for writing a random, levelized circuit of n_gates gates - stands in for larger real netlists
+def scaled_circuit(path: str, n_gates: int, n_pis: int, seed: int = 0):
+    with open(path, "w") as f:
+        random_dag(f, n_gates, n_pis, seed)
+
+# Fn for running every stage once on one circuit - returns the stage timings and peak memory (KiB)
+def run_stages(fname: str, engine: str = "dalg", trace: bool = False) -> Dict[str, Dict[str, float]]:
+    res = {}
+    state = {}
+    def stage(name, fn):
+        if trace:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        res[name] = {"time": elapsed}
+        if trace:
+            res[name]["peak_kb"] = (tracemalloc.get_traced_memory()[1] - base) / 1024
+
+    def parse():
+        state["gates"], state["graph"], state["circuit"] = process_netlist(fname)
+    def collapse():
+        state["faults"] = Faults(state["gates"], state["graph"], circuit = state["circuit"])
+        state["faults"].collapse()
+    def simulate():
+        cc = state["circuit"]
+        rng = random.Random(0)
+        vectors = [[rng.getrandbits(1) for _ in cc.pis] for _ in range(SIM_VECTORS)]
+        ParallelSim(cc).simulate(vectors)
+        FaultSim(cc, state["faults"]).run(vectors)
+    def atpg():
+        eng = ENGINES[engine](state["gates"], state["graph"], state["faults"], circuit = state["circuit"], **ENGINE_OPTIONS)
+        targets = list(eng.faults.targets())
+        if len(targets) > ATPG_FAULTS:
+            targets = sorted(random.Random(0).sample(targets, ATPG_FAULTS))
+        eng.solve(targets = targets, **ATPG_OPTIONS)
+        eng.refine_solutions()
+
+    # Engine progress output would swamp the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, fn in zip(STAGES, (parse, collapse, simulate, atpg)):
+            stage(name, fn)
+    return res
+
+# High level fn for measuring a set of circuits
+def run_suite(circuits: List[str], engine: str = "dalg", repeat: int = 3) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Time each stage as the best of repeat runs, then measure peak memory in one separate traced run
+    (tracing slows Python down, so it never overlaps the timed runs)
+    """
+    results = {}
+    for fname in circuits:
+        name = os.path.basename(fname)
+        runs = [run_stages(fname, engine) for _ in range(repeat)]
+        best = {st: {"time": min(r[st]["time"] for r in runs)} for st in STAGES}
+        tracemalloc.start()
+        try:
+            traced = run_stages(fname, engine, trace = True)
+        finally:
+            tracemalloc.stop()
+        for st in STAGES:
+            best[st]["peak_kb"] = traced[st]["peak_kb"]
+        results[name] = best
+        print(f"{c.OKCYAN}{name:<24}{c.ENDC} " + " | ".join(f"{st} {best[st]['time'] * 1000:9.2f} ms {best[st]['peak_kb']:9.1f} KiB" for st in STAGES))
+    return results
+
+# Fn for comparing results to a baseline - returns the regressions found
+def compare(results: Dict[str, Dict[str, Dict[str, float]]], baseline: Dict[str, Dict[str, Dict[str, float]]],
+            threshold: float = THRESHOLD) -> List[str]:
+    regressions = []
+    for name, stages in results.items():
+        if name not in baseline:
+            continue # new circuit - nothing to compare against
+        for st, cur in stages.items():
+            ref = baseline[name].get(st)
+            if ref is None:
+                continue
+            if cur["time"] > ref["time"] * (1 + threshold) and cur["time"] - ref["time"] > MIN_DELTA:
+                regressions.append(f"{name} {st}: time {ref['time'] * 1000:.2f} ms -> {cur['time'] * 1000:.2f} ms")
+            if cur["peak_kb"] > ref["peak_kb"] * (1 + threshold) and cur["peak_kb"] - ref["peak_kb"] > 64:
+                regressions.append(f"{name} {st}: peak memory {ref['peak_kb']:.1f} KiB -> {cur['peak_kb']:.1f} KiB")
+    return regressions
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog = "python -m ATG_SSF.bench",
+        description = "Time each pipeline stage on benchmarks/ and generated circuits, and check for regressions.",
+    )
+    parser.add_argument("--baseline", help = "baseline JSON to compare against - exit 1 on any regression")
+    parser.add_argument("--save", help = "write the results as a new baseline JSON")
+    parser.add_argument("--threshold", type = float, default = THRESHOLD, help = f"allowed relative regression (default: {THRESHOLD})")
+    parser.add_argument("--repeat", type = int, default = 3, help = "timed runs per circuit, best is kept (default: 3)")
+    parser.add_argument("--scales", default = ",".join(map(str, SCALES)), help = "generated circuit sizes in gates, comma separated ('' for none)")
+    parser.add_argument("--engine", choices = tuple(ENGINES), default = "dalg", help = "test generation engine (default: dalg)")
+    parser.add_argument("circuits", nargs = "*", help = "extra circuit files to include")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        # Engines differ by orders of magnitude on the ATPG stage - timings only compare within one engine
+        if baseline.get("engine") != args.engine:
+            print(f"{c.FAIL}Baseline '{args.baseline}' was recorded with --engine {baseline.get('engine')}, not {args.engine}.{c.ENDC}")
+            return 1
+    circuits = sorted(glob.glob(os.path.join(BENCH_DIR, "*"))) + args.circuits
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.scales.split(",") if s.strip()):
+            path = os.path.join(tmp, f"scaled_{size}.ckt")
+            scaled_circuit(path, size, SCALES.get(size, max(8, size // 32)))
+            circuits.append(path)
+        results = run_suite(circuits, args.engine, args.repeat)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"engine": args.engine, "python": sys.version.split()[0], "circuits": results}, f, indent = 2)
+        print(f"{c.OKGREEN}Baseline written to '{args.save}'.{c.ENDC}")
+    if baseline is not None:
+        regressions = compare(results, baseline["circuits"], args.threshold)
+        if regressions:
+            print(f"{c.FAIL}{c.BOLD}{len(regressions)} regression(s) beyond {100 * args.threshold:.0f}%:{c.ENDC}")
+            for r in regressions:
+                print(f"{c.FAIL}\t{r}{c.ENDC}")
+            return 1
+        print(f"{c.OKGREEN}No regressions beyond {100 * args.threshold:.0f}%.{c.ENDC}")
+    return 0
+
+# Program entrypoint
+if __name__ == "__main__":
+    sys.exit(main())
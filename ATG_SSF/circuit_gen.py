@@ -0,0 +1,228 @@
+from typing import List, Optional, TextIO
+import argparse
+import random
+import sys
+
+# This modular file contains the parameterized circuit generator used for scale testing
+# It writes netlists in the .ckt format decomp_file parses ('{Output} {Type} {Input1} {Input2} ...', '$' comments),
+# one gate per line as it goes, so million-gate circuits never have to be held in memory.
+# Only the supported gate types are used (AND, NAND, OR, NOR, XOR, two or more inputs) - inversion is built from them.
+
+class NetlistWriter:
+    """
+    Streams gate lines to a text file. PIs are named i0, i1, ..., gates n0, n1, ...
+    """
+    def __init__(self, out: TextIO, title: str):
+        self.out = out
+        self.gates = 0
+        out.write(f"$ {title}\n$ generated by ATG_SSF.circuit_gen\n")
+
+    def inputs(self, prefix: str, count: int) -> List[str]:
+        names = [f"{prefix}{k}" for k in range(count)]
+        self.out.write(f"$ primary inputs: {' '.join(names)}\n")
+        return names
+
+    def outputs(self, names: List[str]):
+        """
+        Record the function's outputs, least significant first - decomp_file makes every unused net a PO anyway
+        """
+        self.out.write(f"$ primary outputs: {' '.join(names)}\n")
+
+    def gate(self, gtype: str, *ins: str) -> str:
+        name = f"n{self.gates}"
+        self.gates += 1
+        self.out.write(f"{name} {gtype} {' '.join(ins)}\n")
+        return name
+
+    def tree(self, gtype: str, ins: List[str], fanin: int = 2) -> str:
+        """
+        Balanced tree of gtype gates over ins, at most fanin inputs per gate
+        """
+        while len(ins) > 1:
+            ins = [self.gate(gtype, *ins[k:k + fanin]) if len(ins[k:k + fanin]) > 1 else ins[k] for k in range(0, len(ins), fanin)]
+        return ins[0]
+
+    # --- BUILDING BLOCKS ---
+    def full_adder(self, a: str, b: str, c: str):
+        p = self.gate("xor", a, b)
+        s = self.gate("xor", p, c)
+        cout = self.gate("or", self.gate("and", a, b), self.gate("and", p, c))
+        return s, cout
+
+    def half_adder(self, a: str, b: str):
+        return self.gate("xor", a, b), self.gate("and", a, b)
+
+    def mux2(self, d0: str, d1: str, sel: str) -> str:
+        # d0 ^ (sel & (d0 ^ d1)) - no inverter needed
+        return self.gate("xor", d0, self.gate("and", sel, self.gate("xor", d0, d1)))
+
+# --- CIRCUITS ---
+def ripple_carry_adder(out: TextIO, width: int) -> int:
+    w = NetlistWriter(out, f"{width}-bit ripple-carry adder")
+    a, b = w.inputs("a", width), w.inputs("b", width)
+    carry = w.inputs("cin", 1)[0]
+    sums = []
+    for k in range(width):
+        s, carry = w.full_adder(a[k], b[k], carry)
+        sums.append(s)
+    w.outputs(sums + [carry])
+    return w.gates
+
+def carry_lookahead_adder(out: TextIO, width: int, block: int = 4) -> int:
+    """
+    Blocks of full carry lookahead (every carry from the block's generate / propagate terms), rippling between blocks
+    """
+    w = NetlistWriter(out, f"{width}-bit carry-lookahead adder ({block}-bit blocks)")
+    a, b = w.inputs("a", width), w.inputs("b", width)
+    carry = w.inputs("cin", 1)[0]
+    sums = []
+    for base in range(0, width, block):
+        bits = range(base, min(base + block, width))
+        p = {k: w.gate("xor", a[k], b[k]) for k in bits}
+        g = {k: w.gate("and", a[k], b[k]) for k in bits}
+        c = {base: carry}
+        for k in bits:
+            sums.append(w.gate("xor", p[k], c[k]))
+            # c[k+1] = g[k] | p[k]g[k-1] | ... | p[k]..p[base] cin
+            terms = [g[k]]
+            for j in range(k - 1, base - 1, -1):
+                terms.append(w.gate("and", *[p[m] for m in range(j + 1, k + 1)], g[j]))
+            terms.append(w.gate("and", *[p[m] for m in range(base, k + 1)], carry))
+            c[k + 1] = w.gate("or", *terms)
+        carry = c[bits[-1] + 1]
+    w.outputs(sums + [carry])
+    return w.gates
+
+def array_multiplier(out: TextIO, width: int) -> int:
+    """
+    width x width array multiplier (c6288-style) - AND partial products summed row by row with ripple adders,
+    every input reaching many outputs through heavily reconvergent paths
+    """
+    w = NetlistWriter(out, f"{width}x{width} array multiplier")
+    a, b = w.inputs("a", width), w.inputs("b", width)
+    # Running sum of the rows so far - bit k has weight 2^k
+    acc = [w.gate("and", a[i], b[0]) for i in range(width)]
+    for j in range(1, width):
+        row = [w.gate("and", a[i], b[j]) for i in range(width)]
+        carry = None
+        nxt = acc[:j]
+        for i in range(width):
+            hi = acc[i + j] if i + j < len(acc) else None
+            if hi is None and carry is None:
+                nxt.append(row[i])
+            elif hi is None or carry is None:
+                s, carry = w.half_adder(row[i], hi if hi is not None else carry)
+                nxt.append(s)
+            else:
+                s, carry = w.full_adder(row[i], hi, carry)
+                nxt.append(s)
+        nxt.append(carry)
+        acc = nxt
+    w.outputs(acc)
+    return w.gates
+
+def parity_tree(out: TextIO, inputs: int, fanin: int = 2) -> int:
+    if fanin < 2:
+        raise ValueError("A parity tree needs a gate fanin of at least 2.")
+    w = NetlistWriter(out, f"{inputs}-input parity tree (fanin {fanin})")
+    w.outputs([w.tree("xor", w.inputs("i", inputs), fanin)])
+    return w.gates
+
+def mux_tree(out: TextIO, select: int) -> int:
+    w = NetlistWriter(out, f"{2 ** select}-to-1 multiplexer tree")
+    level = w.inputs("d", 2 ** select)
+    for sel in w.inputs("s", select):
+        level = [w.mux2(level[k], level[k + 1], sel) for k in range(0, len(level), 2)]
+    w.outputs(level)
+    return w.gates
+
+def random_dag(out: TextIO, gates: int, pis: int = 32, seed: int = 0, max_fanin: int = 3,
+               window: int = 16, locality: float = 0.7, max_fanout: Optional[int] = None) -> int:
+    """
+    Seeded random DAG. Each gate draws its inputs from the last window nets with probability locality
+    (deeper circuits for smaller windows), else from every net (long reconvergent paths).
+    max_fanout caps the gates any one net drives.
+    """
+    if pis < 2:
+        raise ValueError("A random DAG needs at least 2 primary inputs.")
+    # Every gate needs two distinct inputs - a one-input line is skipped by decomp_file
+    if max_fanin < 2:
+        raise ValueError("A random DAG needs a max gate fanin of at least 2.")
+    if window < 2:
+        raise ValueError("A random DAG needs a locality window of at least 2 nets.")
+    rng = random.Random(seed)
+    w = NetlistWriter(out, f"random DAG: {gates} gates, {pis} PIs, seed {seed}")
+    nets = w.inputs("i", pis)
+    # With a fanout cap, nets still below it - unordered, removed by swapping with the last entry
+    fanout = {}
+    open_nets = list(nets)
+    open_pos = {n: p for p, n in enumerate(open_nets)}
+    for _ in range(gates):
+        k = rng.randint(2, max_fanin)
+        local = rng.random() < locality
+        if max_fanout is None:
+            pool = nets[-window:] if local else nets
+        else:
+            pool = [n for n in nets[-window:] if fanout.get(n, 0) < max_fanout] if local else []
+            if len(pool) < 2:
+                # Every net at the cap - fall back to the window, which holds at least 2 nets
+                pool = open_nets if len(open_nets) >= 2 else nets[-window:]
+        ins = rng.sample(pool, min(k, len(pool)))
+        name = w.gate(rng.choice(("and", "nand", "or", "nor", "xor")), *ins)
+        nets.append(name)
+        if max_fanout is not None:
+            for n in ins:
+                fanout[n] = fanout.get(n, 0) + 1
+                if fanout[n] == max_fanout and n in open_pos:
+                    p = open_pos.pop(n)
+                    last = open_nets.pop()
+                    if last != n:
+                        open_nets[p] = last
+                        open_pos[last] = p
+            open_pos[name] = len(open_nets)
+            open_nets.append(name)
+    return w.gates
+
+KINDS = ("rca", "cla", "mult", "parity", "mux", "random")
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog = "python -m ATG_SSF.circuit_gen",
+        description = "Write a generated circuit in .ckt format for scale testing.",
+    )
+    parser.add_argument("kind", choices = KINDS, help = "circuit family")
+    parser.add_argument("size", type = int, help = "bit width (rca, cla, mult), inputs (parity), select bits (mux) or gates (random)")
+    parser.add_argument("-o", "--out", help = "output .ckt file (default: stdout)")
+    parser.add_argument("--block", type = int, default = 4, help = "cla: lookahead block width (default: 4)")
+    parser.add_argument("--fanin", type = int, help = "parity: gate fanin / random: max gate fanin (default: 2 for parity, 3 for random)")
+    parser.add_argument("--pis", type = int, default = 32, help = "random: primary inputs (default: 32)")
+    parser.add_argument("--window", type = int, default = 16, help = "random: locality window - smaller is deeper (default: 16)")
+    parser.add_argument("--locality", type = float, default = 0.7, help = "random: chance of drawing inputs from the window (default: 0.7)")
+    parser.add_argument("--max-fanout", type = int, help = "random: cap on gates driven by one net (default: none)")
+    parser.add_argument("--seed", type = int, default = 0, help = "random: seed (default: 0)")
+    args = parser.parse_args(argv)
+    if args.fanin is not None and args.fanin < 2: parser.error("--fanin must be at least 2")
+    if args.window < 2: parser.error("--window must be at least 2")
+    if args.pis < 2: parser.error("--pis must be at least 2")
+    return args
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    out = open(args.out, "w") if args.out else sys.stdout
+    # Explicit --fanin passes through unchanged, only the default depends on the kind
+    if args.fanin is None: args.fanin = 2 if args.kind == "parity" else 3
+    try:
+        if args.kind == "rca": n = ripple_carry_adder(out, args.size)
+        elif args.kind == "cla": n = carry_lookahead_adder(out, args.size, args.block)
+        elif args.kind == "mult": n = array_multiplier(out, args.size)
+        elif args.kind == "parity": n = parity_tree(out, args.size, args.fanin)
+        elif args.kind == "mux": n = mux_tree(out, args.size)
+        else: n = random_dag(out, args.size, args.pis, args.seed, args.fanin, args.window, args.locality, args.max_fanout)
+    finally:
+        if args.out: out.close()
+    print(f"{args.kind}: {n} gates", file = sys.stderr)
+    return 0
+
+# Program entrypoint
+if __name__ == "__main__":
+    sys.exit(main())
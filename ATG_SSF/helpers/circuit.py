@@ -0,0 +1,202 @@
+from .helpers import ControllingInversionVals as ci
+from array import array
+from typing import Dict, List, Optional
+
+# This modular file contains the compiled, integer-indexed form of the circuit shared by every engine
+# Gates are numbered in topological order, gate types are small-int opcodes,
+# and fanin / fanout are stored as flat CSR-style arrays (offsets + one packed index array)
+
+# Define small-int opcodes for all supported gate types
+class Op:
+    """
+    Opcodes for compiled gates - index into NAMES for the netlist type string
+    """
+    PI = 0
+    AND = 1
+    NAND = 2
+    OR = 3
+    NOR = 4
+    XOR = 5
+    NAMES = ("PI", "AND", "NAND", "OR", "NOR", "XOR")
+
+    @staticmethod
+    def from_name(name: str) -> int:
+        try:
+            return Op.NAMES.index(name.upper())
+        except ValueError:
+            raise ValueError(f"Unsupported gate type '{name}'.") from None
+
+class CompiledCircuit:
+    """
+    Integer-indexed circuit. Gate i's inputs are fanin[fanin_ptr[i]:fanin_ptr[i+1]],
+    and the gates it drives are fanout[fanout_ptr[i]:fanout_ptr[i+1]].
+    Every input of gate i has an index lower than i.
+    """
+    def __init__(self, names: List[str], ops: array, levels: array, fanin_ptr: array, fanin: array,
+                 fanout_ptr: Optional[array] = None, fanout: Optional[array] = None):
+        self.names = names
+        self.index = {name: idx for idx, name in enumerate(names)}
+        self.n = len(names)
+        self.ops = ops
+        self.levels = levels
+        self.fanin_ptr = fanin_ptr
+        self.fanin = fanin
+
+        # Controlling / inversion values per gate (-1 for PIs)
+        self.ctrl = array('b', (getattr(ci, Op.NAMES[op]).c if op != Op.PI else -1 for op in ops))
+        self.inv = array('b', (getattr(ci, Op.NAMES[op]).i if op != Op.PI else -1 for op in ops))
+
+        # Fanout CSR - given when loaded from the circuit cache, else built by counting edges, then filling each gate's slot range
+        if fanout_ptr is not None and fanout is not None:
+            self.fanout_ptr = fanout_ptr
+            self.fanout = fanout
+        else:
+            self._build_fanout()
+
+        # Precomputed PI / PO index lists - POs are non-PI gates that drive nothing
+        self.pis = array('i', (g for g in range(self.n) if ops[g] == Op.PI))
+        self.pos = array('i', (
+            g for g in range(self.n)
+            if ops[g] != Op.PI and self.fanout_ptr[g] == self.fanout_ptr[g + 1]
+        ))
+        self.po_mask = bytearray(self.n)
+        for g in self.pos:
+            self.po_mask[g] = 1
+
+    def _build_fanout(self):
+        fanin_ptr, fanin = self.fanin_ptr, self.fanin
+        counts = array('i', bytes(4 * (self.n + 1)))
+        for src in fanin:
+            counts[src + 1] += 1
+        for g in range(self.n):
+            counts[g + 1] += counts[g]
+        self.fanout_ptr = array('i', counts)
+        self.fanout = array('i', bytes(4 * len(fanin)))
+        fill = array('i', counts[:-1])
+        for g in range(self.n):
+            for k in range(fanin_ptr[g], fanin_ptr[g + 1]):
+                src = fanin[k]
+                self.fanout[fill[src]] = g
+                fill[src] += 1
+
+    # --- ACCESSORS ---
+    def fanins(self, g: int) -> array:
+        return self.fanin[self.fanin_ptr[g]:self.fanin_ptr[g + 1]]
+
+    def fanouts(self, g: int) -> array:
+        return self.fanout[self.fanout_ptr[g]:self.fanout_ptr[g + 1]]
+
+    def fanout_count(self, g: int) -> int:
+        return self.fanout_ptr[g + 1] - self.fanout_ptr[g]
+
+    def is_pi(self, g: int) -> bool:
+        return self.ops[g] == Op.PI
+
+    def is_po(self, g: int) -> bool:
+        return self.po_mask[g] == 1
+
+    def type_name(self, g: int) -> str:
+        return Op.NAMES[self.ops[g]]
+
+    def __len__(self):
+        return self.n
+
+    def __str__(self):
+        return f"CompiledCircuit({self.n} gates, {len(self.pis)} PIs, {len(self.pos)} POs, {len(self.fanin)} edges)"
+
+# Logic for converting the leveled "gates" dict into the compiled form
+def compile_circuit(gates: Dict[str, dict]) -> CompiledCircuit:
+    """
+    Compile the gates dict (sorted by level, as returned by decomp_file) into a CompiledCircuit.
+    """
+    names = list(gates.keys())
+    index = {name: idx for idx, name in enumerate(names)}
+    ops = array('B')
+    levels = array('i')
+    fanin_ptr = array('i', [0])
+    fanin = array('i')
+    for idx, (name, info) in enumerate(gates.items()):
+        ops.append(Op.from_name(info["type"]))
+        levels.append(info["level"])
+        for inp in info["inputs"]:
+            src = index[inp]
+            if src >= idx: raise ValueError(f"Gate '{name}' is not in topological order (input '{inp}').")
+            fanin.append(src)
+        fanin_ptr.append(len(fanin))
+    return CompiledCircuit(names, ops, levels, fanin_ptr, fanin)
+
+# Define 5-valued logic (0, 1, D, D', X) over small ints, for the ATPG engines
+class Logic5:
+    """
+    V0 / V1 are fault-free values, D is good 1 / faulty 0, DB (D') is good 0 / faulty 1.
+    SYMBOLS maps each code back to the symbol used in assignments.
+    """
+    V0 = 0
+    V1 = 1
+    D = 2
+    DB = 3
+    X = 4
+    SYMBOLS = (0, 1, 'D', "D'", 'X')
+    CODES = {0: 0, 1: 1, 'D': 2, "D'": 3, 'X': 4}
+    # (good, faulty) pairs, None for unknown
+    PAIRS = ((0, 0), (1, 1), (1, 0), (0, 1), (None, None))
+    NOT = (1, 0, 3, 2, 4)
+
+    @staticmethod
+    def from_pair(g, f) -> int:
+        if g is None or f is None:
+            return Logic5.X
+        return Logic5.PAIRS.index((g, f))
+
+def _and3(a, b):
+    if a == 0 or b == 0: return 0
+    if a is None or b is None: return None
+    return 1
+
+def _or3(a, b):
+    if a == 1 or b == 1: return 1
+    if a is None or b is None: return None
+    return 0
+
+def _xor3(a, b):
+    if a is None or b is None: return None
+    return a ^ b
+
+# Folding state: a (good, faulty) pair of 3-valued components, so partial knowledge
+# (e.g. good unknown, faulty 0 across an n-input AND) is kept until the end of the fold
+_COMP = (0, 1, None)
+def _state(g, f) -> int:
+    return (2 if g is None else g) * 3 + (2 if f is None else f)
+
+def _table(fn):
+    return tuple(
+        tuple(_state(fn(_COMP[st // 3], gi), fn(_COMP[st % 3], fi)) for (gi, fi) in Logic5.PAIRS)
+        for st in range(9)
+    )
+
+# Fold tables: STATE x 5-valued input -> STATE
+AND5 = _table(_and3)
+OR5 = _table(_or3)
+XOR5 = _table(_xor3)
+_START = tuple(_state(g, f) for (g, f) in Logic5.PAIRS)
+_FINAL = tuple(Logic5.from_pair(_COMP[st // 3], _COMP[st % 3]) for st in range(9))
+# Per opcode: (fold table, invert output)
+OP5 = {
+    Op.AND: (AND5, False),
+    Op.NAND: (AND5, True),
+    Op.OR: (OR5, False),
+    Op.NOR: (OR5, True),
+    Op.XOR: (XOR5, False),
+}
+
+def eval5(op: int, vals) -> int:
+    """
+    Evaluate a gate over 5-valued input codes
+    """
+    table, inv = OP5[op]
+    vals = iter(vals)
+    st = _START[next(vals)]
+    for w in vals:
+        st = table[st][w]
+    v = _FINAL[st]
+    return Logic5.NOT[v] if inv else v
@@ -0,0 +1,174 @@
+from .helpers import Graph, color
+from .circuit import CompiledCircuit, Op
+from .proc_netlist import process_netlist, get_edge_list
+from .fault_collapse import Faults
+from .fault_classes import FaultClasses
+from array import array
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+# This modular file contains the on-disk cache of compiled and collapsed circuits
+# Entries are keyed by a hash of the netlist file contents, so an edited file simply misses and is re-processed.
+# Each entry holds the leveled gate arrays (names, opcodes, levels), the fanin / fanout CSR arrays (the edge list)
+# and the fault classes (union-find parents, dominance flags), as raw machine arrays behind a small JSON header,
+# read back with one copy per section straight from the file into its array.
+
+CACHE_VERSION = 3
+MAGIC = b"ATGC"
+# Cache location - override with the ATG_SSF_CACHE environment variable
+CACHE_DIR = os.environ.get("ATG_SSF_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "ATG_SSF"))
+
+# Fn for hashing a netlist file's contents in chunks - the cache key
+def file_hash(fname: str) -> str:
+    h = hashlib.sha256()
+    with open(fname, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class CircuitCache:
+    def __init__(self, cache_dir: Optional[str] = None, debug: bool = False):
+        self.cache_dir = cache_dir or CACHE_DIR
+        self.debug = debug
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.atgc")
+
+    # --- STORE ---
+    def store(self, key: str, circuit: CompiledCircuit, faults: Faults):
+        """
+        Write one entry atomically (temp file + rename), so readers never see a partial file
+        """
+        names = circuit.names
+        sections = {
+            "names": "\n".join(names).encode("utf-8"),
+            "ops": circuit.ops,
+            "levels": circuit.levels,
+            "fanin_ptr": circuit.fanin_ptr,
+            "fanin": circuit.fanin,
+            "fanout_ptr": circuit.fanout_ptr,
+            "fanout": circuit.fanout,
+            "parent": faults.classes.parent,
+            "dropped": bytes(faults.classes.dropped),
+        }
+        header = {"version": CACHE_VERSION, "byteorder": sys.byteorder, "n": circuit.n, "sections": {}}
+        offset = 0
+        for name, data in sections.items():
+            size = len(data) * data.itemsize if isinstance(data, array) else len(data)
+            header["sections"][name] = [data.typecode if isinstance(data, array) else "bytes", offset, size]
+            offset += size
+        head = json.dumps(header).encode("utf-8")
+
+        os.makedirs(self.cache_dir, exist_ok = True)
+        fd, tmp = tempfile.mkstemp(dir = self.cache_dir, suffix = ".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(MAGIC + len(head).to_bytes(4, "little") + head)
+                for data in sections.values():
+                    f.write(data.tobytes() if isinstance(data, array) else data)
+            os.replace(tmp, self.path(key))
+        except OSError:
+            os.unlink(tmp)
+            raise
+        if self.debug: print(f"Cached '{key}' ({circuit.n} gates)")
+
+    # --- LOAD ---
+    def load(self, key: str, debug: bool = False) -> Optional[Tuple[Dict[str, dict], Graph, CompiledCircuit, Faults]]:
+        """
+        Rebuild gates, graph, compiled circuit and collapsed faults from an entry.
+        The arrays are copied out of the file - the engines mutate and pickle them, so they cannot be views of a mapping.
+        None on a miss - no entry, another cache version / byte order, or an unreadable file.
+        """
+        try:
+            with open(self.path(key), "rb") as f:
+                if f.read(4) != MAGIC:
+                    return None
+                size = int.from_bytes(f.read(4), "little")
+                header = json.loads(f.read(size))
+                if header["version"] != CACHE_VERSION or header["byteorder"] != sys.byteorder:
+                    return None
+                base = 8 + size
+                data = {}
+                # Each section is read straight into its own buffer - one copy, and nothing keeps the file open
+                for name, (typecode, offset, nbytes) in header["sections"].items():
+                    f.seek(base + offset)
+                    if typecode == "bytes":
+                        data[name] = bytearray(nbytes)
+                        if f.readinto(data[name]) != nbytes:
+                            return None
+                    else:
+                        data[name] = array(typecode)
+                        data[name].fromfile(f, nbytes // data[name].itemsize)
+        except (OSError, ValueError, KeyError, EOFError):
+            return None
+
+        names = data["names"].decode("utf-8").split("\n")
+        if len(names) != header["n"]:
+            return None
+        circuit = CompiledCircuit(names, data["ops"], data["levels"], data["fanin_ptr"], data["fanin"],
+                                  data["fanout_ptr"], data["fanout"])
+        # The gates dict, in the same (level, name) order decomp_file returns it
+        ops, levels, ptr, fanin, fo_ptr = circuit.ops, circuit.levels, circuit.fanin_ptr, circuit.fanin, circuit.fanout_ptr
+        gates = {
+            name: {
+                "type": Op.NAMES[ops[g]],
+                "inputs": [names[x] for x in fanin[ptr[g]:ptr[g + 1]]],
+                "level": levels[g],
+                "fanout": fo_ptr[g + 1] - fo_ptr[g],
+            }
+            for g, name in enumerate(names)
+        }
+        graph = Graph(get_edge_list(gates))
+        faults = Faults(gates, graph, debug, circuit = circuit)
+        classes = FaultClasses(circuit, debug = debug, parent = data["parent"], dropped = data["dropped"])
+        if len(classes.parent) != classes.size:
+            return None
+        faults.set_classes(classes)
+        return gates, graph, circuit, faults
+
+    def clear(self) -> int:
+        """
+        Remove every entry. Returns the number removed.
+        """
+        removed = 0
+        if os.path.isdir(self.cache_dir):
+            for entry in os.listdir(self.cache_dir):
+                if entry.endswith(".atgc"):
+                    os.unlink(os.path.join(self.cache_dir, entry))
+                    removed += 1
+        return removed
+
+# High level fn for loading a netlist through the cache - parses and collapses only on a miss
+def load_circuit(fname: str, use_cache: bool = True, cache_dir: Optional[str] = None,
+                 debug: bool = False, collapse: bool = True) -> Tuple[Dict[str, dict], Graph, CompiledCircuit, Faults]:
+    """
+    Returns gates, graph, compiled circuit and the collapsed fault list.
+    collapse=False leaves the fault list of a cache miss uncollapsed (flist is None) - the caller collapses it,
+    then caches it with store_circuit. A cache hit is always collapsed.
+    A cache that cannot be written (read-only home, full disk) only costs the speedup.
+    """
+    key = None
+    if use_cache:
+        key = file_hash(fname)
+        hit = CircuitCache(cache_dir, debug).load(key, debug)
+        if hit is not None:
+            if debug: print(f"Circuit cache hit for '{fname}' ({key[:12]})")
+            return hit
+    gates, graph, circuit = process_netlist(fname)
+    faults = Faults(gates, graph, debug, circuit = circuit)
+    if collapse:
+        faults.collapse()
+        if use_cache: store_circuit(fname, circuit, faults, cache_dir, debug, key)
+    return gates, graph, circuit, faults
+
+# Fn for caching a circuit collapsed outside load_circuit
+def store_circuit(fname: str, circuit: CompiledCircuit, faults: Faults, cache_dir: Optional[str] = None,
+                  debug: bool = False, key: Optional[str] = None):
+    try:
+        CircuitCache(cache_dir, debug).store(key or file_hash(fname), circuit, faults)
+    except OSError as e:
+        print(f"{color.WARNING}Could not write the circuit cache: {e}{color.ENDC}")
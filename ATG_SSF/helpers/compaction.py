@@ -0,0 +1,90 @@
+from .helpers import color
+from .circuit import CompiledCircuit
+from .fault_sim import FaultSim
+from .fault_list import FaultList
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+# This modular file contains static test-set compaction
+# Test cubes (PI values with don't cares) whose specified bits agree are merged into one vector, then
+# reverse-order fault simulation keeps only the vectors that still detect a fault no later vector detects
+
+# A test cube: one entry per PI in circuit PI order - 0, 1, or None for a don't care
+Cube = List[Optional[int]]
+
+class Compactor:
+    def __init__(self, circuit: CompiledCircuit, faults: Union[FaultList, Sequence[Tuple[str, int]]], debug: bool = False):
+        self.circuit = circuit
+        # The shared fault list's targets are simulated by fault id, a list of names by name
+        self.flist = faults if isinstance(faults, FaultList) else None
+        self.faults = list(faults.targets()) if self.flist is not None else list(faults)
+        self.debug = debug
+        # Final vectors, and for each one the faults it is kept for
+        self.vectors: List[List[int]] = []
+        self.detects: List[List[Tuple[str, int]]] = []
+
+    @staticmethod
+    def compatible(a: Cube, b: Cube) -> bool:
+        return all(x is None or y is None or x == y for x, y in zip(a, b))
+
+    @staticmethod
+    def merge(cubes: Sequence[Cube]) -> List[Cube]:
+        """
+        Greedy first-fit merging - most specified cubes first, each into the first merged cube it agrees with
+        """
+        merged: List[Cube] = []
+        for cube in sorted(cubes, key = lambda c: sum(v is None for v in c)):
+            for m in merged:
+                if Compactor.compatible(m, cube):
+                    for p, v in enumerate(cube):
+                        if v is not None: m[p] = v
+                    break
+            else:
+                merged.append(list(cube))
+        return merged
+
+    def simulator(self, faults: List) -> FaultSim:
+        return FaultSim(self.circuit, self.flist, ids = faults) if self.flist is not None else FaultSim(self.circuit, faults)
+
+    def reverse_order(self, vectors: Sequence[Sequence[int]]) -> Dict[int, List]:
+        """
+        Fault simulate the vectors last to first with fault dropping.
+        Returns index (into vectors) -> the faults (ids or names, as given) it detects first, for the vectors that detect any.
+        """
+        words = self.simulator(self.faults).run(list(reversed(vectors)), drop = True)
+        kept: Dict[int, List] = {}
+        for fault, word in zip(self.faults, words):
+            if word:
+                kept.setdefault(len(vectors) - 1 - ((word & -word).bit_length() - 1), []).append(fault)
+        return kept
+
+    def compact(self, cubes: Sequence[Cube]) -> List[List[int]]:
+        """
+        Merge compatible cubes, fill the remaining don't cares with 0, and drop redundant vectors.
+        Every fault the 0-filled input cubes detect is still detected by the result.
+        """
+        originals = [[v or 0 for v in cube] for cube in cubes]
+        merged = self.merge(cubes)
+        vectors = [[v or 0 for v in cube] for cube in merged]
+        # Faults detected only by an original fill (e.g. dropped faults) may be lost by merging - restore them
+        target = set(f for fs in self.reverse_order(originals).values() for f in fs)
+        kept = self.reverse_order(vectors)
+        lost = sorted(target - set(f for fs in kept.values() for f in fs))
+        if lost:
+            words = self.simulator(lost).run(originals)
+            missing = set(range(len(lost)))
+            for p, vec in enumerate(originals):
+                hits = {i for i in missing if words[i] >> p & 1}
+                if hits:
+                    vectors.append(vec)
+                    missing -= hits
+                    if not missing: break
+            kept = self.reverse_order(vectors)
+        name = self.flist.fault if self.flist is not None else (lambda f: f)
+        self.vectors = [vectors[p] for p in sorted(kept)]
+        self.detects = [[name(f) for f in kept[p]] for p in sorted(kept)]
+        if self.debug: print(f"Compaction: {len(cubes)} cubes -> {len(merged)} merged -> {len(self.vectors)} vectors")
+        return self.vectors
+
+    # CLI Styling for the compacted test set
+    def print_summary(self, n_cubes: int):
+        print(f"\n\t{color.OKCYAN}Compaction: {n_cubes} test(s) -> {len(self.vectors)} vector(s).{color.ENDC}")
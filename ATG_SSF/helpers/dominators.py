@@ -0,0 +1,78 @@
+from .circuit import CompiledCircuit, Op
+from typing import List, Optional, Tuple
+
+# This modular file contains the dominator (post-dominator) tree of the circuit, toward its POs
+# A gate dominates a line if every path from the line to any PO passes through it. The tree is built over the
+# fanout adjacency (the Graph edges, as packed in the compiled circuit) with all POs joined to one virtual sink,
+# and gives the gates a fault effect must pass through - their side inputs can be sensitized before any search.
+
+class Dominators:
+    def __init__(self, circuit: CompiledCircuit):
+        self.circuit = circuit
+        n = circuit.n
+        # Virtual sink fed by every PO
+        self.sink = n
+        # Immediate dominator per line - the sink for POs, None for lines that reach no PO
+        self.idom: List[Optional[int]] = [None] * n + [n]
+        self.depth: List[int] = [0] * (n + 1)
+        self.build()
+
+    def build(self):
+        """
+        Gate indices are topological, so walking them in reverse sees every fanout before its driver,
+        and a line's immediate dominator is the common tree ancestor of its fanouts
+        """
+        cc = self.circuit
+        idom, depth = self.idom, self.depth
+        for g in range(cc.n - 1, -1, -1):
+            if cc.is_po(g):
+                dom = self.sink
+            else:
+                dom = None
+                for fo in set(cc.fanouts(g)):
+                    if idom[fo] is None:
+                        continue
+                    dom = fo if dom is None else self._intersect(dom, fo)
+            idom[g] = dom
+            if dom is not None:
+                depth[g] = depth[dom] + 1
+
+    def _intersect(self, a: int, b: int) -> int:
+        idom, depth = self.idom, self.depth
+        while a != b:
+            if depth[a] >= depth[b]:
+                a = idom[a]
+            else:
+                b = idom[b]
+        return a
+
+    def reaches_po(self, g: int) -> bool:
+        return self.idom[g] is not None
+
+    def dominators(self, g: int) -> List[int]:
+        """
+        Gates every path from line g to a PO passes through, nearest first
+        """
+        doms = []
+        d = self.idom[g]
+        while d is not None and d != self.sink:
+            doms.append(d)
+            d = self.idom[d]
+        return doms
+
+    def unique_sensitization(self, site: int, cone: bytearray) -> Optional[List[Tuple[int, int]]]:
+        """
+        Side-input assignments needed to propagate a fault at site through its dominators - every input
+        outside the fault's fanout cone must be non-controlling. None if the fault can never reach a PO.
+        XOR dominators pass the fault effect for any side value, so they add nothing.
+        """
+        cc = self.circuit
+        if not self.reaches_po(site):
+            return None
+        required = []
+        for d in self.dominators(site):
+            if cc.ops[d] == Op.XOR:
+                continue
+            nc = 1 - cc.ctrl[d]
+            required += [(x, nc) for x in cc.fanins(d) if not cone[x]]
+        return required
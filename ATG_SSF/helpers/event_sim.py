@@ -0,0 +1,119 @@
+from .circuit import CompiledCircuit, Op
+from .parallel_sim import eval_gate_word
+from typing import Dict, Iterable, List, Optional
+from heapq import heappush, heappop
+
+# This modular file contains the levelized, event-driven logic simulator
+# It keeps the last simulated state, and re-evaluates only gates whose inputs actually changed,
+# processing them level by level through a fanout event queue
+
+class EventSim:
+    def __init__(self, circuit: CompiledCircuit, debug: bool = False):
+        self.circuit = circuit
+        self.debug = debug
+        self.gate_ins = [tuple(circuit.fanins(g)) for g in range(circuit.n)]
+        # Last simulated state - None until the first full evaluation
+        self.values: Optional[List[int]] = None
+        # PI values applied by the user, independent of faults forcing them
+        self.pi_vals = {pi: 0 for pi in circuit.pis}
+        # Injected stuck-at faults - gate index -> forced value
+        self.forced: Dict[int, int] = {}
+        # Injected fanout-branch faults - gate index -> {input position: value that gate reads}
+        self.forced_ins: Dict[int, Dict[int, int]] = {}
+        # Activity counter - gate evaluations performed by the last apply()
+        self.evaluations = 0
+
+    def full(self) -> List[int]:
+        """
+        Evaluate every gate once in topological order from the current PIs and faults.
+        """
+        cc = self.circuit
+        vals = [0] * cc.n
+        for g in range(cc.n):
+            if g in self.forced:
+                vals[g] = self.forced[g]
+            elif cc.ops[g] == Op.PI:
+                vals[g] = self.pi_vals[g]
+            else:
+                vals[g] = self._eval(g, vals)
+        self.values = vals
+        self.evaluations = cc.n
+        return vals
+
+    def _eval(self, g: int, vals: List[int]) -> int:
+        ins = self.forced_ins.get(g)
+        if ins is None:
+            return eval_gate_word(self.circuit.ops[g], (vals[src] for src in self.gate_ins[g]), 1)
+        return eval_gate_word(self.circuit.ops[g], (ins.get(k, vals[src]) for k, src in enumerate(self.gate_ins[g])), 1)
+
+    def apply(self, pi_changes: Optional[Dict[int, int]] = None, inject: Optional[Dict[int, int]] = None, release: Iterable[int] = (),
+              touched: Iterable[int] = ()) -> List[int]:
+        """
+        Apply a delta of changed PIs, newly injected faults and released faults.
+        touched: gates whose forced inputs (branch faults) changed.
+        Returns the gates whose value changed.
+        """
+        cc = self.circuit
+        release = list(release)
+        if pi_changes: self.pi_vals.update(pi_changes)
+        for g in release: self.forced.pop(g, None)
+        if inject: self.forced.update(inject)
+        if self.values is None:
+            self.full()
+            return list(range(cc.n))
+
+        vals = self.values
+        levels = cc.levels
+        # Level-ordered event queue: heap of pending levels, one bucket of gates per level
+        buckets: Dict[int, List[int]] = {}
+        pending = []
+        scheduled = set()
+        def schedule(g):
+            if g in scheduled: return
+            scheduled.add(g)
+            lvl = levels[g]
+            if lvl not in buckets:
+                buckets[lvl] = []
+                heappush(pending, lvl)
+            buckets[lvl].append(g)
+
+        # Seed the queue with every source of change
+        for g in (pi_changes or {}): schedule(g)
+        for g in (inject or {}): schedule(g)
+        for g in release: schedule(g)
+        for g in touched: schedule(g)
+
+        changed = []
+        self.evaluations = 0
+        while pending:
+            for g in buckets.pop(heappop(pending)):
+                if g in self.forced:
+                    v = self.forced[g]
+                elif cc.ops[g] == Op.PI:
+                    v = self.pi_vals[g]
+                else:
+                    v = self._eval(g, vals)
+                    self.evaluations += 1
+                if v == vals[g]:
+                    continue # no event - fanout is unaffected
+                vals[g] = v
+                changed.append(g)
+                for fo in cc.fanouts(g):
+                    schedule(fo)
+        if self.debug: print(f"EventSim: {self.evaluations} gate evaluations, {len(changed)} value changes")
+        return changed
+
+    def set_faults(self, faults: Dict[int, int], branches: Optional[Dict[int, Dict[int, int]]] = None) -> List[int]:
+        """
+        Make faults (stems) and branches (gate -> {input position: value}) the complete set of injected faults,
+        re-simulating only the difference.
+        """
+        branches = branches or {}
+        release = [g for g in self.forced if g not in faults]
+        inject = {g: v for g, v in faults.items() if self.forced.get(g) != v}
+        touched = [g for g in set(self.forced_ins) | set(branches) if self.forced_ins.get(g) != branches.get(g)]
+        self.forced_ins = {g: dict(ins) for g, ins in branches.items()}
+        return self.apply(inject = inject, release = release, touched = touched)
+
+    def value(self, name: str) -> int:
+        return self.values[self.circuit.index[name]]
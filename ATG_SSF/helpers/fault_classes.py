@@ -0,0 +1,225 @@
+from .helpers import color
+from .circuit import CompiledCircuit, Op
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# This modular file contains structural fault collapsing over the full single stuck-at fault universe
+# Every line is a fault site: each gate output / PI (the stem) and, where a stem fans out, each branch to a gate
+# it feeds. Equivalent faults are merged with union-find in one pass over the gate inputs, dominance then drops
+# the classes that any test for a kept class detects, and every class is named by one representative fault.
+#   - Equivalence: an input line stuck at the gate's controlling value c == the output stuck at c ^ i
+#   - Dominance: the output stuck at (not c) ^ i is detected by every test for an input stuck at (not c)
+# XOR gates have no controlling value, so their faults are neither merged nor dropped.
+# Dominance only holds while some input fault it relies on is testable. A gate reading nothing but one stem
+# ('8gat nand 5gat 5gat') has untestable input s-a-(not c) faults, so it is left alone, and a class dropped
+# for any other gate goes back to the targets once a search proves one of its input faults redundant (undominate).
+
+# Branch lines are named '<stem>-><gate>', with ':<input position>' added when the gate reads the stem twice
+BRANCH_SEP = "->"
+
+# Fn for naming the branch of stem into input position pos of gate
+def branch_name(circuit: CompiledCircuit, stem: int, gate: int, pos: int) -> str:
+    name = f"{circuit.names[stem]}{BRANCH_SEP}{circuit.names[gate]}"
+    if sum(1 for x in circuit.fanins(gate) if x == stem) > 1:
+        name += f":{pos}"
+    return name
+
+# Fn for finding the (stem, gate, input position) of a branch line name - None for any other name
+def parse_branch(circuit: CompiledCircuit, name: str) -> Optional[Tuple[int, int, int]]:
+    if BRANCH_SEP not in name or name in circuit.index:
+        return None
+    stem_name, gate_name = name.rsplit(BRANCH_SEP, 1)
+    pos = None
+    if gate_name not in circuit.index and ':' in gate_name:
+        gate_name, pos = gate_name.rsplit(':', 1)
+    stem, gate = circuit.index.get(stem_name), circuit.index.get(gate_name)
+    if stem is None or gate is None:
+        return None
+    ins = circuit.fanins(gate)
+    if pos is None:
+        pos = next((k for k, x in enumerate(ins) if x == stem), None)
+    elif pos.isdigit() and int(pos) < len(ins) and ins[int(pos)] == stem:
+        pos = int(pos)
+    else:
+        return None
+    return None if pos is None else (stem, gate, pos)
+
+class FaultClasses:
+    """
+    Fault sites are numbered stems first (the circuit's line indices), then branches; fault id = 2 * site + stuck value.
+    parent / dropped may be given (from the circuit cache) to skip the build.
+    """
+    def __init__(self, circuit: CompiledCircuit, dominance: bool = True, debug: bool = False,
+                 parent: Optional[array] = None, dropped: Optional[bytearray] = None):
+        self.circuit = circuit
+        self.debug = debug
+        cc = circuit
+        n = cc.n
+        # Site of every fanin edge's line - a branch when the source fans out, else the source's stem itself
+        self.edge_site = array('i', bytes(4 * len(cc.fanin)))
+        # Per branch: the fanin edge it is, and the gate it feeds
+        self.branch_edge = array('i')
+        self.branch_gate = array('i')
+        fanin, ptr, fo_ptr = cc.fanin, cc.fanin_ptr, cc.fanout_ptr
+        for g in range(n):
+            for e in range(ptr[g], ptr[g + 1]):
+                src = fanin[e]
+                if fo_ptr[src + 1] - fo_ptr[src] > 1:
+                    self.edge_site[e] = n + len(self.branch_edge)
+                    self.branch_edge.append(e)
+                    self.branch_gate.append(g)
+                else:
+                    self.edge_site[e] = src
+        self.n_sites = n + len(self.branch_edge)
+        self.size = 2 * self.n_sites
+        # Input class -> the output classes dropped on its account, built on the first undominate
+        self.dominators: Optional[Dict[int, List[int]]] = None
+        if parent is not None and dropped is not None:
+            self.parent, self.dropped = parent, dropped
+        else:
+            # Union-find forest over fault ids - every root is its class's smallest id, so stems represent
+            # their classes ahead of branches
+            self.parent = array('i', range(self.size))
+            self.dropped = bytearray(self.size)
+            self.build(dominance)
+
+    # --- UNION-FIND ---
+    def find(self, f: int) -> int:
+        parent = self.parent
+        while parent[f] != f:
+            parent[f] = parent[parent[f]] # path halving
+            f = parent[f]
+        return f
+
+    def union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        if a < b:
+            self.parent[b] = a
+        elif b < a:
+            self.parent[a] = b
+
+    def build(self, dominance: bool = True):
+        """
+        One pass over the gates merges equivalent faults, then every id is pointed straight at its root
+        and the dominating classes are marked dropped
+        """
+        cc = self.circuit
+        ops, ctrl, inv, ptr = cc.ops, cc.ctrl, cc.inv, cc.fanin_ptr
+        edge_site = self.edge_site
+        for g in range(cc.n):
+            if ops[g] == Op.PI or ops[g] == Op.XOR:
+                continue
+            c = ctrl[g]
+            out = 2 * g + (c ^ inv[g])
+            for e in range(ptr[g], ptr[g + 1]):
+                self.union(2 * edge_site[e] + c, out)
+        parent = self.parent
+        for f in range(self.size):
+            parent[f] = parent[parent[f]] # roots precede their members, so one pass compresses fully
+        if dominance:
+            for g in range(cc.n):
+                if self.dominates(g):
+                    self.dropped[parent[2 * g + ((1 - ctrl[g]) ^ inv[g])]] = 1
+        if self.debug: print(f"Fault classes: {self.size} faults, {len(self.targets())} targeted, {len(self.dominated())} dominated")
+
+    def dominates(self, g: int) -> bool:
+        """
+        Whether gate g's output s-a-(not c) class is dropped for its input s-a-(not c) faults
+        """
+        cc = self.circuit
+        if cc.ops[g] == Op.PI or cc.ops[g] == Op.XOR:
+            return False
+        fanin, ptr = cc.fanin, cc.fanin_ptr
+        return any(fanin[e] != fanin[ptr[g]] for e in range(ptr[g] + 1, ptr[g + 1]))
+
+    def undominate(self, f: int) -> List[int]:
+        """
+        Fault id f was proven redundant - every class dropped in favour of it is dropped no longer.
+        Returns the representatives of the classes it frees.
+        """
+        if self.dominators is None:
+            cc = self.circuit
+            parent, edge_site = self.parent, self.edge_site
+            self.dominators = {}
+            for g in range(cc.n):
+                if not self.dominates(g):
+                    continue
+                nc = 1 - cc.ctrl[g]
+                out = parent[2 * g + (nc ^ cc.inv[g])]
+                for e in range(cc.fanin_ptr[g], cc.fanin_ptr[g + 1]):
+                    self.dominators.setdefault(parent[2 * edge_site[e] + nc], []).append(out)
+        freed = [r for r in self.dominators.get(self.parent[f], []) if self.dropped[r]]
+        for r in freed:
+            self.dropped[r] = 0
+        return freed
+
+    # --- NAMES ---
+    def line_name(self, site: int) -> str:
+        cc = self.circuit
+        if site < cc.n:
+            return cc.names[site]
+        b = site - cc.n
+        e, g = self.branch_edge[b], self.branch_gate[b]
+        return branch_name(cc, cc.fanin[e], g, e - cc.fanin_ptr[g])
+
+    def lines(self) -> List[str]:
+        return [self.line_name(s) for s in range(self.n_sites)]
+
+    def fault(self, f: int) -> Tuple[str, int]:
+        return self.line_name(f // 2), f % 2
+
+    def fault_id(self, fault: Tuple[str, int]) -> int:
+        cc = self.circuit
+        line, stuck = fault
+        if line in cc.index:
+            return 2 * cc.index[line] + stuck
+        loc = parse_branch(cc, line)
+        if loc is None: raise ValueError(f"Unknown line '{line}'.")
+        _, g, pos = loc
+        return 2 * self.edge_site[cc.fanin_ptr[g] + pos] + stuck
+
+    # --- CLASSES ---
+    def representative(self, fault: Tuple[str, int]) -> Tuple[str, int]:
+        return self.fault(self.parent[self.fault_id(fault)])
+
+    def is_target(self, f: int) -> bool:
+        """
+        Whether fault id f represents a class that stays targeted after dominance
+        """
+        return self.parent[f] == f and not self.dropped[f]
+
+    def targets(self) -> List[Tuple[str, int]]:
+        return [self.fault(f) for f in range(self.size) if self.is_target(f)]
+
+    def dominated(self) -> List[Tuple[str, int]]:
+        """
+        Representatives of the classes dropped by dominance
+        """
+        return [self.fault(f) for f in self.dominated_ids()]
+
+    def dominated_ids(self) -> List[int]:
+        return [f for f in range(self.size) if self.parent[f] == f and self.dropped[f]]
+
+    def classes(self) -> Dict[Tuple[str, int], List[Tuple[str, int]]]:
+        """
+        Representative -> every fault in its class (representative first)
+        """
+        members: Dict[int, List[int]] = {}
+        for f in range(self.size):
+            members.setdefault(self.parent[f], []).append(f)
+        return {self.fault(r): [self.fault(f) for f in fs] for r, fs in members.items()}
+
+    def coverage(self, detected: Iterable[int]) -> float:
+        """
+        Fraction of the whole fault universe detected, given the ids of the detected class representatives
+        """
+        roots = bytearray(self.size)
+        for f in detected:
+            roots[self.parent[f]] = 1
+        return sum(roots[r] for r in self.parent) / self.size if self.size else 0.0
+
+    # CLI Styling for summarizing the collapsed universe
+    def print_summary(self):
+        n_classes = sum(1 for f in range(self.size) if self.parent[f] == f)
+        print(f"\n\t{color.OKCYAN}Fault universe: {self.size} fault(s) on {self.n_sites} line(s) ({len(self.branch_edge)} fanout branch(es)) "
+              f"-> {n_classes} class(es), {len(self.targets())} targeted after dominance.{color.ENDC}")
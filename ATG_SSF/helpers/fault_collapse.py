@@ -1,92 +1,64 @@
 from .helpers import Graph, color
-from .helpers import ControllingInversionVals as ci
-from typing import Dict, Tuple, List
+from .circuit import CompiledCircuit, compile_circuit
+from .fault_classes import FaultClasses
+from .fault_list import FaultList, Status
+from typing import Dict, Tuple, List, Optional
 
 import json
 
 # This modular file contains the logic for collapsing the list of circuit SSF faults
-# It creates an initial fault list for PIs and POs, and defines a collapse method that does the following:
-#   - Removes functionally equivalent input faults
-#   - Removes dominated input faults
+# Before collapsing, the fault list is both faults on every gate / PI. The collapse method builds the full
+# fault universe - stems and fanout branches - and collapses it (see fault_classes.py):
+#   - Merges functionally equivalent faults into classes, each kept as its representative fault
+#   - Removes the classes dominated by a kept one
+# The result is a FaultList (fault_list.py) - every fault numbered, targeted representatives UNDETECTED and the rest
+# COLLAPSED - shared by the fault simulators and engines. fault_list / undetectable_faults are name-keyed views of
+# it (stems first, then branches '<stem>-><gate>') for display and reports.
 
 class Faults:
-    def __init__(self, gates: Dict[str, dict], graph: Graph, debug: bool = False):
+    def __init__(self, gates: Dict[str, dict], graph: Graph, debug: bool = False, circuit: Optional[CompiledCircuit] = None):
         self.gates = gates
         self.graph = graph
         self.debug = debug
-        # Create initial fault list - faults only on PIs and POs
-        max_level = max(g["level"] for g in gates.values())
-        self.fault_list = {
-            k: [0, 1] 
-            # if (gates[k]["type"] == "PI") or (gates[k]["level"] == max_level) 
-            # else [] 
-            for k in gates.keys()
-        }
-        self.undetectable_faults = {k: [] for k in gates.keys()}
-    
-    def collapse(self):
-        # Start at PIs
-        if self.debug: print(f"initial fault count: {sum(len(v) for v in self.fault_list.values())}") #debug print
-        # Iterate gates
-        for gate in self.gates:
-            # Skip PIs
-            gtyp = self.gates[gate]["type"]
-            if gtyp == "PI":
-                continue
-            
-            # Source control and inverse values for gate type
-            inps = self.gates[gate]["inputs"]
-            c, i = ci.__dict__.get(gtyp, (None, None))
-            
-            if c is None: raise ValueError(f"Unsupported gate type '{gtyp}' for fault collapsing.")
-            
-            cXORi = c ^ i
-            # Remove functionally eq inp faults
-            for inp in reversed(inps[1:]):
-                if cXORi in self.fault_list[inp]:
-                    # Before we remove a fault, though, we should check if this line has fanout
-                    neighbors = self.graph.get_neighbors(inp)
-                    neighbor_fanout = False
-                    if len(neighbors) > 1:
-                        for neighbor in neighbors:
-                            if neighbor == gate: continue #skip the current gate
-                            
-                            # Source control and inverse values for neighboring fanout gate
-                            fanout_gate = self.gates[neighbor]["type"]
-                            tmp_c, tmp_i = ci.__dict__.get(fanout_gate, (None, None))
-                            if tmp_c is None: raise ValueError(f"Unsupported gate type '{fanout_gate}' for fault collapsing.")
-                            
-                            # Conditionally prevent collapsing if fanout is intolerable
-                            if (cXORi != (tmp_c ^ tmp_i)):
-                                if self.debug: print(f"Cannot remove fault {cXORi} from line '{inp}' (gate '{gate}') due to fanout to gate '{neighbor}'") # Debug print
-                                neighbor_fanout = True
-                                break
-                    # If fanout is tolerable / nonexistant, remove functionally eq fault
-                    if not neighbor_fanout:
-                        self.fault_list[inp].remove(cXORi)
-                        self.undetectable_faults[inp].append(cXORi)
-                        if self.debug: print(f"Removed fault {cXORi} from line '{inp}' (gate '{gate}')") # Debug print
-                        
-            # Dominant fault collapsing
-            NOTcXORi = (not c) ^ i
-            for inp in inps:
-                if len(self.graph.get_neighbors(inp)) > 1: # skip if fanout exists
-                    continue
-                
-                # If fault still exists
-                if NOTcXORi in self.fault_list[inp]:
-                    # Check next gate in case of PI
-                    if self.gates[inp]["type"] == "PI":
-                        next_inp = inps.index(inp) + 1
-                        if not (next_inp < len(inps) and NOTcXORi in self.fault_list[inps[next_inp]]):
-                            continue 
-                    # Remove dominated fault
-                    self.fault_list[inp].remove(NOTcXORi)
-                    self.undetectable_faults[inp].append(NOTcXORi)
-                    
+        self.circuit = circuit if circuit is not None else compile_circuit(gates)
+        # Fault classes over the full universe, and the numbered fault list built on them - set by collapse
+        self.classes: Optional[FaultClasses] = None
+        self.flist: Optional[FaultList] = None
+
+    def collapse(self, dominance: bool = True):
+        if self.debug: print(f"initial fault count: {2 * self.circuit.n}") #debug print
+        self.set_classes(FaultClasses(self.circuit, dominance, self.debug))
         #debug print fault count
         if self.debug: print(f"{json.dumps(self.fault_list, indent=4)}")
-        if self.debug: print(f"fault count: {sum(len(v) for v in self.fault_list.values())}")
+        if self.debug: print(f"fault count: {self.flist.n_targets}")
+
+    def set_classes(self, classes: FaultClasses):
+        self.classes = classes
+        self.flist = FaultList(classes)
+
+    # --- VIEWS ---
+    def _by_line(self, targeted: bool) -> Dict[str, List[int]]:
+        if self.flist is None:
+            return {k: [0, 1] if targeted else [] for k in self.gates.keys()}
+        initial = self.flist.initial
+        return {
+            self.classes.line_name(site): [v for v in (0, 1) if (initial[2 * site + v] != Status.COLLAPSED) == targeted]
+            for site in range(self.classes.n_sites)
+        }
+
+    @property
+    def fault_list(self) -> Dict[str, List[int]]:
+        """
+        Line -> its targeted stuck-at values (every fault before collapsing)
+        """
+        return self._by_line(True)
+
+    @property
+    def undetectable_faults(self) -> Dict[str, List[int]]:
+        """
+        Line -> its stuck-at values collapsed into another fault's class
+        """
+        return self._by_line(False)
         
     # CLI Styling for displaying collapsed fault list and (conditionally) undetectable faults
     def print_fault_classes(self, *args, **kwargs):
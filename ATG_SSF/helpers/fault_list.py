@@ -0,0 +1,135 @@
+from .fault_classes import FaultClasses
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# This modular file contains the numbered fault list shared by the fault simulators and test generation engines
+# Every fault of the universe keeps its FaultClasses id (2 * site + stuck value) and one status byte, so
+# bookkeeping costs a byte per fault and marking a fault detected is a single store. Iteration over a status
+# ("still undetected") and set operations between statuses scan the status array in C with bytes.find / translate.
+
+class Status:
+    UNDETECTED = 0
+    DETECTED = 1
+    REDUNDANT = 2   # proven untestable by a search
+    ABORTED = 3     # search budget ran out
+    COLLAPSED = 4   # equivalent to / dominated by a targeted fault - never targeted itself
+    NAMES = ("undetected", "detected", "redundant", "aborted", "collapsed")
+
+class FaultList:
+    """
+    Status per fault id over the whole universe. reset() returns every targeted fault to UNDETECTED.
+    """
+    def __init__(self, classes: FaultClasses):
+        self.classes = classes
+        self.circuit = classes.circuit
+        self.size = classes.size
+        # Status before any test generation - kept for reset()
+        self.initial = bytearray(Status.UNDETECTED if classes.is_target(f) else Status.COLLAPSED for f in range(self.size))
+        self.status = bytearray(self.initial)
+        self.n_targets = self.initial.count(Status.UNDETECTED)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def reset(self):
+        self.status[:] = self.initial
+
+    # --- NAMES ---
+    def fault(self, f: int) -> Tuple[str, int]:
+        return self.classes.fault(f)
+
+    def fault_id(self, fault: Tuple[str, int]) -> int:
+        return self.classes.fault_id(fault)
+
+    def locate(self, f: int) -> Tuple[int, int, Optional[Tuple[int, int]]]:
+        """
+        Site of fault id f in FaultSim form - (line, stuck value, None) for a stem,
+        (stem, stuck value, (gate, input position)) for a branch - without building its name
+        """
+        cc = self.circuit
+        site, stuck = f >> 1, f & 1
+        if site < cc.n:
+            return site, stuck, None
+        b = site - cc.n
+        e, g = self.classes.branch_edge[b], self.classes.branch_gate[b]
+        return cc.fanin[e], stuck, (g, e - cc.fanin_ptr[g])
+
+    # --- STATUS ---
+    def get(self, f: int) -> int:
+        return self.status[f]
+
+    def set(self, f: int, status: int):
+        self.status[f] = status
+
+    def undominate(self, f: int) -> List[int]:
+        """
+        Fault id f was proven redundant - the classes dominance dropped in its favour become targets (see FaultClasses)
+        """
+        freed = self.classes.undominate(f)
+        for r in freed:
+            self.initial[r] = self.status[r] = Status.UNDETECTED
+        self.n_targets += len(freed)
+        return freed
+
+    def mask(self, *statuses: int) -> bytearray:
+        """
+        One byte per fault - 1 where the fault has any of statuses, else 0. Masks combine with and_ / or_ / minus.
+        """
+        table = bytearray(256)
+        for s in statuses:
+            table[s] = 1
+        return self.status.translate(table)
+
+    def ids(self, *statuses: int) -> Iterator[int]:
+        """
+        Fault ids with any of statuses (default: UNDETECTED), in id order.
+        Safe to change the status of the fault just returned while iterating.
+        """
+        statuses = statuses or (Status.UNDETECTED,)
+        if len(statuses) == 1:
+            arr, code = self.status, statuses[0]
+        else:
+            arr, code = self.mask(*statuses), 1
+        f = arr.find(code)
+        while f != -1:
+            yield f
+            f = arr.find(code, f + 1)
+
+    def undetected(self) -> Iterator[int]:
+        return self.ids(Status.UNDETECTED)
+
+    def targets(self) -> Iterator[int]:
+        """
+        Every fault targeted by test generation, whatever its status now
+        """
+        f = self.initial.find(Status.UNDETECTED)
+        while f != -1:
+            yield f
+            f = self.initial.find(Status.UNDETECTED, f + 1)
+
+    def count(self, status: int) -> int:
+        return self.status.count(status)
+
+    def summary(self) -> Dict[str, int]:
+        return {name: self.status.count(s) for s, name in enumerate(Status.NAMES)}
+
+    # --- MASKS ---
+    @staticmethod
+    def and_(a: bytearray, b: bytearray) -> bytearray:
+        return bytearray((int.from_bytes(a, "little") & int.from_bytes(b, "little")).to_bytes(len(a), "little"))
+
+    @staticmethod
+    def or_(a: bytearray, b: bytearray) -> bytearray:
+        return bytearray((int.from_bytes(a, "little") | int.from_bytes(b, "little")).to_bytes(len(a), "little"))
+
+    @staticmethod
+    def minus(a: bytearray, b: bytearray) -> bytearray:
+        return bytearray((int.from_bytes(a, "little") & ~int.from_bytes(b, "little")).to_bytes(len(a), "little"))
+
+    @staticmethod
+    def mask_ids(mask: bytearray) -> List[int]:
+        ids = []
+        f = mask.find(1)
+        while f != -1:
+            ids.append(f)
+            f = mask.find(1, f + 1)
+        return ids
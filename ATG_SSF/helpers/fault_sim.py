@@ -0,0 +1,187 @@
+from .helpers import color
+from .circuit import CompiledCircuit
+from .parallel_sim import ParallelSim, pack_vectors, eval_gate_word, WORD_SIZE
+from .fault_collapse import Faults
+from .fault_classes import parse_branch
+from .fault_list import FaultList, Status
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from heapq import heapify, heappop, heappush
+
+# This modular file contains the Parallel-Pattern Single-Fault-Propagation (PPSFP) fault simulator
+# Good-machine values are computed bit-parallel for a word of patterns, then each fault is injected alone
+# and only the gates in its fanout cone whose value actually differs from the good machine are re-evaluated
+# Given the shared FaultList, faults stay fault ids throughout - located with FaultList.locate, their detections
+# kept per id and marked DETECTED in the list directly. Names are only built when a report asks for them.
+
+class FaultSim:
+    def __init__(self, circuit: CompiledCircuit, faults: Union[Faults, FaultList, Sequence[Tuple[str, int]]], word_size: int = WORD_SIZE, debug: bool = False,
+                 ids: Optional[Iterable[int]] = None):
+        """
+        faults: the shared FaultList (or a collapsed Faults) - its targets, or the fault ids given as ids -
+                else a list of (line, stuck value) names
+        """
+        self.circuit = circuit
+        self.debug = debug
+        self.psim = ParallelSim(circuit, word_size = word_size, debug = debug)
+        # Flatten an uncollapsed fault list the same way DAlgorithm does - [('3gat', 0), ('3gat', 1)]
+        if isinstance(faults, Faults):
+            faults = faults.flist if faults.flist is not None else [(gate, f) for gate, fs in faults.fault_list.items() for f in fs]
+        self.flist: Optional[FaultList] = faults if isinstance(faults, FaultList) else None
+        # Branch line name -> (stem, gate, input position), parsed once
+        self.branches: Dict[str, Tuple[int, int, int]] = {}
+        if self.flist is not None:
+            self.ids: Optional[List[int]] = list(self.flist.targets() if ids is None else ids)
+            self.sites = [self.flist.locate(f) for f in self.ids]
+            self._faults: Optional[List[Tuple[str, int]]] = None
+        else:
+            self.ids = None
+            self._faults = list(faults)
+            self.sites = [self.locate(fault) for fault in self._faults]
+        # Per fault, in fault order: bitmask over pattern indices that detect it
+        self.words: List[int] = [0] * len(self.sites)
+        self._detected: Optional[Dict[Tuple[str, int], int]] = None
+        self.n_patterns = 0
+
+    def locate(self, fault: Tuple[str, int]) -> Tuple[int, int, Optional[Tuple[int, int]]]:
+        """
+        Site of a fault - (line, stuck value, None) for a stem, (stem, stuck value, (gate, input position)) for a branch
+        """
+        cc = self.circuit
+        line, stuck = fault
+        if line in cc.index:
+            return cc.index[line], stuck, None
+        loc = self.branches.get(line)
+        if loc is None:
+            loc = parse_branch(cc, line)
+            if loc is None: raise ValueError(f"Unknown line '{line}'.")
+            self.branches[line] = loc
+        return loc[0], stuck, loc[1:]
+
+    def fault_word(self, good: List[int], site: int, stuck: int, mask: int, branch: Optional[Tuple[int, int]] = None) -> int:
+        """
+        Propagate a single fault through its fanout cone against the good-machine word.
+        branch: (gate, input position) for a fault on one fanout branch of site - only that gate sees it.
+        Returns a word whose set bits are the patterns that detect the fault at some PO.
+        """
+        cc = self.circuit
+        fval = mask if stuck else 0
+        if fval == good[site]:
+            return 0 # fault never activated in this word
+        gate_ins = self.psim.gate_ins
+        if branch is not None:
+            g, pos = branch
+            site = g
+            fval = eval_gate_word(cc.ops[g], (fval if k == pos else good[src] for k, src in enumerate(gate_ins[g])), mask)
+            if fval == good[g]:
+                return 0 # blocked at the gate the branch feeds
+        faulty = {site: fval}
+        detect = (fval ^ good[site]) if cc.po_mask[site] else 0
+        # Gate indices are topological, so a min-heap processes events in level order
+        heap = list(set(cc.fanouts(site)))
+        queued = set(heap)
+        heapify(heap)
+        while heap:
+            g = heappop(heap)
+            v = eval_gate_word(cc.ops[g], (faulty.get(src, good[src]) for src in gate_ins[g]), mask)
+            if v == good[g]:
+                continue # fault effect masked here
+            faulty[g] = v
+            if cc.po_mask[g]:
+                detect |= v ^ good[g]
+            for fo in cc.fanouts(g):
+                if fo not in queued:
+                    queued.add(fo)
+                    heappush(heap, fo)
+        return detect
+
+    def run(self, vectors: Sequence[Sequence[int]], drop: bool = False) -> List[int]:
+        """
+        Fault simulate all vectors against the fault list. Returns the detection word of each fault, in fault order.
+        With drop=True a fault is no longer simulated once detected (only its first detection is kept).
+        """
+        cc = self.circuit
+        word_size = self.psim.word_size
+        words = self.words = [0] * len(self.sites)
+        self._detected = None
+        self.n_patterns = len(vectors)
+        for start in range(0, len(vectors), word_size):
+            count = min(word_size, len(vectors) - start)
+            mask = (1 << count) - 1
+            good = self.psim.eval_words(pack_vectors(vectors, len(cc.pis), start, count), mask)
+            for i, (site, stuck, branch) in enumerate(self.sites):
+                if drop and words[i]:
+                    continue
+                word = self.fault_word(good, site, stuck, mask, branch)
+                if word:
+                    words[i] |= word << start
+        if self.debug: print(f"Fault simulated {len(self.sites)} faults x {len(vectors)} patterns")
+        return words
+
+    # --- RESULTS ---
+    @property
+    def faults(self) -> List[Tuple[str, int]]:
+        """
+        (line, stuck value) of each fault, in fault order
+        """
+        if self._faults is None:
+            self._faults = [self.flist.fault(f) for f in self.ids]
+        return self._faults
+
+    @property
+    def detected(self) -> Dict[Tuple[str, int], int]:
+        """
+        Name-keyed view of the detection words, for reports
+        """
+        if self._detected is None:
+            self._detected = dict(zip(self.faults, self.words))
+        return self._detected
+
+    def detected_ids(self) -> List[int]:
+        """
+        Ids of the detected faults - simulating a FaultList only
+        """
+        return [f for f, word in zip(self.ids, self.words) if word]
+
+    def mark_detected(self) -> List[int]:
+        """
+        Mark every detected fault DETECTED in the shared FaultList, returning the ids newly marked.
+        Only undetected and aborted faults change - a redundancy proof is final.
+        """
+        status = self.flist.status
+        marked = [f for f in self.detected_ids() if status[f] in (Status.UNDETECTED, Status.ABORTED)]
+        for f in marked:
+            status[f] = Status.DETECTED
+        return marked
+
+    def first_detection(self, fault: Tuple[str, int]) -> Optional[int]:
+        word = self.detected.get(fault, 0)
+        return (word & -word).bit_length() - 1 if word else None
+
+    def faults_detected_by(self, pattern: int) -> List[Tuple[str, int]]:
+        return [fault for fault, word in zip(self.faults, self.words) if (word >> pattern) & 1]
+
+    def undetected(self) -> List[Tuple[str, int]]:
+        return [fault for fault, word in zip(self.faults, self.words) if not word]
+
+    def coverage(self) -> float:
+        if not self.words:
+            return 0.0
+        return sum(1 for word in self.words if word) / len(self.words)
+
+    # CLI Styling for displaying detected faults per pattern and coverage
+    def print_report(self):
+        print(f"\n{color.HEADER}{color.BOLD}Fault Simulation Results:{color.ENDC}\n")
+        print(f"{color.BOLD}{color.UNDERLINE}{'Pattern':<8} | Detected Faults{color.ENDC}")
+        for p in range(self.n_patterns):
+            faults = self.faults_detected_by(p)
+            print(f"{p:<8} | {', '.join(f'{w} s-a-{s}' for w, s in faults) if faults else 'None'}")
+        print(f"\n{color.BOLD}{color.UNDERLINE}{'Fault':<16} | First Detecting Pattern{color.ENDC}")
+        for fault in self.faults:
+            first = self.first_detection(fault)
+            label = f"{fault[0]} s-a-{fault[1]}"
+            if first is None:
+                print(f"{color.FAIL}{label:<16} | undetected{color.ENDC}")
+            else:
+                print(f"{label:<16} | {first}")
+        detected = sum(1 for word in self.words if word)
+        print(f"\n{color.OKGREEN}{color.BOLD}Fault coverage: {detected}/{len(self.words)} ({100 * self.coverage():.2f}%){color.ENDC}")
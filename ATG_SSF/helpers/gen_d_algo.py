@@ -1,39 +1,98 @@
 from .helpers import color
-from .helpers import Graph
-from .helpers import ControllingInversionVals as ci
-from .helpers import GateOps as ops
-from .helpers import DGateOps as dops
-from .fault_collapse import Faults
-from typing import Tuple, Optional
-import json 
+from .circuit import CompiledCircuit, Op, Logic5 as L, eval5
+from .fault_sim import FaultSim
+from .parallel_sim import pack_vectors
+from .random_tpg import RandomPatternGen
+from .scoap import SCOAP
+from .learning import StaticLearning
+from .dominators import Dominators
+from .compaction import Compactor
+from .fault_classes import parse_branch
+from .fault_list import FaultList, Status
+from typing import Dict, List, Set, Optional, Tuple, Union
 import time
-from random import randint as rand
-
-from typing import Dict, List, Set, Optional, Union, NamedTuple
-from typing import Dict, List, Optional, Union
+import multiprocessing as mp
+from collections import deque
 
 # This modular file contains logic for generating test vectors for each fault in the circuit using the D-Algorithm
 
+# Default per-fault search budgets - None means unlimited
+MAX_BACKTRACKS = 10000
+MAX_DECISIONS = None
+TIME_LIMIT = None   # seconds
+# Dynamic compaction - secondary faults tried per test, and their backtrack budget
+COMPACT_TRIES = 8
+COMPACT_BACKTRACKS = 100
+# generate() result for a fault whose search ran out of budget - neither tested nor proven untestable
+ABORTED = "aborted"
+
+# Per-process engine for parallel solve - set once by the pool initializer, not pickled per task
+_WORKER_ENGINE = None
+
+def _init_worker(engine):
+    global _WORKER_ENGINE
+    _WORKER_ENGINE = engine
+
+def _generate_worker(f):
+    return f, _WORKER_ENGINE.generate(*_WORKER_ENGINE.faults.fault(f))
 
 class DAlgorithm:
-    def __init__(self, netlist: Dict[str, Dict], graph, fault_list, debug: bool = False):
+    name = "D-Algorithm"
+
+    def __init__(self, netlist: Dict[str, Dict], graph, fault_list, debug: bool = False, circuit: Optional[CompiledCircuit] = None,
+                 max_backtracks: Optional[int] = MAX_BACKTRACKS, max_decisions: Optional[int] = MAX_DECISIONS,
+                 time_limit: Optional[float] = TIME_LIMIT, learn: bool = False):
         self.netlist = netlist
         self.graph = graph
         self.debug = debug
-        # fault_list structures existing faults. [('3gat', 0), ('3gat', 1)] means '3gat' has unique s-a-0 and s-a-1 faults.
-        self.fault_list = [
-            (gate, fault)
-            for gate, faults in fault_list.fault_list.items()   
-            for fault in faults
-        ]
+        self.circuit = circuit if circuit is not None else fault_list.circuit
+        # Shared numbered fault list - this run's status per fault (detected / redundant / aborted) lives in it
+        if fault_list.flist is None: raise ValueError("Collapse the fault list before generating tests.")
+        self.faults: FaultList = fault_list.flist
+        self.faults.reset()
         # Store any working test vector for each fault
         self.solutions = {}
+        # Faults dropped because an earlier vector already detects them -> the fault that vector targeted
+        self.dropped = {}
+        # Per-fault search budgets, and the counters checked against them
+        self.max_backtracks = max_backtracks
+        self.max_decisions = max_decisions
+        self.time_limit = time_limit
+        self.n_backtracks = 0
+        self.n_decisions = 0
+        self.deadline = None
+        # Single-pattern fault simulator used for fault dropping
+        self.fsim = FaultSim(self.circuit, [], word_size = 1)
+        # SCOAP testability scores - order the search decisions
+        self.scoap = SCOAP(self.circuit)
+        # Dominator tree toward the POs - side inputs every fault effect must be sensitized through
+        self.dominators = Dominators(self.circuit)
+        # Optional static learning - indirect implications consulted during implication
+        self.learning = None
+        if learn:
+            self.learning = StaticLearning(self.circuit, debug)
+            self.learning.run()
+            self.learning.print_summary()
+        self.in_cone = bytearray(self.circuit.n)
+        # Search state for the current fault - 5-valued codes per gate, and the trail of changes to undo.
+        # Every assignment goes through the trail, so the next fault starts from all-X by undoing it
+        self.gate_ins = [tuple(self.circuit.fanins(g)) for g in range(self.circuit.n)]
+        self.values: List[int] = [L.X] * self.circuit.n
+        self.trail: List[Tuple[int, int]] = []
+        self.events = deque() # lines changed since the last implication
+        self.d_frontier: Set[int] = set()
+        self.j_frontier: Set[int] = set()
+        self.po_errors = 0 # POs currently carrying D / D'
+        self.site = -1
+        self.stuck = 0
         # Store refined (with DCs) test vectors for each fault
         self.refined_solns = []
+        # Compacted test set - (faults kept for, PI assignments) per vector
+        self.compacted = []
 
     # --- UTILITIES ---
-    def is_PI(self, w): return self.netlist[w]['type'] == 'PI'
-    def is_PO(self, w): return self.netlist[w]['level'] == max(g['level'] for g in self.netlist.values())
+    def is_PI(self, w): return self.circuit.is_pi(self.circuit.index[w])
+    def is_PO(self, w): return self.circuit.is_po(self.circuit.index[w])
     def other_val(self, v):
         if v==0: return 1
         if v==1: return 0
@@ -44,19 +103,21 @@ class DAlgorithm:
         """
         Check if any gate has Dont Care inputs
         """
-        l1_gts = [g for g in self.netlist.keys() if self.netlist[g]['level'] == 1]
-        for g in l1_gts:
-            ins = [(x, assignment[x]) for x in self.netlist[g]['inputs']]
-            c, i = ci.__dict__.get(self.netlist[g]['type'], (None, None))
-            func = dops.__dict__.get(self.netlist[g]['type'], None)
-            if c is None or func is None: raise ValueError(f"Unsupported gate type '{self.netlist[g]['type']}' for D-Algorithm simulation.")
+        cc = self.circuit
+        # Only level-1 gates fed by an assigned PI can see a controlling value - found from the PIs, not a level scan
+        l1_gts = sorted({fo for pi in cc.pis if assignment[cc.names[pi]] != "DC" for fo in cc.fanouts(pi) if cc.levels[fo] == 1})
+        for gi in l1_gts:
+            if cc.ops[gi] == Op.XOR: continue # no controlling value - every input matters
+            g = cc.names[gi]
+            ins = [(cc.names[x], assignment[cc.names[x]]) for x in cc.fanins(gi)]
+            c = cc.ctrl[gi]
             if any(v == c for _, v in ins):
                 # At least one input is controlling value, so assuming no fanout rest are DCs
                 # This doesn't catch all DCs in all cases. but good enough
                 keep = [i for i, v in enumerate(ins) if v[1] == c][0]
                 for idx, (inp_name, inp_val) in enumerate(ins):
                     if idx == keep: continue
-                    if len(self.graph.get_neighbors(inp_name)) == 1:
+                    if cc.fanout_count(cc.index[inp_name]) == 1:
                         if inp_val not in ('D', "D'"):
                             assignment[inp_name] = "DC"
                             if self.debug: print(f"{color.OKCYAN}check_DCs: Setting {inp_name} to {assignment[inp_name]} as DC to maintain controlling value at gate {g}{color.ENDC}")
@@ -65,137 +126,215 @@ class DAlgorithm:
 
     # --- FRONTIER COMPUTATION ---
 
-    # D-Frontier have "D" or "D'" as an input, and "X" as output
-    def get_D_frontier(self, assignment) -> List[str]:
-        lst = []
-        for gname, gate in self.netlist.items():
-            ins = [assignment[x] for x in gate['inputs']]
-            if (('D' in ins or "D'" in ins) and assignment[gname] == "X"):
-                lst.append(gname)
-        return lst
-
-    # J-Frontier have "X" inputs and a known output
-    def get_J_frontier(self, assignment) -> List[str]:
-        lst = []
-        for gname, gate in self.netlist.items():
-            if assignment[gname] in (0,1,"D","D'") and any(assignment[x] == "X" for x in gate['inputs']):
-                lst.append(gname)
-        return lst
-
-    # Check if we have successfully propagated a fault to PO
-    def error_at_PO(self, assignment) -> bool:
-        return any(self.is_PO(g) and assignment[g] in ("D", "D'") for g in self.netlist)
-
-    # --- MAIN RECURSIVE D-ALGORITHM ---
-    def D_alg(self, assignment: Dict[str, Union[int,str]], depth=0) -> Optional[Dict]: 
-        # Copy assignment for current recursion level
-        assignment = dict(assignment)
-        if self.debug: print(f"\n{color.OKBLUE}New DAlg call{color.ENDC}")
-        if self.debug: print(f"Initial assignement at depth {depth}:\n{json.dumps(assignment, indent = 2)}")
-        # If circuit has conflict, end recursion level
-        if not self.Imply_and_check(assignment):
-            if self.debug: print(f"Depth: {depth}, Conflict detected during implication.")
-            return None
+    # Both frontiers are kept as sets, updated on every assignment and undo rather than rescanned
 
-        # Not failure or success - we need to go deeper
+    # D-Frontier have "D" or "D'" as an input, and "X" as output - easiest to observe first
+    def get_D_frontier(self) -> List[int]:
+        co = self.scoap.co
+        return sorted(self.d_frontier, key = lambda g: (co[g], g))
 
-        # Source D-Frontiers
-        Dfront = self.get_D_frontier(assignment)
-        while len(Dfront):
-            # Loop D-Frontiers, and source the control and inverse values for each 
-            for G in Dfront:
-                if self.debug: print(f"Depth: {depth}, Dfront: {Dfront}")
-                c, i = ci.__dict__.get(self.netlist[G]['type'], (None, None))
-                if c == None: raise ValueError(f"Unsupported gate type '{self.netlist[G]['type']}' for D-Algorithm simulation.")
-                
-                # Find options for D-Frontier we haven't explored
-                untried_inputs = [inp for inp in self.netlist[G]['inputs'] if assignment[inp] == 'X']
-                # D-Frontier fully explored - move onto next
-                if not untried_inputs:
-                    if self.debug: print(f"{color.WARNING}Depth: {depth}, all inputs tried, continuing{color.ENDC}")
-                    continue
-                # Assign not-c to all untried inputs
-                for inp in untried_inputs:
-                    assignment[inp] = int(not c)
-                    if self.debug: print(f"Depth: {depth}, Trying assignment in dfront loop: {inp} = {c}")
-                    
-                    # Justify value on D-Frontier input in new recursion level
-                    result = self.D_alg(assignment, depth+1)
-                    if self.debug: print(f"Depth: {depth}, Assigment result: {result}")
-                    # Success!
-                    if result is not None:
-                        if self.debug: print(f"{color.OKGREEN}Depth: {depth}, Success assigning {inp} to {assignment[inp]}!{color.ENDC}")
-                        return result
-                    # Failure!
-                    if self.debug: print(f"{color.WARNING}Depth: {depth}, Failure assigning {inp} to {assignment[inp]}- trying {c}{color.ENDC}")
-                    assignment[inp] = c
-                return self.D_alg(assignment, depth+1)
-            # Check if D-Frontiers are resolved
-            Dfront = self.get_D_frontier(assignment)
-
-        # Source D-Frontiers       
-        Jfront = self.get_J_frontier(assignment)
-        if not len(Jfront):
-            if self.debug: print(f"Depth: {depth}, J_frontier empty; success")
-            return self.check_DCs(assignment) # Assert Don't Cares and return
-        
-        # Iterate J-Frontiers, experimentally asserting values on inputs
-        for G in Jfront:
-            if self.debug: print(f"Depth: {depth}, Jfront: {Jfront}")
-
-            # Get untried inputs for J-Frontier
-            untried_inputs = [inp for inp in self.netlist[G]['inputs'] if assignment[inp] == 'X']
-            if not untried_inputs:
-                continue
-            
-            # Get control and inverse values for J-Frontier
-            c, i = ci.__dict__.get(self.netlist[G]['type'], (None, None))
-            if self.debug: print(f"{color.OKBLUE}C/I for gate {G} ({self.netlist[G]['type']}): {c}/{i}{color.ENDC}")
-            if c == None: raise ValueError(f"Unsupported gate type '{self.netlist[G]['type']}' for D-Algorithm simulation.")
-            # Assign value for J-Frontier input
-            if i == 1 and i == c:
-                try_val = int(not c) ^ i
+    # J-Frontier have a known output that their current inputs do not yet imply - hardest to justify first
+    def get_J_frontier(self) -> List[int]:
+        return sorted(self.j_frontier, key = self._justify_cost)
+
+    def _justify_cost(self, g: int) -> Tuple[int, int]:
+        return (-self.scoap.cc(g, self._target(g)), g)
+
+    # Check if we have successfully propagated a fault to PO - a given assignment, or the current search state
+    def error_at_PO(self, assignment: Optional[Dict[str, Union[int,str]]] = None) -> bool:
+        if assignment is None:
+            return self.po_errors > 0
+        return any(assignment[self.circuit.names[po]] in ("D", "D'") for po in self.circuit.pos)
+
+    def _update_frontiers(self, g: int):
+        """
+        Recompute gate g's D-frontier / J-frontier membership from the current values
+        """
+        if self.circuit.ops[g] == Op.PI:
+            return
+        vals = self.values
+        if vals[g] == L.X and any(vals[x] in (L.D, L.DB) for x in self.gate_ins[g]):
+            self.d_frontier.add(g)
+        else:
+            self.d_frontier.discard(g)
+        if self._target(g) != L.X and self._eval(g) == L.X:
+            self.j_frontier.add(g)
+        else:
+            self.j_frontier.discard(g)
+
+    def _changed(self, g: int, old: int):
+        """
+        Bookkeeping after line g changes from old - the error-at-PO count and the frontiers of g and its fanout
+        """
+        if self.circuit.po_mask[g]:
+            self.po_errors += (self.values[g] in (L.D, L.DB)) - (old in (L.D, L.DB))
+        self._update_frontiers(g)
+        for fo in self.circuit.fanouts(g):
+            self._update_frontiers(fo)
+
+    # --- ITERATIVE D-ALGORITHM ---
+    def D_alg(self, assignment: Dict[str, Union[int,str]]) -> Optional[Dict]: 
+        """
+        D-Algorithm search with an explicit decision stack. Each stack frame holds the trail length at the
+        decision and its remaining alternatives - backtracking undoes the trail instead of copying the assignment.
+        Returns ABORTED once the search budget runs out.
+        """
+        cc = self.circuit
+        self._reset()
+        assigned = {cc.index[name]: L.CODES[v] for name, v in assignment.items() if v != 'X'}
+        # The fault site is the one line carrying D / D' in the initial assignment
+        self.site = next(g for g, v in assigned.items() if v in (L.D, L.DB))
+        self.stuck = 0 if assigned[self.site] == L.D else 1
+        # Seeded through the trail, so the frontiers follow from the fault site and the assigned lines alone
+        for g, v in assigned.items():
+            self._set(g, v)
+        self.in_cone = self._fanout_cone(self.site)
+        # Unique sensitization - non-controlling side inputs on every dominator, before any decision
+        required = self.dominators.unique_sensitization(self.site, self.in_cone)
+        if required is None:
+            if self.debug: print(f"{cc.names[self.site]} reaches no PO; untestable")
+            return None
+        for g, v in required:
+            if self.values[g] == L.X:
+                self._set(g, v)
+            elif self.values[g] != v:
+                if self.debug: print(f"Dominators need {cc.names[g]} at both values; untestable")
+                return None
+        if self.learning is not None:
+            # Learned facts hold in the faulty circuit only for lines the fault cannot reach
+            for g, v in self.learning.constants.items():
+                if not self.in_cone[g] and self.values[g] == L.X:
+                    self._set(g, v)
+        # Implication starts from the assigned lines in circuit order
+        self.events = deque(sorted(self.events))
+
+        stack = []
+        self.start_budget()
+        ok = self.Imply_and_check()
+        while True:
+            if ok:
+                alternatives = self._decisions()
+                if alternatives is None:
+                    if self.debug: print(f"J-frontier empty and error at PO; success")
+                    return self.check_DCs(self._assignment()) # Assert Don't Cares and return
+                if alternatives:
+                    stack.append([len(self.trail), alternatives, 0])
+                    if self.debug: print(f"Depth: {len(stack)}, {len(alternatives)} alternative(s)")
+            elif self.debug: print(f"Depth: {len(stack)}, Conflict detected during implication.")
+            # Take the next untried alternative, backtracking through exhausted decisions
+            while stack:
+                frame = stack[-1]
+                if frame[2]: self.n_backtracks += 1
+                if self.out_of_budget():
+                    if self.debug: print(f"{color.WARNING}Search budget exhausted after {self.n_decisions} decisions, {self.n_backtracks} backtracks{color.ENDC}")
+                    return ABORTED
+                self._undo(frame[0])
+                if frame[2] < len(frame[1]):
+                    alt = frame[1][frame[2]]
+                    frame[2] += 1
+                    self.n_decisions += 1
+                    if self.debug: print(f"Depth: {len(stack)}, Trying {[(cc.names[g], L.SYMBOLS[v]) for g, v in alt]}")
+                    ok = self._apply(alt) and self.Imply_and_check()
+                    break
+                stack.pop()
             else:
-                try_val = int(not c)
-            for inp in untried_inputs:
-                # Try assigning non-controlling value to X
-                if assignment[G] in ('D', "D'") and (assignment[inp] != 'D' or assignment[inp] != "D'"):
-                    stuck_val = 0 if assignment[G] == 'D' else 1
-                    if stuck_val == c:
-                        assignment[inp] = try_val
-                    else:
-                        assignment[inp] = c
-                elif assignment[G] == try_val:
-                    if self.debug: print(f"Depth: {depth}, assignment[{G}] == (not c) ^ i = {try_val}")
-                    assignment[inp] = try_val
-                else: 
-                    if self.debug: print(f"Depth: {depth}, assignment[{G}] == c = {c}")
-                    assignment[inp] = c
-                if self.debug: print(f"Depth: {depth}, Trying assignment in jfront loop: {inp} = {assignment[inp]}")
-                
-                # Now that we've changed one input, see if it verifies to intended output so long as no fault on line
-                if assignment[G] not in ('D', "D'"):
-                    func = dops.__dict__.get(self.netlist[G]['type'], None)
-                    if func is None: raise ValueError(f"Unsupported gate type '{self.netlist[G]['type']}' for D-Algorithm simulation.")
-                    ins = [assignment[x] for x in self.netlist[G]['inputs']]
-                    eval_out = func(ins)
-                    if eval_out != assignment[G] and eval_out != 'X':
-                        if self.debug: print(f"{color.WARNING}Depth: {depth}, Gate {G} evaluted output {eval_out} not matching assigned output {assignment[G]}- continuing to see if justifying further inputs fixes.{color.ENDC}")
-                        continue
-                    else: 
-                        if self.debug: print(f"{color.OKGREEN}Depth: {depth}, Gate {G} evaluted output {eval_out} matches assigned output {assignment[G]} for inputs {ins}{color.ENDC}")
-                # Try circuit with updated assignment
-                result = self.D_alg(assignment, depth+1)
-                if result is not None:
-                    return result
-                else: 
-                    if self.debug: print(f"Depth: {depth}, Failure assigning {inp} to {assignment[inp]}- trying {c}{color.ENDC}")
-                    # Backtrack this assignment when there is failure
-                    nc = self.other_val(c)
-                    assignment[inp] = nc
-                    return self.D_alg(assignment, depth+1)
-                
-        return None
+                return None
+
+    def _decisions(self) -> Optional[List[List[Tuple[int, int]]]]:
+        """
+        Alternatives for the next decision, each a list of (line, value) assignments.
+        None means success, an empty list means this branch is a dead end.
+        """
+        cc = self.circuit
+        vals = self.values
+        # Propagate - drive the error through a D-frontier gate by setting its X inputs non-controlling.
+        # Any value on an XOR input propagates, so XOR gates branch on their first X input instead
+        if not self.error_at_PO():
+            alternatives = []
+            for G in self.get_D_frontier():
+                untried_inputs = [x for x in self.gate_ins[G] if vals[x] == L.X]
+                if cc.ops[G] == Op.XOR:
+                    alternatives += [[(untried_inputs[0], v)] for v in self._cheapest_values(untried_inputs[0])]
+                else:
+                    alternatives.append([(x, 1 - cc.ctrl[G]) for x in untried_inputs])
+            return alternatives
+        # Justify - one unjustified gate at a time, the hardest to control first so conflicts surface early;
+        # any single input at the controlling value justifies it, so the inputs are tried easiest to control first
+        if not self.j_frontier:
+            return None
+        G = min(self.j_frontier, key = self._justify_cost)
+        untried_inputs = [x for x in self.gate_ins[G] if vals[x] == L.X]
+        if cc.ops[G] == Op.XOR:
+            x = min(untried_inputs, key = lambda x: min(self.scoap.cc0[x], self.scoap.cc1[x]))
+            return [[(x, v)] for v in self._cheapest_values(x)]
+        c = cc.ctrl[G]
+        return [[(x, c)] for x in sorted(untried_inputs, key = lambda x: self.scoap.cc(x, c))]
+
+    def _cheapest_values(self, g: int) -> Tuple[int, int]:
+        return (L.V0, L.V1) if self.scoap.cc0[g] <= self.scoap.cc1[g] else (L.V1, L.V0)
+
+    # --- SEARCH BUDGET ---
+    def start_budget(self):
+        self.n_backtracks = 0
+        self.n_decisions = 0
+        self.deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+
+    def out_of_budget(self) -> bool:
+        return (
+            (self.max_backtracks is not None and self.n_backtracks > self.max_backtracks)
+            or (self.max_decisions is not None and self.n_decisions > self.max_decisions)
+            or (self.deadline is not None and time.perf_counter() > self.deadline)
+        )
+
+    # --- TRAIL ---
+    def _set(self, g: int, v: int):
+        old = self.values[g]
+        self.trail.append((g, old))
+        self.values[g] = v
+        self._changed(g, old)
+        self.events.append(g)
+
+    def _reset(self):
+        """
+        Back to all-X for the next fault - only the lines on the trail were ever assigned
+        """
+        vals = self.values
+        for g, _ in self.trail:
+            vals[g] = L.X
+        self.trail = []
+        self.events.clear()
+        self.d_frontier.clear()
+        self.j_frontier.clear()
+        self.po_errors = 0
+
+    def _undo(self, mark: int):
+        trail = self.trail
+        vals = self.values
+        while len(trail) > mark:
+            g, old = trail.pop()
+            new = vals[g]
+            vals[g] = old
+            self._changed(g, new)
+        self.events.clear()
+
+    def _apply(self, alt: List[Tuple[int, int]]) -> bool:
+        for g, v in alt:
+            if self.values[g] == L.X:
+                self._set(g, v)
+            elif self.values[g] != v:
+                return False
+        return True
+
+    def _assignment(self) -> Dict[str, Union[int, str]]:
+        """
+        Current values as a name-keyed assignment - unassigned PIs are don't cares
+        """
+        cc = self.circuit
+        res = {name: L.SYMBOLS[v] for name, v in zip(cc.names, self.values)}
+        for pi in cc.pis:
+            if self.values[pi] == L.X:
+                res[cc.names[pi]] = "DC"
+        return res
 
     # Method for injecting a target fault - "D" for s-a-0 and "D'" fpr s-a-1
     def inject_fault(self, assignment: Dict[str, Union[int,str]], wire: str, stuck_val: int):
@@ -204,141 +343,386 @@ class DAlgorithm:
         return assignment
 
     # --- SIMULATION/IMPLICATION ---
-    def Imply_and_check(self, assignment: Dict[str, Union[int,str]]) -> bool:
-        changed = True
-        while changed:
-            changed = False
-            for g, info in self.netlist.items():
-                if info['type'] in ('PI','PO'): continue
-                ins = [assignment[x] for x in info['inputs']]
-                in_names = [x for x in info['inputs']]
-                out = assignment[g]
-                c, i = ci.__dict__.get(info['type'], (None, None))
-                op = dops.__dict__.get(info['type'], None)
-                if c is None or op is None: raise ValueError(f"Unsupported gate type '{info['type']}' for D-Algorithm simulation.")
-                
-                if self.debug: print(f"\tImply_and_Check: Processing gate {g} of type {info['type']} with inputs: {in_names}")
-                
-                if out in ('D', "D'") and all(v == 'X' for v in ins):
-                    if self.debug: print(f"{color.WARNING}Imply_and_Check: Gate {g} output is faulted but all inputs are X- checking input implications made by fault{color.ENDC}")
-                    # Gate is faulted, implying inputs to a specific value
-                    stuck_val = 0 if out == 'D' else 1
-                    
-                    if stuck_val == c:
-                        targ_val = int(not c)
-                    else:      
-                        targ_val = c
-                        
-                    # First, see if setting just one input to targ_val suffices
-                    test_sets = [[]]
-                    # First test is with just one input set to targ_val, rest X
-                    for i in range(0, len(ins)):
-                        if i == 0:  test_sets[0].append(targ_val)
-                        else:       test_sets[0].append('X')
-                    
-                    # Then all inputs set to targ_val
-                    test_sets.append([targ_val for _ in ins])
-                    
-                    # Then one input to not targ_val, rest x
-                    test_sets.append([])
-                    for i in range(0, len(ins)):
-                        if i == 0:  test_sets[-1].append(int(not targ_val))
-                        else:       test_sets[-1].append('X')
-                    # Then all inputs to not targ_val
-                    test_sets.append([int(not targ_val) for _ in ins])
-                    # One test_set will result in the fault-free output being not(stuck_val)
-                    
-                    for test_set in test_sets:
-                        res = op(test_set)
-                        if res != 'X' and res != stuck_val:
-                            # Found valid input assignment
-                            if self.debug: print(f"{color.OKCYAN}Found valid test set for gate {g} to justify faulted output {out}:{color.ENDC}")
-                            for idx, val in enumerate(test_set):
-                                if self.debug: print(f"\t{color.OKBLUE}Setting {info['inputs'][idx]} to {val}{color.ENDC}")
-                                assignment[info['inputs'][idx]] = val
-                                changed = True
-                                break
-                            
-                # Managed by J-frontier
-                elif out != "X":
-                    continue
-
-                elif all(v in (0, 1, 'D', "D'") for v in ins):
-                    # First, check if we have faults on both inputs of current gate
-                    # Remember, we sim one fault at a time here. So faults on both inputs -> conflict
-                    if all(v in ('D', "D'") for v in ins):
-                        if self.debug: print(f"{color.WARNING}Gate {g} has faults on all inputs...{color.ENDC}")
-                        # Check which fault line matches gate controlling value 
-                        tmp_ins = [1 if v == "D'" else 0 for v in ins]
-                        
-                        # Change the fault that is not matching controlling value to non-controlling value to allow fault to propagated 
-                        # First, though, check if a faulted inp line is also PI
-                        bad_idx = -1
-                        for idx, nm in enumerate(in_names):
-                            if self.is_PI(nm) and ins[idx] in ('D', "D'"):
-                                bad_idx = idx
-                                break
-                            
-                        if bad_idx != -1: # bad_idx is a faulted PI line- we cant change
-                            tmp_ins[bad_idx] = "D'" if ins[bad_idx] == 1 else "D"
-                        
-                        if tmp_ins.count(c) == 1 and tmp_ins.count(int(not c)) >= 1:
-                            change_idx = tmp_ins.index(int(not c))
-                            assignment[in_names[change_idx]] = int(not c)
-                            changed = True
-                        else: 
-                            # Randomly assert one of the inputs to non-controlling value until hopefully one works
-                            change_idx = -1
-                            change_idx = rand(0, len(ins)-1)
-                            while change_idx == bad_idx:
-                                change_idx = rand(0, len(ins)-1)
-                            assignment[in_names[change_idx]] = int(not c)
-                            changed = True
-                    else: 
-                        func = dops.__dict__.get(info['type'])
-                        if func is None: raise ValueError(f"Unsupported gate type '{info['type']}' for D-Algorithm simulation.")
-                        res = func(ins)
-                        # Make sure result matches assignment
-                        if res != assignment[g] and res != 'X':
-                            if self.debug: print(f"\tImply and check: Gate {g} with inputs {ins} gives output {res}, expected {out}")
-                            if int(not c) ^ i == assignment[g] and c in ins:
-                                # Need to set one input to non-controlling value
-                                for idx, val in enumerate(ins):
-                                    if val == c:
-                                        assignment[in_names[idx]] = int(not c) ^ i
-                                        if self.debug: print(f"{color.OKCYAN}Imply_and_Check: Setting {in_names[idx]} to {int(not c) ^ i} to achieve output {assignment[g]} at gate {g}{color.ENDC}")
-                                        changed = True
-                                        break
-                        assignment[g] = func(ins)
-                        if self.debug: print(f"Imply_and_Check: Assigned {g} = {assignment[g]} with inputs: ")
-                        if self.debug: [print(f"\t{x}: {assignment[x]}") for x in info['inputs']]
-                        changed = True
+    def _eval(self, g: int) -> int:
+        """
+        Value gate g's current inputs imply (good value only at the fault site)
+        """
+        return eval5(self.circuit.ops[g], (self.values[x] for x in self.gate_ins[g]))
+
+    def _target(self, g: int) -> int:
+        """
+        Value gate g's inputs must produce - the good value at the fault site, the assigned value elsewhere
+        """
+        if g == self.site:
+            return L.V1 if self.stuck == 0 else L.V0
+        return self.values[g]
+
+    def _check_gate(self, g: int) -> bool:
+        """
+        Forward and backward implication on one gate. Returns False on a conflict.
+        """
+        cc = self.circuit
+        if cc.ops[g] == Op.PI:
+            return True
+        vals = self.values
+        out = self._target(g)
+        res = self._eval(g)
+        # Forward - known inputs fix the output
+        if res != L.X:
+            if out == L.X:
+                self._set(g, res)
+                return True
+            return res == out
+        if out == L.X:
+            return True
+        # Backward - an X input whose other value would contradict the output is implied
+        ins = self.gate_ins[g]
+        op = cc.ops[g]
+        for k, x in enumerate(ins):
+            if vals[x] != L.X:
+                continue
+            possible = []
+            for test in (L.V0, L.V1):
+                e = eval5(op, (test if j == k else vals[y] for j, y in enumerate(ins)))
+                if e == L.X or e == out:
+                    possible.append(test)
+            if not possible:
+                return False
+            if len(possible) == 1:
+                self._set(x, possible[0])
+        return True
+
+    def Imply_and_check(self) -> bool:
+        """
+        Imply values from the lines changed since the last call. A changed line re-checks its own gate
+        (backward, to its fanin) and the gates it drives (forward, and backward to their other inputs).
+        Returns False as soon as a conflict appears.
+        """
+        cc = self.circuit
+        events = self.events
+        while events:
+            g = events.popleft()
+            if not self._check_gate(g):
+                events.clear()
+                return False
+            for fo in cc.fanouts(g):
+                if not self._check_gate(fo):
+                    events.clear()
+                    return False
+            if self.learning is not None and not self._check_learned(g):
+                events.clear()
+                return False
         if self.debug: print(f"Imply_and_Check: No conflicts detected.")
         return True
 
+    def _check_learned(self, g: int) -> bool:
+        """
+        Apply the learned implications of line g's value, outside the fault's fanout cone
+        """
+        v = self.values[g]
+        if self.in_cone[g] or v not in (L.V0, L.V1):
+            return True
+        for b, w in self.learning.implications(g, v):
+            if self.in_cone[b]:
+                continue
+            if self.values[b] == L.X:
+                self._set(b, w)
+            elif self.values[b] != w:
+                return False
+        return True
+
+    def _fanout_cone(self, site: int) -> bytearray:
+        cc = self.circuit
+        cone = bytearray(cc.n)
+        cone[site] = 1
+        # Walk the fanout from the site - only the lines it reaches are visited
+        stack = [site]
+        while stack:
+            for fo in cc.fanouts(stack.pop()):
+                if not cone[fo]:
+                    cone[fo] = 1
+                    stack.append(fo)
+        return cone
+
     # --- SOLVE ---
-    def solve(self):
-        print(f"\t{color.OKGREEN}Generating tests using D-Algorithm{color.ENDC}", end = "")
-        # Iterate unique faults to generate tests for
-        for (wire, stuck_val) in self.fault_list:
-            if self.debug: print(f"\n\n\n{color.OKGREEN}Processing fault at {wire} stuck-at-{stuck_val}{color.ENDC}")
-            # Set entire circuit to unknown, then inject the fault for this iteration
-            initial_assignment = {w: 'X' for w in self.netlist}
-            self.inject_fault(initial_assignment, wire, stuck_val)
-            # Run recursive D-Algorithm
-            res = self.D_alg(initial_assignment)
+    def generate(self, wire: str, stuck_val: int, fixed: Optional[Dict[str, int]] = None,
+                 require: Optional[Dict[str, int]] = None) -> Optional[Dict]:
+        """
+        Generate a test for a single fault - returns the final assignment, None if no test exists,
+        or ABORTED if the search budget ran out first.
+        fixed: PI values the test must keep (dynamic compaction) - None means no test within them.
+        require: fault-free line values the test must also hold (a fanout-branch fault on the gate it feeds).
+        """
+        branch = self.branch_fault(wire, stuck_val)
+        if branch is not None:
+            return self.generate_branch(branch, fixed)
+        if self.debug: print(f"\n\n\n{color.OKGREEN}Processing fault at {wire} stuck-at-{stuck_val}{color.ENDC}")
+        # Lines left out of the initial assignment start unknown, then inject the fault for this iteration
+        initial_assignment = {}
+        if fixed:
+            if fixed.get(wire, 1 - stuck_val) != 1 - stuck_val:
+                return None # fixed value already holds the fault site at its stuck-at value
+            initial_assignment.update(fixed)
+        if require:
+            initial_assignment.update(require)
+        self.inject_fault(initial_assignment, wire, stuck_val)
+        # Run recursive D-Algorithm
+        res = self.D_alg(initial_assignment)
+        if res == ABORTED:
+            return res
+        if res is not None and self.error_at_PO(res):
+            return res
+        return None
+
+    def branch_fault(self, wire: str, stuck_val: int) -> Optional[Tuple[str, Tuple[int, ...], Dict[str, int]]]:
+        """
+        A fanout-branch fault as faults on the gate the branch feeds - the stem at its fault-free value, the gate's
+        other inputs non-controlling (so the branch alone decides the output), and the output stuck at the value
+        the faulty branch gives it. An XOR passes every change, so both output faults are tried.
+        Returns (gate, output stuck values to try, required line values), or None for a stem fault.
+        """
+        cc = self.circuit
+        if wire in cc.index:
+            return None
+        loc = parse_branch(cc, wire)
+        if loc is None: raise ValueError(f"Unknown line '{wire}'.")
+        stem, gate, pos = loc
+        require = {cc.names[stem]: 1 - stuck_val}
+        if cc.ops[gate] == Op.XOR:
+            return cc.names[gate], (0, 1), require
+        nc = 1 - cc.ctrl[gate]
+        for k, x in enumerate(cc.fanins(gate)):
+            if k == pos:
+                continue
+            if x == stem and nc != 1 - stuck_val:
+                return cc.names[gate], (), require # the stem's other branch into the gate would mask the fault
+            require[cc.names[x]] = nc
+        return cc.names[gate], (stuck_val ^ cc.inv[gate],), require
+
+    def generate_branch(self, branch: Tuple[str, Tuple[int, ...], Dict[str, int]], fixed: Optional[Dict[str, int]] = None) -> Optional[Dict]:
+        """
+        Try each gate-output fault of a branch under its required values - the first test found detects the branch
+        """
+        gate, outputs, require = branch
+        if fixed and any(fixed.get(line, v) != v for line, v in require.items()):
+            return None
+        res = None
+        for stuck in outputs:
+            out = self.generate(gate, stuck, fixed, require)
+            if out == ABORTED:
+                res = ABORTED
+            elif out is not None:
+                # Don't-care marking sees only the gate-output fault, and may free a PI the branch still needs
+                out.update(require)
+                return out
+        return res
+
+    def solve(self, workers: int = 1, drop: bool = False, random_patterns: bool = False, seed: int = 0, compact: bool = False,
+              targets: Optional[List[int]] = None):
+        """
+        Generate tests for every fault in the fault list.
+        drop: fault simulate each new (DC-filled) vector against the remaining faults, and skip every fault it detects.
+              With workers > 1 faults are already in flight, so dropping only trims the test set, not ATPG calls.
+        random_patterns: first run a seeded random-pattern phase, so only the faults it misses reach the search.
+        compact: dynamic compaction - fill each new test's don't cares with tests for further faults.
+        targets: fault ids to search for - a subset of the fault list (default: every fault still undetected).
+        """
+        if random_patterns:
+            self.random_phase(seed)
+        print(f"\t{color.OKGREEN}Generating tests using {self.name}{color.ENDC}", end = "")
+        self._search(list(self.faults.undetected()) if targets is None else list(targets), workers, drop, compact)
+        if len(self.solutions):
+            print(f"\n\t{color.OKGREEN}{color.BOLD}{color.ITALIC}All possible vectors generated!{color.ENDC}")
+        if drop:
+            print(f"\t{color.OKCYAN}{len(self.dropped)} fault(s) dropped - detected by earlier vectors.{color.ENDC}")
+        self.print_summary()
+        # Return unrefined solutions
+        return self.solutions
+
+    def retry_aborted(self, factor: float = 10, workers: int = 1, drop: bool = False):
+        """
+        Search again for the aborted faults only, with every set budget scaled by factor
+        """
+        if self.max_backtracks is not None: self.max_backtracks = int(self.max_backtracks * factor)
+        if self.max_decisions is not None: self.max_decisions = int(self.max_decisions * factor)
+        if self.time_limit is not None: self.time_limit *= factor
+        targets = list(self.faults.ids(Status.ABORTED))
+        for f in targets:
+            self.faults.set(f, Status.UNDETECTED)
+        print(f"\t{color.OKGREEN}Retrying {len(targets)} aborted fault(s) with {factor:g}x budgets{color.ENDC}", end = "")
+        self._search(targets, workers, drop)
+        print()
+        self.print_summary()
+        return self.solutions
+
+    def _search(self, targets: List[int], workers: int, drop: bool, compact: bool = False):
+        """
+        Run generate over the target fault ids and file each one as detected, redundant or aborted
+        """
+        status = self.faults.status
+        # Classes dominance dropped in favour of a fault proven redundant - searched for after this pass
+        freed = []
+        # Iterate unique faults to generate tests for - sharded over a process pool if requested
+        if workers > 1 and len(targets) > 1:
+            results = self._solve_parallel(targets, workers)
+        else:
+            # Lazy, so faults dropped by earlier vectors are skipped before their ATPG call
+            results = (
+                (f, self.generate(*self.faults.fault(f)))
+                for f in targets
+                if status[f] == Status.UNDETECTED
+            )
+        for f, res in results:
+            if status[f] != Status.UNDETECTED:
+                continue
+            wire, stuck_val = self.faults.fault(f)
+            # Search budget ran out - neither detected nor proven untestable
+            if res == ABORTED:
+                status[f] = Status.ABORTED
+                print(f"\n{color.WARNING}Aborted {wire} s-a-{stuck_val} - search budget exhausted{color.ENDC}")
             # If test vector found, add it to solutions
-            if res is not None and self.error_at_PO(res):
+            elif res is not None:
+                status[f] = Status.DETECTED
+                if compact: res = self.extend_test((wire, stuck_val), res, targets)
                 self.solutions[(wire, stuck_val)] = res
                 if self.debug: print(f"Result for {wire} s-a-{stuck_val}: {res}")
+                if drop: self.drop_detected((wire, stuck_val), res)
             # If no tests found, say so in terminal
             else:
+                status[f] = Status.REDUNDANT
+                freed += self.faults.undominate(f)
                 print(f"\n")
                 print(f"{color.FAIL}No test found for {wire} s-a-{stuck_val}{color.ENDC}")
-        if len(self.solutions):
-            print(f"\n\t{color.OKGREEN}{color.BOLD}{color.ITALIC}All possible vectors generated!{color.ENDC}")
-        # Return unrefined solutions
-        return self.solutions
+        if freed:
+            if self.debug: print(f"{color.OKCYAN}Targeting {[self.faults.fault(f) for f in freed]} - dominance relied on redundant faults{color.ENDC}")
+            self._search(freed, workers, drop, compact)
+
+    @property
+    def untestable(self) -> List[Tuple[str, int]]:
+        """
+        Faults no test was found for
+        """
+        return [self.faults.fault(f) for f in self.faults.ids(Status.REDUNDANT)]
+
+    @property
+    def aborted(self) -> List[Tuple[str, int]]:
+        """
+        Faults whose search hit a budget before finding a test or proving none exists
+        """
+        return [self.faults.fault(f) for f in self.faults.ids(Status.ABORTED)]
+
+    # CLI Styling for the end-of-run fault summary
+    def print_summary(self):
+        counts = self.faults.summary()
+        print(f"\t{color.BOLD}Detected: {counts['detected']} | Redundant: {counts['redundant']} | Aborted: {counts['aborted']}{color.ENDC}")
+
+    def random_phase(self, seed: int = 0) -> Dict[int, int]:
+        """
+        Random-pattern pre-phase. Each kept vector becomes the solution of the first fault it detected,
+        and the other faults it was first to detect are dropped against that fault.
+        """
+        cc = self.circuit
+        rpg = RandomPatternGen(cc, self.faults, seed = seed, debug = self.debug)
+        detected = rpg.run()
+        for vec, faults in zip(rpg.vectors, rpg.detects):
+            first = self.faults.fault(faults[0])
+            self.solutions[first] = {cc.names[pi]: val for pi, val in zip(cc.pis, vec)}
+            for f in faults[1:]:
+                self.dropped[self.faults.fault(f)] = first
+            for f in faults:
+                self.faults.set(f, Status.DETECTED)
+        rpg.print_summary(detected)
+        return detected
+
+    # --- COMPACTION ---
+    def extend_test(self, fault: Tuple[str, int], assignment: Dict[str, Union[int, str]], targets: List[int]) -> Dict:
+        """
+        Dynamic compaction - target further faults within the don't-care PIs of a new test.
+        Each success narrows the test, and the fault it covers is dropped against this one.
+        """
+        cc = self.circuit
+        good = {'D': 1, "D'": 0, 0: 0, 1: 1}
+        budget = self.max_backtracks
+        self.max_backtracks = COMPACT_BACKTRACKS if budget is None else min(budget, COMPACT_BACKTRACKS)
+        tries = 0
+        for f in targets:
+            fixed = {cc.names[pi]: good[assignment[cc.names[pi]]] for pi in cc.pis if assignment[cc.names[pi]] in good}
+            if tries >= COMPACT_TRIES or len(fixed) == len(cc.pis):
+                break
+            if self.faults.status[f] != Status.UNDETECTED:
+                continue
+            tries += 1
+            res = self.generate(*self.faults.fault(f), fixed = fixed)
+            if res is not None and res != ABORTED:
+                # Don't-care marking only knows the secondary fault - keep every PI the earlier faults rely on
+                for name, val in fixed.items():
+                    if res[name] == "DC": res[name] = val
+                assignment = res
+                self.faults.set(f, Status.DETECTED)
+                self.dropped[self.faults.fault(f)] = fault
+                if self.debug: print(f"{color.OKCYAN}Compacted {f} into the test for {fault}{color.ENDC}")
+        self.max_backtracks = budget
+        return assignment
+
+    def compact_solutions(self) -> List[Tuple[List[Tuple[str, int]], Dict[str, int]]]:
+        """
+        Static compaction of the solutions - merge compatible tests, then drop vectors made redundant by later ones
+        """
+        cc = self.circuit
+        good = {'D': 1, "D'": 0, 0: 0, 1: 1}
+        cubes = [[good.get(sol[cc.names[pi]]) for pi in cc.pis] for sol in self.solutions.values()]
+        compactor = Compactor(cc, self.faults, self.debug)
+        compactor.compact(cubes)
+        self.compacted = [
+            (faults, {cc.names[pi]: v for pi, v in zip(cc.pis, vec)})
+            for vec, faults in zip(compactor.vectors, compactor.detects)
+        ]
+        compactor.print_summary(len(cubes))
+        return self.compacted
+
+    # --- FAULT DROPPING ---
+    def test_vector(self, assignment: Dict[str, Union[int, str]]) -> List[int]:
+        """
+        PI values of an assignment in circuit PI order, with DC / X filled as 0 and D / D' as their good value
+        """
+        fill = {0: 0, 1: 1, 'D': 1, "D'": 0}
+        return [fill.get(assignment[self.circuit.names[pi]], 0) for pi in self.circuit.pis]
+
+    def drop_detected(self, fault: Tuple[str, int], assignment: Dict[str, Union[int, str]]) -> List[Tuple[str, int]]:
+        """
+        Fault simulate the vector generated for fault against every fault still targeted, and drop the detected ones
+        """
+        cc = self.circuit
+        good = self.fsim.psim.eval_words(pack_vectors([self.test_vector(assignment)], len(cc.pis)), 1)
+        detected = []
+        # An earlier search may have given up on a fault this vector detects
+        for f in self.faults.ids(Status.UNDETECTED, Status.ABORTED):
+            site, stuck, branch = self.faults.locate(f)
+            if self.fsim.fault_word(good, site, stuck, 1, branch):
+                self.faults.set(f, Status.DETECTED)
+                self.dropped[self.faults.fault(f)] = fault
+                detected.append(self.faults.fault(f))
+        if self.debug and detected: print(f"{color.OKCYAN}Dropped {detected} - detected by vector for {fault}{color.ENDC}")
+        # A redundant fault was proven untestable - a vector detecting one means the search is wrong, not the fault
+        if self.debug:
+            for f in self.faults.ids(Status.REDUNDANT):
+                site, stuck, branch = self.faults.locate(f)
+                if self.fsim.fault_word(good, site, stuck, 1, branch):
+                    print(f"{color.FAIL}{self.faults.fault(f)} was marked redundant, but the vector for {fault} detects it{color.ENDC}")
+        return detected
+
+    def _solve_parallel(self, targets: List[int], workers: int):
+        """
+        Shard the fault list over a process pool. The engine is sent to each worker once (initializer),
+        and imap keeps results in fault-list order so the merge is deterministic.
+        """
+        targets = [f for f in targets if self.faults.status[f] == Status.UNDETECTED]
+        if not targets:
+            return
+        workers = min(workers, len(targets))
+        chunksize = max(1, len(targets) // (workers * 4))
+        with mp.Pool(workers, initializer = _init_worker, initargs = (self,)) as pool:
+            yield from pool.imap(_generate_worker, targets, chunksize)
     
     def refine_solutions(self):
         """
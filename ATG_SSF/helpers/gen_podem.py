@@ -0,0 +1,229 @@
+from .helpers import color
+from .circuit import CompiledCircuit, Op, Logic5 as L, eval5
+from .gen_d_algo import DAlgorithm, ABORTED
+from typing import Dict, List, Optional, Tuple, Union
+from heapq import heappop, heappush
+
+# This modular file contains logic for generating test vectors with PODEM (Path-Oriented DEcision Making)
+# Decisions are made on primary inputs only: each objective is backtraced to a PI, and the PI assignment is
+# implied by forward 5-valued simulation. Inputs (fault list) and outputs (solutions / refined vectors) match
+# DAlgorithm, so the menu and reporting work with either engine.
+
+class PODEM(DAlgorithm):
+    name = "PODEM"
+
+    def __init__(self, netlist: Dict[str, Dict], graph, fault_list, debug: bool = False, circuit: Optional[CompiledCircuit] = None, **options):
+        # Learned implications feed backward implication, which PODEM does not do
+        if options.pop("learn", False): raise ValueError("Static learning needs the D-Algorithm - PODEM does no backward implication.")
+        super().__init__(netlist, graph, fault_list, debug, circuit, **options)
+        self.pi_good = L.X # good value of a PI fault site, kept apart from its faulted value
+        self.required: List[Tuple[int, int]] = [] # dominator side inputs for the current fault
+
+    # --- IMPLICATION (forward 5-valued simulation) ---
+    def _eval(self, g: int) -> int:
+        """
+        Value of gate g from its inputs, with the target fault applied at the fault site
+        """
+        cc = self.circuit
+        vals = self.values
+        if cc.ops[g] == Op.PI:
+            v = vals[g] if g != self.site else self.pi_good
+        else:
+            v = eval5(cc.ops[g], (vals[src] for src in self.gate_ins[g]))
+        if g == self.site:
+            # Good value at the site meets the stuck-at value
+            if v == L.X:
+                return L.X
+            good = L.PAIRS[v][0]
+            return L.from_pair(good, self.stuck)
+        return v
+
+    def imply(self, root: int):
+        """
+        Event-driven forward simulation from a changed PI - every change goes through the trail
+        """
+        cc = self.circuit
+        vals = self.values
+        trail = self.trail
+        heap = [root]
+        queued = {root}
+        while heap:
+            g = heappop(heap)
+            v = self._eval(g)
+            old = vals[g]
+            if v != old:
+                trail.append((g, old))
+                vals[g] = v
+                self._changed(g, old)
+            elif g != root:
+                continue # no event - fanout is unaffected
+            for fo in cc.fanouts(g):
+                if fo not in queued:
+                    queued.add(fo)
+                    heappush(heap, fo)
+
+    def assign_pi(self, pi: int, val: int):
+        if pi == self.site:
+            self.pi_good = val
+        else:
+            self._record(pi, val)
+        self.imply(pi)
+
+    def _record(self, g: int, v: int):
+        old = self.values[g]
+        self.trail.append((g, old))
+        self.values[g] = v
+        self._changed(g, old)
+
+    def _changed(self, g: int, old: int):
+        """
+        Bookkeeping after line g changes from old. D-frontier membership hangs on a gate's own X and on an error
+        at its inputs, so the fanout is only revisited when g gains or loses an error.
+        """
+        cc = self.circuit
+        v = self.values[g]
+        err = v in (L.D, L.DB)
+        was_err = old in (L.D, L.DB)
+        if err != was_err:
+            if cc.po_mask[g]:
+                self.po_errors += err - was_err
+            for fo in cc.fanouts(g):
+                self._update_frontiers(fo)
+        if v == L.X:
+            self._update_frontiers(g)
+        else:
+            self.d_frontier.discard(g)
+
+    def _update_frontiers(self, g: int):
+        """
+        D-frontier membership of gate g - PODEM never justifies backward, so there is no J-frontier
+        """
+        vals = self.values
+        if vals[g] == L.X and self.circuit.ops[g] != Op.PI and any(vals[x] in (L.D, L.DB) for x in self.gate_ins[g]):
+            self.d_frontier.add(g)
+        else:
+            self.d_frontier.discard(g)
+
+    # --- OBJECTIVE / BACKTRACE ---
+    def objective(self) -> Optional[Tuple[int, int]]:
+        """
+        Next (line, value) goal - excite the fault, then drive the D-frontier. None means this branch cannot succeed.
+        """
+        cc = self.circuit
+        site_val = self.values[self.site]
+        if site_val == L.X:
+            return self.site, 1 - self.stuck
+        if site_val not in (L.D, L.DB):
+            return None # fault site forced to the stuck-at value - not excitable
+        # Side inputs of the dominators - any other value blocks every path to a PO
+        for line, nc in self.required:
+            if self.values[line] == L.X:
+                return line, nc
+            if self.values[line] != nc:
+                return None
+        for g in self.get_D_frontier():
+            nc = 0 if cc.ops[g] == Op.XOR else 1 - cc.ctrl[g]
+            untried = [src for src in self.gate_ins[g] if self.values[src] == L.X]
+            if untried:
+                # Every input must be non-controlling - settle the hardest one first
+                return max(untried, key = lambda src: self.scoap.cc(src, nc)), nc
+        return None
+
+    def backtrace(self, line: int, val: int) -> Tuple[int, int]:
+        """
+        Walk an objective back through X lines to a PI, inverting through inverting gates.
+        SCOAP picks the input - easiest to control when one input sets the output, hardest when all must.
+        """
+        cc = self.circuit
+        vals = self.values
+        scoap = self.scoap
+        while cc.ops[line] != Op.PI:
+            op = cc.ops[line]
+            untried = [src for src in self.gate_ins[line] if vals[src] == L.X]
+            if not untried:
+                break
+            if op == Op.XOR:
+                # Parity of the known inputs decides what the X input must supply
+                for src in self.gate_ins[line]:
+                    if vals[src] in (L.V0, L.V1):
+                        val ^= vals[src]
+                nxt = min(untried, key = lambda src: min(scoap.cc0[src], scoap.cc1[src]))
+            else:
+                if cc.inv[line]:
+                    val = 1 - val
+                if val == cc.ctrl[line]:
+                    nxt = min(untried, key = lambda src: scoap.cc(src, val))
+                else:
+                    nxt = max(untried, key = lambda src: scoap.cc(src, val))
+            line = nxt
+        return line, val
+
+    # --- SEARCH ---
+    def generate(self, wire: str, stuck_val: int, fixed: Optional[Dict[str, int]] = None,
+                 require: Optional[Dict[str, int]] = None) -> Optional[Dict]:
+        """
+        Generate a test for a single fault with PODEM - returns the final assignment, None if no test exists,
+        or ABORTED if the search budget ran out first.
+        fixed: PI values the test must keep (dynamic compaction) - applied up front, never backtracked.
+        require: fault-free line values the test must also hold (a fanout-branch fault on the gate it feeds).
+        """
+        branch = self.branch_fault(wire, stuck_val)
+        if branch is not None:
+            return self.generate_branch(branch, fixed)
+        if self.debug: print(f"\n\n\n{color.OKGREEN}PODEM: processing fault at {wire} stuck-at-{stuck_val}{color.ENDC}")
+        cc = self.circuit
+        self._reset() # only the lines the previous fault touched
+        self.site = cc.index[wire]
+        self.stuck = stuck_val
+        self.pi_good = L.X
+        # Unique sensitization requirements become objectives ahead of the D-frontier
+        self.required = self.dominators.unique_sensitization(self.site, self._fanout_cone(self.site))
+        if self.required is None:
+            return None
+        self.required += [(cc.index[line], v) for line, v in (require or {}).items()]
+        for name, val in (fixed or {}).items():
+            self.assign_pi(cc.index[name], val)
+        # Decision stack of (PI, value, already flipped, trail length and site good value before the decision)
+        stack = []
+        self.start_budget()
+        while True:
+            if self.out_of_budget():
+                if self.debug: print(f"{color.WARNING}PODEM: search budget exhausted after {self.n_decisions} decisions, {self.n_backtracks} backtracks{color.ENDC}")
+                return ABORTED
+            if self.error_at_PO() and all(self.values[line] == v for line, v in self.required):
+                return self._result()
+            obj = self.objective()
+            if obj is not None:
+                pi, val = self.backtrace(*obj)
+                if cc.ops[pi] == Op.PI and self._pi_val(pi) == L.X:
+                    if self.debug: print(f"PODEM: objective {cc.names[obj[0]]}={obj[1]} -> {cc.names[pi]}={val}")
+                    stack.append((pi, val, False, len(self.trail), self.pi_good))
+                    self.n_decisions += 1
+                    self.assign_pi(pi, val)
+                    continue
+            # Backtrack - flip the most recent unflipped decision in place, undoing flipped ones on the way
+            while stack:
+                pi, val, flipped, mark, pi_good = stack.pop()
+                if not flipped:
+                    stack.append((pi, 1 - val, True, mark, pi_good))
+                    self.n_backtracks += 1
+                    self.assign_pi(pi, 1 - val)
+                    break
+                self._undo(mark)
+                self.pi_good = pi_good
+            else:
+                return None
+
+    def _pi_val(self, pi: int) -> int:
+        return self.pi_good if pi == self.site else self.values[pi]
+
+    def _result(self) -> Dict[str, Union[int, str]]:
+        """
+        Assignment in DAlgorithm format - unassigned PIs are don't cares
+        """
+        cc = self.circuit
+        res = {name: L.SYMBOLS[v] for name, v in zip(cc.names, self.values)}
+        for pi in cc.pis:
+            if self._pi_val(pi) == L.X:
+                res[cc.names[pi]] = "DC"
+        return res
@@ -0,0 +1,132 @@
+from .helpers import color
+from .circuit import CompiledCircuit, Op, Logic5 as L, eval5
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# This modular file contains SOCRATES-style static learning of global implications
+# Each value is assigned to each line in turn and implied through the fault-free circuit with local (per-gate)
+# forward and backward implication. For every implied (line, value) the contrapositive is recorded, unless local
+# implication already finds it - these are the indirect implications, typically through reconvergent fanout.
+
+# Implications learned per (line, value) - bounds the learning pass's memory on large circuits
+MAX_LEARNED = 256
+
+class StaticLearning:
+    def __init__(self, circuit: CompiledCircuit, debug: bool = False):
+        self.circuit = circuit
+        self.debug = debug
+        self.gate_ins = [tuple(circuit.fanins(g)) for g in range(circuit.n)]
+        # Implication index: entry 2 * line + value lists the learned (line, value) implications of that assignment
+        self.index: List[List[Tuple[int, int]]] = [[] for _ in range(2 * circuit.n)]
+        # Lines whose assignment to a value conflicts on its own - constant in the fault-free circuit
+        self.constants: Dict[int, int] = {}
+        self.learned = 0
+        self._values = [L.X] * circuit.n
+
+    def implications(self, g: int, v: int) -> List[Tuple[int, int]]:
+        return self.index[2 * g + v]
+
+    # --- LOCAL IMPLICATION ---
+    def imply(self, g: int, v: int) -> Optional[Dict[int, int]]:
+        """
+        Lines implied by g = v through local implication, or None if the assignment conflicts
+        """
+        cc = self.circuit
+        vals = self._values
+        vals[g] = v
+        changed = [g]
+        events = deque(changed)
+        ok = True
+        while events and ok:
+            h = events.popleft()
+            for k in (h, *cc.fanouts(h)):
+                if not self._check_gate(k, changed, events):
+                    ok = False
+                    break
+        res = {line: vals[line] for line in changed}
+        for line in changed:
+            vals[line] = L.X
+        return res if ok else None
+
+    def _check_gate(self, g: int, changed: List[int], events: deque) -> bool:
+        cc = self.circuit
+        op = cc.ops[g]
+        if op == Op.PI:
+            return True
+        vals = self._values
+        ins = self.gate_ins[g]
+        out = vals[g]
+        res = eval5(op, (vals[x] for x in ins))
+        # Forward
+        if res != L.X:
+            if out == L.X:
+                vals[g] = res
+                changed.append(g)
+                events.append(g)
+                return True
+            return res == out
+        if out == L.X:
+            return True
+        # Backward - an X input whose other value would contradict the output is implied
+        for k, x in enumerate(ins):
+            if vals[x] != L.X:
+                continue
+            possible = [
+                test for test in (L.V0, L.V1)
+                if eval5(op, (test if j == k else vals[y] for j, y in enumerate(ins))) in (L.X, out)
+            ]
+            if not possible:
+                return False
+            if len(possible) == 1:
+                vals[x] = possible[0]
+                changed.append(x)
+                events.append(x)
+        return True
+
+    # --- LEARNING ---
+    def run(self) -> int:
+        """
+        Learn the indirect implications of every line / value pair. Returns the number learned.
+        No assignment's implications are kept past its own step, so memory stays linear in the circuit: each
+        contrapositive is filed as a candidate under the assignment it starts from (at most MAX_LEARNED per
+        assignment), and is checked against that assignment's local implications when they are computed.
+        Candidates reached backward, onto lines already processed, are checked in a second pass.
+        """
+        n = self.circuit.n
+        candidates: List[List[Tuple[int, int]]] = [[] for _ in range(2 * n)]
+        late = bytearray(2 * n)
+        for g in range(n):
+            for v in (L.V0, L.V1):
+                imps = self.imply(g, v)
+                self._keep(2 * g + v, candidates, imps)
+                if imps is None:
+                    self.constants[g] = 1 - v
+                    continue
+                for b, w in imps.items():
+                    # Contrapositive: b = not w implies g = not v
+                    key = 2 * b + 1 - w
+                    if b != g and len(candidates[key]) + len(self.index[key]) < MAX_LEARNED:
+                        candidates[key].append((g, 1 - v))
+                        if b < g: late[key] = 1
+        for key in range(2 * n):
+            if late[key] and candidates[key]:
+                self._keep(key, candidates, self.imply(key // 2, key % 2))
+        if self.debug:
+            names = self.circuit.names
+            for key, imps in enumerate(self.index):
+                if imps: print(f"Learned: {names[key // 2]}={key % 2} -> {[(names[b], w) for b, w in imps]}")
+        return self.learned
+
+    def _keep(self, key: int, candidates: List[List[Tuple[int, int]]], imps: Optional[Dict[int, int]]):
+        """
+        Learn the candidates of assignment key that its local implications imps miss - none if it conflicts
+        """
+        if imps is not None:
+            kept = [(g, u) for g, u in candidates[key] if imps.get(g) != u]
+            self.index[key] += kept
+            self.learned += len(kept)
+        candidates[key].clear()
+
+    # CLI Styling for summarizing the learning pass
+    def print_summary(self):
+        print(f"\n\t{color.OKCYAN}Static learning: {self.learned} indirect implication(s), {len(self.constants)} constant line(s).{color.ENDC}")
@@ -0,0 +1,132 @@
+from .helpers import color
+from .circuit import CompiledCircuit, Op
+from typing import Iterable, List, Sequence, Union
+
+# This modular file contains logic for bit-parallel (pattern-parallel) logic simulation
+# Every signal holds one Python int per word, where bit k is the signal's value under pattern k,
+# so each gate is evaluated once per word with bitwise AND / OR / XOR instead of once per vector
+
+# Default number of patterns packed into one word - Python ints are arbitrary width
+WORD_SIZE = 1024
+
+# Fn for reading vectors from a file (or taking them as-is from an array)
+def read_vectors(source: Union[str, Iterable[Sequence]], n_pis: int, fill: int = 0) -> List[List[int]]:
+    """
+    Read test vectors, one per line, with PI values in circuit PI order.
+    A line is either a packed bit string ('01101') or separated tokens ('0 1 1 0 1' / '0,1,1,0,1').
+    'X', 'DC' and '-' entries are don't cares and are replaced with fill. '$' starts a comment.
+    """
+    if isinstance(source, str):
+        with open(source, "r") as f:
+            rows = [line.split('$')[0].strip() for line in f]
+        rows = [row for row in rows if row]
+    else:
+        rows = list(source)
+
+    vectors = []
+    for num, row in enumerate(rows, start=1):
+        if isinstance(row, str):
+            tokens = row.replace(',', ' ').split()
+            if len(tokens) == 1 and len(tokens[0]) == n_pis:
+                tokens = list(tokens[0])
+        else:
+            tokens = list(row)
+        if len(tokens) != n_pis:
+            raise ValueError(f"Vector {num} has {len(tokens)} values, expected {n_pis}.")
+        vec = []
+        for tok in tokens:
+            if tok in (0, 1, '0', '1'):
+                vec.append(int(tok))
+            elif str(tok).upper() in ('X', 'DC', '-'):
+                vec.append(fill)
+            else:
+                raise ValueError(f"Vector {num} has invalid value '{tok}'.")
+        vectors.append(vec)
+    return vectors
+
+# Fn for packing a slice of vectors into one word per PI
+def pack_vectors(vectors: Sequence[Sequence[int]], n_pis: int, start: int = 0, count: int = None) -> List[int]:
+    """
+    Bit k of word p is the value of PI p in vectors[start + k]
+    """
+    end = len(vectors) if count is None else min(len(vectors), start + count)
+    chunk = vectors[start:end][::-1] # highest bit first for int(..., 2)
+    if not chunk:
+        return [0] * n_pis
+    return [int(''.join('1' if vec[p] else '0' for vec in chunk), 2) for p in range(n_pis)]
+
+# Fn for evaluating one gate over a word of patterns
+def eval_gate_word(op: int, words: Iterable[int], mask: int) -> int:
+    words = iter(words)
+    v = next(words)
+    if op == Op.AND or op == Op.NAND:
+        for w in words:
+            v &= w
+    elif op == Op.OR or op == Op.NOR:
+        for w in words:
+            v |= w
+    else:
+        for w in words:
+            v ^= w
+    if op == Op.NAND or op == Op.NOR:
+        v ^= mask
+    return v
+
+class ParallelSim:
+    def __init__(self, circuit: CompiledCircuit, word_size: int = WORD_SIZE, debug: bool = False):
+        self.circuit = circuit
+        self.word_size = word_size
+        self.debug = debug
+        # Flatten CSR fanin into per-gate tuples once - cheaper to walk in the inner loop
+        self.gate_ins = [tuple(circuit.fanins(g)) for g in range(circuit.n)]
+        self.vectors = []
+        self.responses = []
+
+    def eval_words(self, pi_words: Sequence[int], mask: int) -> List[int]:
+        """
+        Evaluate every gate once for one word of patterns. Returns the word for every gate.
+        mask has one set bit per valid pattern in the word.
+        """
+        cc = self.circuit
+        ops = cc.ops
+        vals = [0] * cc.n
+        for k, pi in enumerate(cc.pis):
+            vals[pi] = pi_words[k] & mask
+        for g, ins in enumerate(self.gate_ins):
+            op = ops[g]
+            if op == Op.PI:
+                continue
+            vals[g] = eval_gate_word(op, map(vals.__getitem__, ins), mask)
+        return vals
+
+    def simulate(self, vectors: Sequence[Sequence[int]]) -> List[List[int]]:
+        """
+        Simulate all vectors, word by word. Returns the PO response for every vector.
+        """
+        cc = self.circuit
+        n_pis = len(cc.pis)
+        self.vectors = vectors
+        self.responses = [[] for _ in vectors]
+        for start in range(0, len(vectors), self.word_size):
+            count = min(self.word_size, len(vectors) - start)
+            mask = (1 << count) - 1
+            vals = self.eval_words(pack_vectors(vectors, n_pis, start, count), mask)
+            # Unpack PO words back into per-vector responses
+            for po in cc.pos:
+                bits = format(vals[po], f"0{count}b")[::-1]
+                for bit in range(count):
+                    self.responses[start + bit].append(1 if bits[bit] == '1' else 0)
+        if self.debug: print(f"Simulated {len(vectors)} vectors in {-(-len(vectors) // self.word_size)} word(s)")
+        return self.responses
+
+    # CLI Styling for displaying PO responses per vector
+    def print_responses(self):
+        cc = self.circuit
+        pi_names = [cc.names[g] for g in cc.pis]
+        po_names = [cc.names[g] for g in cc.pos]
+        print(f"\n{color.HEADER}{color.BOLD}Bit-Parallel Simulation Results:{color.ENDC}\n")
+        print(f"{color.BOLD}{color.UNDERLINE}{'#':<6} | {' '.join(pi_names)} | {' '.join(po_names)}{color.ENDC}")
+        for idx, (vec, resp) in enumerate(zip(self.vectors, self.responses)):
+            pi_str = ' '.join(f"{v:<{len(n)}}" for v, n in zip(vec, pi_names))
+            po_str = ' '.join(f"{v:<{len(n)}}" for v, n in zip(resp, po_names))
+            print(f"{idx:<6} | {pi_str} | {po_str}")
@@ -1,65 +1,110 @@
-from typing import Tuple, Dict
-from .helpers import Graph
+from typing import Tuple, Dict, Iterable, Iterator, Union
+from .helpers import Graph, color
+from .circuit import CompiledCircuit, Op, compile_circuit
 import json
+import mmap
+import os
 
 # This modular file contains the logic for defining the "gates" and "graph" attributes for the circuit
 
-def decomp_file(file_lines: list[str]):
+# Fn for streaming a netlist file one line at a time through a memory map - the file text is never held
+def read_netlist(fname: str) -> Iterator[str]:
+    with open(fname, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return # an empty file cannot be mapped
+        with mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                yield line.decode("utf-8", errors = "replace")
+
+def decomp_file(file_lines: Iterable[str]):
     """
     Decomposes the netlist file lines into a gate list, with circuit level 
     Begins by stripping + removing comments, then parsing each line into components.
     We aren't trusting the 'primary input' / 'primary output' comment markers-
     instead, we will identify PIs and POs based on graph.
     The one assumption is that each gate line is {Output}, {Gate Type}, {Input1}, {Input2}...
+    Lines are consumed one at a time (file_lines may be a stream), and malformed entries are reported by line number.
     """
-    # Decompose lines in the file using list comprehension
-    # Specifically, reduce each line into gate name, type, and inputs
-    decomp_lines = (
-        parts
-        for line in (
-            line.split('$')[0].strip()
-            for line in file_lines
-            if line and not line.startswith('$')
-        )
-        if (parts := [part.strip() for part in line.split(' ') if part.strip()]) and len(parts) >= 4
-    )
-    # Structure these four pieces of info into a "gate" object
-    gates = {
-        p[0]: {
-            "type": p[1].upper(),
-            "inputs": p[2:],
+    gates = {}
+    # One string object per net name, however many times it is referenced
+    names = {}
+    for num, line in enumerate(file_lines, start = 1):
+        # Reduce each line into gate name, type, and inputs
+        parts = line.split('$')[0].split()
+        if len(parts) <= 1:
+            continue # blank, comment, or bare net name (PI / PO marker)
+        if len(parts) < 4:
+            print(f"{color.WARNING}Line {num}: skipping '{' '.join(parts)}' - gate lines need a type and at least two inputs.{color.ENDC}")
+            continue
+        out, gtype, inps = parts[0], parts[1].upper(), parts[2:]
+        if gtype not in Op.NAMES or gtype == "PI":
+            raise ValueError(f"Line {num}: unsupported gate type '{parts[1]}' for gate '{out}'.")
+        out = names.setdefault(out, out)
+        if out in gates:
+            raise ValueError(f"Line {num}: gate '{out}' is defined more than once.")
+        # Structure these pieces of info into a "gate" object
+        gates[out] = {
+            "type": gtype,
+            "inputs": [names.setdefault(inp, inp) for inp in inps],
             "level": None
         }
-        for p in decomp_lines
-    }
     
-    # Get Primary Inputs and Primary Outputs
+    # Get Primary Inputs - anything used as an input but never driven
     outps = set(gates.keys())
-    inps = set(inp for g in gates.values() for inp in g["inputs"])
-    PIs = inps - outps
-    POs = outps - inps
+    PIs = set(inp for g in gates.values() for inp in g["inputs"]) - outps
     
     # Manually set type of PIs to "PI"
     [gates.update({pi: {"type": "PI", "inputs": [], "level": 0}}) for pi in PIs]
     
     # Define level for each gate, s.t. gates further from input have higher levels
-    def level(gate):
-        if gates[gate]["level"] is not None:
-            return gates[gate]["level"]
-        if gate in PIs:
-            gates[gate]["level"] = 0
-        else:
-            gates[gate]["level"] = 1 + max(level(inp) for inp in gates[gate]["inputs"])
-        return gates[gate]["level"]
-    [level(gate) for gate in gates]
+    # Kahn-style: a gate is leveled once all of its inputs are, so deep netlists never recurse
+    fanouts = {g: [] for g in gates}
+    pending = {}
+    for g, info in gates.items():
+        for inp in info["inputs"]:
+            fanouts[inp].append(g)
+        pending[g] = len(info["inputs"])
+    ready = [g for g in gates if pending[g] == 0]
+    max_level = 0
+    leveled = 0
+    while ready:
+        g = ready.pop()
+        leveled += 1
+        info = gates[g]
+        # Fanout counts and the PO set come out of the same pass
+        info["fanout"] = len(fanouts[g])
+        info["level"] = 1 + max(gates[inp]["level"] for inp in info["inputs"]) if info["inputs"] else 0
+        max_level = max(max_level, info["level"])
+        for fo in fanouts[g]:
+            pending[fo] -= 1
+            if pending[fo] == 0:
+                ready.append(fo)
+    if leveled != len(gates):
+        raise ValueError(f"Combinational cycle through gates: {' -> '.join(find_cycle(gates, pending))}.")
+    POs = [g for g, info in gates.items() if info["fanout"] == 0 and info["type"] != "PI"]
     
     # Manually set Primary Output gate levels to the max - for ID-ing later
-    max_level = max(g["level"] for g in gates.values())
     [gates[po].update({"level": max_level}) for po in POs]
     
     # Sort first by level, then alphabetically & return
     return dict(sorted(gates.items(), key=lambda item: (item[1]["level"], item[0])))
 
+# Fn for naming the gates on one combinational cycle, for the error message
+def find_cycle(gates: Dict[str, dict], pending: Dict[str, int]) -> list[str]:
+    """
+    Walk backward through unleveled inputs from an unleveled gate - every unleveled gate has one,
+    so the walk must revisit a gate, and the revisited stretch is a cycle
+    """
+    g = next(g for g, n in pending.items() if n > 0)
+    path, seen = [], {}
+    while g not in seen:
+        seen[g] = len(path)
+        path.append(g)
+        g = next(inp for inp in gates[g]["inputs"] if pending[inp] > 0)
+    cycle = path[seen[g]:]
+    # path follows inputs - reverse it so the cycle reads in signal direction
+    return cycle[::-1] + [cycle[-1]]
+
 # Logic for converting "gates" array into a edge list for graphing
 def get_edge_list(gates: Dict[str, dict]) -> list[Tuple[str, str]]:
     """
@@ -71,16 +116,20 @@ def get_edge_list(gates: Dict[str, dict]) -> list[Tuple[str, str]]:
             edge_list.append((inp, output))
     return edge_list
 
-# High level fn for menu item [0]
-def process_netlist(file_lines: list[str]) -> Tuple[Dict[str, dict], Graph]:
+# High level fn for menu item [0] - source is a netlist file path (streamed) or an iterable of its lines
+def process_netlist(source: Union[str, Iterable[str]]) -> Tuple[Dict[str, dict], Graph, CompiledCircuit]:
     # Get gates
-    gates = decomp_file(file_lines)
+    gates = decomp_file(read_netlist(source) if isinstance(source, str) else source)
+    if not gates: raise ValueError("No gates found in the netlist.")
     # Get edgelist for graph
     edge_list = get_edge_list(gates)
     
     # Get custom-class based graph, as we want to be sure we don't make networkx required ('optional feature')
     circuit_graph = Graph(edge_list)
+    
+    # Get compiled, integer-indexed circuit shared by the engines
+    circuit = compile_circuit(gates)
 
-    return gates, circuit_graph
+    return gates, circuit_graph, circuit
     
     
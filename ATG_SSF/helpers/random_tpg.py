@@ -0,0 +1,76 @@
+from .helpers import color
+from .circuit import CompiledCircuit
+from .fault_sim import FaultSim
+from .fault_list import FaultList
+from typing import Dict, List, Sequence, Tuple, Union
+
+Key = Union[int, Tuple[str, int]]
+import random
+
+# This modular file contains the random-pattern test generation phase that runs before deterministic ATPG
+# Pseudo-random vectors are generated a batch (one bit-parallel word) at a time and fault simulated,
+# only the vectors that detect new faults are kept, and generation stops once a batch stops paying off
+# Faults are keyed by their id when the shared FaultList is given, else by their (line, stuck value) name
+
+# Defaults for the random phase
+BATCH_SIZE = 64     # patterns per batch (one word)
+MIN_GAIN = 0.01     # stop once a batch detects less than this fraction of the fault list
+MAX_BATCHES = 256   # hard cap on batches
+
+class RandomPatternGen:
+    def __init__(self, circuit: CompiledCircuit, faults: Union[FaultList, Sequence[Tuple[str, int]]], seed: int = 0, batch_size: int = BATCH_SIZE,
+                 min_gain: float = MIN_GAIN, max_batches: int = MAX_BATCHES, debug: bool = False):
+        self.circuit = circuit
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.min_gain = min_gain
+        self.max_batches = max_batches
+        self.debug = debug
+        self.fsim = FaultSim(circuit, [], word_size = batch_size)
+        # (key, site, stuck value, branch) per fault - a shared fault list contributes its still undetected faults
+        if isinstance(faults, FaultList):
+            self.sites = [(f, *faults.locate(f)) for f in faults.undetected()]
+        else:
+            self.sites = [(fault, *self.fsim.locate(fault)) for fault in faults]
+        self.faults: List[Key] = [s[0] for s in self.sites]
+        # Kept vectors, and for each one the faults it was the first to detect
+        self.vectors: List[List[int]] = []
+        self.detects: List[List[Key]] = []
+
+    def run(self) -> Dict[Key, int]:
+        """
+        Generate random batches until the coverage gain per batch drops below min_gain.
+        Returns detected fault -> index of the kept vector that detects it.
+        """
+        cc = self.circuit
+        n_pis = len(cc.pis)
+        mask = (1 << self.batch_size) - 1
+        detected: Dict[Key, int] = {}
+        for batch in range(self.max_batches):
+            remaining = [s for s in self.sites if s[0] not in detected]
+            if not remaining:
+                break
+            # One random word per PI is one batch of patterns
+            pi_words = [self.rng.getrandbits(self.batch_size) for _ in range(n_pis)]
+            good = self.fsim.psim.eval_words(pi_words, mask)
+            # Credit each newly detected fault to the first pattern in the batch that detects it
+            first_hits: Dict[int, List[Key]] = {}
+            for fault, site, stuck, branch in remaining:
+                word = self.fsim.fault_word(good, site, stuck, mask, branch)
+                if word:
+                    first_hits.setdefault((word & -word).bit_length() - 1, []).append(fault)
+            # Keep only the patterns that detect something new
+            for bit in sorted(first_hits):
+                for fault in first_hits[bit]:
+                    detected[fault] = len(self.vectors)
+                self.vectors.append([(pi_words[p] >> bit) & 1 for p in range(n_pis)])
+                self.detects.append(first_hits[bit])
+            gain = sum(len(v) for v in first_hits.values()) / len(self.faults)
+            if self.debug: print(f"Random batch {batch}: {len(first_hits)} vector(s) kept, gain {gain:.3f}")
+            if gain < self.min_gain:
+                break
+        return detected
+
+    # CLI Styling for summarizing the random phase
+    def print_summary(self, detected: Dict[Key, int]):
+        print(f"\n\t{color.OKCYAN}Random phase: {len(self.vectors)} vector(s) kept, {len(detected)}/{len(self.faults)} fault(s) detected.{color.ENDC}")
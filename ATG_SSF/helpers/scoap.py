@@ -0,0 +1,102 @@
+from .helpers import color
+from .circuit import CompiledCircuit, Op
+from typing import Dict, List
+
+# This modular file contains SCOAP (Sandia Controllability/Observability Analysis Program) testability measures
+# Combinational 0/1-controllability is computed forward from the PIs, observability backward from the POs,
+# once per circuit. The ATPG engines use the scores to order their decisions, and they can be printed as a report.
+
+class SCOAP:
+    def __init__(self, circuit: CompiledCircuit, debug: bool = False):
+        self.circuit = circuit
+        self.debug = debug
+        n = circuit.n
+        # CC0 / CC1: effort to set a line to 0 / 1. CO: effort to observe a line at some PO
+        self.cc0: List[int] = [0] * n
+        self.cc1: List[int] = [0] * n
+        self.co: List[int] = [0] * n
+        self.controllability()
+        self.observability()
+
+    def cc(self, g: int, v: int) -> int:
+        return self.cc1[g] if v else self.cc0[g]
+
+    # --- CONTROLLABILITY (forward, topological order) ---
+    def controllability(self):
+        cc = self.circuit
+        cc0, cc1 = self.cc0, self.cc1
+        for g in range(cc.n):
+            op = cc.ops[g]
+            if op == Op.PI:
+                cc0[g] = cc1[g] = 1
+                continue
+            ins = cc.fanins(g)
+            if op == Op.XOR:
+                # Fold the parity pairwise - cheapest way to reach an even / odd number of 1s
+                even, odd = cc0[ins[0]], cc1[ins[0]]
+                for x in ins[1:]:
+                    even, odd = min(even + cc0[x], odd + cc1[x]), min(even + cc1[x], odd + cc0[x])
+                cc0[g], cc1[g] = even + 1, odd + 1
+                continue
+            # One controlling input sets the output, all inputs must be non-controlling for the other value
+            c = cc.ctrl[g]
+            ctrl_cost = min(self.cc(x, c) for x in ins) + 1
+            nc_cost = sum(self.cc(x, 1 - c) for x in ins) + 1
+            out_c = c ^ cc.inv[g] # output value when an input is controlling
+            if out_c:
+                cc1[g], cc0[g] = ctrl_cost, nc_cost
+            else:
+                cc0[g], cc1[g] = ctrl_cost, nc_cost
+        if self.debug: print(f"SCOAP controllability: {[(cc.names[g], cc0[g], cc1[g]) for g in range(cc.n)]}")
+
+    # --- OBSERVABILITY (backward, reverse topological order) ---
+    def observability(self):
+        cc = self.circuit
+        co = self.co
+        inf = float("inf")
+        for g in range(cc.n - 1, -1, -1):
+            if cc.is_po(g):
+                co[g] = 0
+            else:
+                # A fanout stem is as observable as its most observable branch
+                co[g] = min(
+                    (self.input_co(fo, k) for fo in set(cc.fanouts(g)) for k, x in enumerate(cc.fanins(fo)) if x == g),
+                    default = inf,
+                )
+        if self.debug: print(f"SCOAP observability: {[(cc.names[g], co[g]) for g in range(cc.n)]}")
+
+    def input_co(self, g: int, k: int) -> int:
+        """
+        Observability of gate g's k-th input - g observable, with every other input at its non-controlling value
+        """
+        cc = self.circuit
+        others = [x for j, x in enumerate(cc.fanins(g)) if j != k]
+        if cc.ops[g] == Op.XOR:
+            side = sum(min(self.cc0[x], self.cc1[x]) for x in others)
+        else:
+            side = sum(self.cc(x, 1 - cc.ctrl[g]) for x in others)
+        return self.co[g] + side + 1
+
+    # --- REPORT ---
+    def report(self) -> List[Dict[str, object]]:
+        cc = self.circuit
+        return [
+            {"line": cc.names[g], "type": cc.type_name(g), "cc0": self.cc0[g], "cc1": self.cc1[g],
+             "co": self.co[g] if self.co[g] != float("inf") else None}
+            for g in range(cc.n)
+        ]
+
+    # CLI Styling for the testability report
+    def print_report(self):
+        print(f"\n{color.HEADER}{color.BOLD}SCOAP Testability:{color.ENDC}\n")
+        print(f"{color.BOLD}{color.UNDERLINE}{'Line':<10} | {'Type':<5} | {'CC0':>5} | {'CC1':>5} | {'CO':>5}{color.ENDC}")
+        for row in self.report():
+            co = "-" if row["co"] is None else row["co"]
+            print(f"{row['line']:<10} | {row['type']:<5} | {row['cc0']:>5} | {row['cc1']:>5} | {co:>5}")
+        # Hardest lines first - the likeliest sources of aborted or long searches
+        hard = sorted(
+            (r for r in self.report() if r["co"] is not None),
+            key = lambda r: max(r["cc0"], r["cc1"]) + r["co"], reverse = True,
+        )[:5]
+        if hard:
+            print(f"\n{color.WARNING}Hardest to test: {', '.join(r['line'] for r in hard)}{color.ENDC}")
@@ -1,22 +1,34 @@
 from .fault_collapse import Faults
-from .helpers import color, Graph, GateOps
+from .helpers import color, Graph
+from .circuit import CompiledCircuit
+from .event_sim import EventSim
+from .fault_classes import parse_branch
+from typing import Dict, Optional
 
 # This modular file contains logic for Simulating the circuit given an input and injected faults
 # This process works by prompting the user for each input, and leverages "healthy" and "faulty" versions of the circuit
 
 class Simulate:
-    def __init__(self, gates, graph: Graph, faults: Faults, en_feat: bool = False, debug: bool = False):
+    def __init__(self, gates, graph: Graph, faults: Faults, en_feat: bool = False, debug: bool = False, circuit: Optional[CompiledCircuit] = None,
+                 inputs: Optional[Dict[str, int]] = None, chosen_faults: Optional[Dict[str, int]] = None):
         self.gates = gates
         self.graph = graph
+        self.circuit = circuit if circuit is not None else faults.circuit
         self.faults = faults
         self.en_feat = en_feat
         self.debug = debug
         self.chosen_inps = {}
         self.chosen_faults = {}
         self.sim_vals = {"faulted": {}, "healthy": {}}
+        # Event-driven engine keeps its state between the healthy and faulted runs
+        self.engine = EventSim(self.circuit, debug)
         
-        # Get user input
-        self.init_print()
+        # Get user input, unless the vector (and faults) were given programmatically
+        if inputs is None:
+            self.init_print()
+        else:
+            self.chosen_inps = {self.circuit.names[pi]: int(inputs.get(self.circuit.names[pi], 0)) for pi in self.circuit.pis}
+            self.chosen_faults = dict(chosen_faults or {})
         
         # Run "healthy" sim
         self.sim_vals["healthy"] = self.simulate(self.sim_vals["healthy"])
@@ -54,7 +66,7 @@ class Simulate:
             print(f"{color.OKGREEN}{color.BOLD}No faults will be simulated.{color.ENDC}")
             
         # Print each PI and prompt user for a 0/1 value for each
-        PIs = [gate for gate, gdata in self.gates.items() if gdata["type"] == "PI"]
+        PIs = [self.circuit.names[g] for g in self.circuit.pis]
         print(f"\n{color.HEADER}{color.BOLD}Input PI vector:{color.ENDC}")
         for pi in PIs:
             val = -1
@@ -77,96 +89,40 @@ class Simulate:
         """
         Get gates connected to a particular input
         """    
-        return [
-            gate 
-            for gate, gdata 
-            in self.gates.items() 
-            if inp in gdata["inputs"]
-        ]
+        cc = self.circuit
+        return list(dict.fromkeys(cc.names[g] for g in cc.fanouts(cc.index[inp])))
     
     def simulate(self, sim_vals: dict, sim_fault: bool = False):
         """
         Event-Driven simulation of circuit.
-        """        
-        # Set all gates to unknown
-        sim_vals = {gate_name: 'x' for gate_name in self.gates.keys()}
-        
-        # Set PIs to user specified values
-        [sim_vals.update({pi: self.chosen_inps[pi]}) for pi in self.chosen_inps.keys()]
+        Only gates downstream of changed PIs / injected faults are re-evaluated against the last run.
+        """
+        cc = self.circuit
+        # Apply PIs as a delta against the last simulated state
+        pi_changes = {cc.index[pi]: val for pi, val in self.chosen_inps.items()}
+        self.engine.apply(pi_changes = pi_changes)
         
-        # Override PIs if applicable faults are enabled
+        # Inject faults if applicable, otherwise release any left over from a previous run
+        faults = {}
+        branches = {}
         if sim_fault:
-            for gate in sim_vals.keys():
-                if self.gates[gate]["type"] == "PI" and gate in self.chosen_faults:
-                    fault_val = self.chosen_faults[gate]
-                    print(f"{color.WARNING}{color.BOLD}Injecting fault on PI '{gate}': forcing output to {fault_val}{color.ENDC}")
-                    sim_vals[gate] = ("fault", fault_val)
-        
-        # Get gates with PIs set
-        gate_list = [gate for gate in self.gates.keys()]
-        current = 0 # Start with PI 0
-    
-        # Loop gates till all values are known
-        while 'x' in sim_vals.values():
-            # Roll over - no indexing errors
-            if current >= len(gate_list):
-                # Find next unknown gate
-                for g, v in sim_vals.items():
-                    if v == 'x':
-                        current = gate_list.index(g)
-                        break
-                continue
-            # Source info for current gate
-            gate = gate_list[current]
-            gate_dat = self.gates[gate]
-            output = self.graph.get_neighbors(gate)
-            # Skip solved gates
-            if sim_vals[gate] != 'x':
-                current = gate_list.index(output[0]) if output else current + 1
-                continue
-            # Skip PI
-            if gate_dat["type"] == "PI":
-                sim_vals[gate] = self.chosen_inps[gate]
-                current = gate_list.index(output[0]) if output else current + 1 # move Greedily
-                continue
-            # Case where current gate needs to be solved
-            else: 
-                # Get current gate's input gates
-                inputs = {inp: sim_vals[inp] for inp in gate_dat["inputs"]}
-                # If current gate has unknown input, solve that input first
-                if 'x' in inputs.values():
-                    for inp_name, inp_val in inputs.items():
-                        if inp_val == 'x':
-                            # Cannot evaluate current gate, first must justify undetermined input
-                            current = gate_list.index(inp_name)
-                            break
+            for gate, fault_val in self.chosen_faults.items():
+                if gate not in cc.index:
+                    # A branch fault is seen by the one gate input it feeds - the stem and its other branches keep their value
+                    stem, g, pos = parse_branch(cc, gate)
+                    print(f"{color.WARNING}{color.BOLD}Injecting fault on branch '{gate}': gate '{cc.names[g]}' reads {fault_val} from '{cc.names[stem]}'{color.ENDC}")
+                    branches.setdefault(g, {})[pos] = fault_val
                     continue
-                # Case where current gate can be solved now
-                else:
-                    # All inputs known, evaluate gate
-                    # This method also supports n-input gates :) 
-                    gate_func = getattr(GateOps, gate_dat["type"], None)
-                    
-                    if gate_func is None:
-                        raise ValueError(f"Unsupported gate type '{gate_dat['type']}' for simulation.")
-                    eval_set = []
-
-                    # Get gate output, checking for fault
-                    for g, i in inputs.items():
-                        if isinstance(i, tuple) and i[0] == "fault":
-                            eval_set.append(i[1])
-                        else:
-                            eval_set.append(i)
-                    sim_vals[gate] = gate_func(eval_set)
-                                        
-                    # Inject fault if enabled
-                    if gate in self.chosen_faults and sim_fault:
-                        fault_val = self.chosen_faults[gate]
-                        print(f"{color.WARNING}{color.BOLD}Injecting fault on gate '{gate}': forcing output to {fault_val}{color.ENDC}")
-                        sim_vals[gate] = ("fault", fault_val)
-                        
-                    current = gate_list.index(output[0]) if output else current + 1 # Greedily move through gates
-        # Return outputs once all gate values are known
+                kind = "PI" if cc.is_pi(cc.index[gate]) else "gate"
+                print(f"{color.WARNING}{color.BOLD}Injecting fault on {kind} '{gate}': forcing output to {fault_val}{color.ENDC}")
+                faults[cc.index[gate]] = fault_val
+        self.engine.set_faults(faults, branches)
+        
+        # Return values of all gates, marking forced ones
+        sim_vals = {
+            name: ("fault", val) if g in faults else val
+            for g, (name, val) in enumerate(zip(cc.names, self.engine.values))
+        }
         return sim_vals
         
     # Method for printing simulation results from sim_vals, comparing healthy and faulted circuits
@@ -1,41 +1,42 @@
-from .helpers.proc_netlist import process_netlist
-from .helpers.fault_collapse import Faults
+from .helpers.circuit_cache import load_circuit
 from .helpers.gen_d_algo import DAlgorithm
+from .helpers.gen_podem import PODEM
 from .helpers.sim import Simulate
+from .helpers.parallel_sim import ParallelSim, read_vectors
+from .helpers.fault_sim import FaultSim
+from .helpers.scoap import SCOAP
 from .helpers.helpers import color as c
 import os
 
-# Fn for storing lines initially - not processing, but storing
-def get_file_lines(fname: str) -> list[str]:
-    file_lines = []
+# Fn for checking the netlist file up front - it is streamed when processed (Option 0), not stored
+def check_file(fname: str):
     try:
-        file_lines = [
-            line.strip() 
-            for line in open(fname, "r").readlines()
-            if line.strip()
-        ]
-    except Exception as e:
+        if os.path.getsize(fname) == 0:
+            print(f"{c.FAIL}File '{fname}' is empty.{c.ENDC}")
+            exit(1)
+    except OSError as e:
         print(f"{c.FAIL}Error reading file '{fname}': {e}{c.ENDC}")
         exit(1)
-    return file_lines
 
 # Highest level object for the project - one Menu instantiated per program usage.
 class Menu:
-    def __init__(self, fname: str, debug: bool = False):
-        # CLI - filepath and debug flag
+    def __init__(self, fname: str, debug: bool = False, workers: int = 1, use_cache: bool = True):
+        # CLI - filepath, debug flag, worker processes for test generation and whether to use the circuit cache
         self.fname = fname
         self.debug = debug
-        # Store file lines to be processed later
-        self.file_lines = get_file_lines(fname)
-        if not self.file_lines:
-            print(f"{c.FAIL}File '{fname}' is empty.{c.ENDC}")
-            exit(1)
+        self.workers = workers
+        self.use_cache = use_cache
+        # File is streamed when processed - only check that it is readable now
+        check_file(fname)
         # Initialize other attributes to None
         self.gates = None
         self.graph = None
+        self.circuit = None
         self.en_feat = False
         self.vis = None
         self.fault_list = None
+        # Collapsed fault list from processing the netlist - published by Option 1
+        self.collapsed = None
         self.d_algo = None
     
     # Method for wiping terminal
@@ -84,6 +85,58 @@ class Menu:
             except ImportError as e:
                 raise ImportError("Required packages for additional features not found. Please pip install -r ./ATG_SSF/requirements.txt.") from e
 
+    # I/O for bit-parallel simulation of a whole vector file
+    def parallel_sim(self):
+        print(f"\t{c.OKCYAN}{c.BOLD}Path to vector file (one vector per line, PIs in netlist order): {c.ENDC}", end="")
+        vpath = input().strip()
+        try:
+            vectors = read_vectors(vpath, len(self.circuit.pis))
+        except (OSError, ValueError) as e:
+            print(f"{c.FAIL}Error reading vectors '{vpath}': {e}{c.ENDC}")
+            return
+        psim = ParallelSim(self.circuit, debug = self.debug)
+        psim.simulate(vectors)
+        psim.print_responses()
+        
+        print(f"\t{c.OKGREEN}Would you like to fault simulate these vectors against the collapsed fault list? ('Y' / 'N'): {c.ENDC}", end="")
+        if input().strip().lower() == 'y':
+            fsim = FaultSim(self.circuit, self.fault_list, debug = self.debug)
+            fsim.run(vectors)
+            fsim.print_report()
+            classes = self.fault_list.classes
+            dom = FaultSim(self.circuit, self.fault_list.flist, ids = classes.dominated_ids(), debug = self.debug)
+            dom.run(vectors)
+            detected = fsim.detected_ids() + dom.detected_ids()
+            print(f"{c.OKCYAN}Fault universe coverage (every stem and branch fault): {100 * classes.coverage(detected):.2f}%{c.ENDC}")
+
+    # I/O for test generation with either engine (DAlgorithm or PODEM) - same options, same output
+    def generate_tests(self, engine):
+        if not (self.gates and self.graph and self.fault_list):
+            print(f"{c.FAIL}Please ensure that the netlist is processed and fault collapsing is performed first (Options 0 and 1).{c.ENDC}")
+            return
+        learn = False
+        if engine is DAlgorithm:
+            print(f"\t{c.OKGREEN}Run static learning first? ('Y' / 'N'): {c.ENDC}", end="")
+            learn = input().strip().lower() == 'y'
+        self.d_algo = engine(self.gates, self.graph, self.fault_list, self.debug, circuit = self.circuit, learn = learn)
+        print(f"\t{c.OKGREEN}Drop faults detected by earlier test vectors? ('Y' / 'N'): {c.ENDC}", end="")
+        drop = input().strip().lower() == 'y'
+        print(f"\t{c.OKGREEN}Run a random-pattern phase first? ('Y' / 'N'): {c.ENDC}", end="")
+        random_patterns = input().strip().lower() == 'y'
+        print(f"\t{c.OKGREEN}Compact the test set? ('Y' / 'N'): {c.ENDC}", end="")
+        compact = input().strip().lower() == 'y'
+        self.d_algo.solve(workers = self.workers, drop = drop, random_patterns = random_patterns, compact = compact)
+        if self.d_algo.aborted:
+            print(f"\t{c.OKGREEN}Retry the {len(self.d_algo.aborted)} aborted fault(s) with 10x search budgets? ('Y' / 'N'): {c.ENDC}", end="")
+            if input().strip().lower() == 'y':
+                self.d_algo.retry_aborted(10, workers = self.workers, drop = drop)
+        self.d_algo.refine_solutions()
+        if compact:
+            self.d_algo.compact_solutions()
+            print(f"{c.BOLD}{c.OKCYAN}Vector\t| Faults{c.ENDC}")
+            for faults, pis in self.d_algo.compacted:
+                print(f"{''.join(str(v) for v in pis.values())}\t| {', '.join(f'{w} s-a-{s}' for w, s in faults)}")
+
     # Fn for prompting user to use program once file has been validated     
     def print_menu(self):
         #loop until valid input is given
@@ -96,6 +149,8 @@ class Menu:
                 "2": "List fault classes",
                 "3": "Simulate",
                 "4": "Generate tests (D-Algorithm)",
+                "5": "Generate tests (PODEM)",
+                "6": "Testability report (SCOAP)",
                 "7": "Exit"
             }
             print(f"\n{c.HEADER}{c.BOLD}Main Menu:{c.ENDC}")
@@ -119,7 +174,13 @@ class Menu:
         
         # Process Netlist for Circuit - needed to populate "gates" and "graph"
         if choice == 0:
-            self.gates, self.graph = process_netlist(self.file_lines)
+            try:
+                self.gates, self.graph, self.circuit, self.collapsed = load_circuit(self.fname, self.use_cache, debug = self.debug)
+                self.fault_list = None
+            except (OSError, ValueError) as e:
+                print(f"{c.FAIL}Error processing netlist: {e}{c.ENDC}")
+                self.print_menu()
+                return
             print(f"\t{c.OKGREEN}Netlist processed successfully.{c.ENDC}")
             
             if self.debug: 
@@ -137,10 +198,11 @@ class Menu:
         elif choice == 1:
             if (self.gates and self.graph):
                 if (not self.fault_list):
-                    self.fault_list = Faults(self.gates, self.graph, self.debug)
-                    
-                self.fault_list.collapse()
+                    self.fault_list = self.collapsed
+                else:
+                    self.fault_list.collapse()
                 print(f"\t{c.OKGREEN}Fault collapsing completed successfully.{c.ENDC}")
+                self.fault_list.classes.print_summary()
             else:
                 print(f"{c.FAIL}Please process the netlist first (Option 0).{c.ENDC}")
 
@@ -153,7 +215,12 @@ class Menu:
         # Simulate Circuit - usable freely after [1]
         elif choice == 3:
             if (self.gates and self.graph and self.fault_list):
-                self.sim = Simulate(self.gates, self.graph, self.fault_list, self.en_feat, self.debug)
+                print(f"\t{c.OKGREEN}Would you like to simulate a vector file in bit-parallel mode? ('Y' / 'N'): {c.ENDC}", end="")
+                if input().strip().lower() == 'y':
+                    self.parallel_sim()
+                    self.print_menu()
+                    return
+                self.sim = Simulate(self.gates, self.graph, self.fault_list, self.en_feat, self.debug, circuit = self.circuit)
                
                 print(f"\t{c.OKGREEN}Would you like to view the simulation results? ('Y' / 'N'): {c.ENDC}", end="")
                 v_choice = input().strip().lower()
@@ -164,17 +231,16 @@ class Menu:
                 print(f"{c.FAIL}Please ensure that the netlist is processed and fault collapsing is performed first (Options 0 and 1).{c.ENDC}")
         # Test Generation (D-Algorithm) - usable freely after [1]
         elif choice == 4:
-            if (self.gates and self.graph and self.fault_list):
-                self.d_algo = DAlgorithm(self.gates, self.graph, self.fault_list, self.debug)
-                self.d_algo.solve()
-                self.d_algo.refine_solutions()
-            else:
-                print(f"{c.FAIL}Please ensure that the netlist is processed and fault collapsing is performed first (Options 0 and 1).{c.ENDC}")            
-        # Messaging for menu items we did not need to implement as undergraduate students
+            self.generate_tests(DAlgorithm)
+        # Test Generation (PODEM) - usable freely after [1]
         elif choice == 5:
-            print(f"\t{c.FAIL}Not implemented. We chose to implement the D-Algorithm [4] as undergraduate students.{c.ENDC}")
+            self.generate_tests(PODEM)
+        # Testability Report (SCOAP) - usable freely after [0]
         elif choice == 6:
-            print(f"\t{c.FAIL}Not implemented. We chose to implement the D-Algorithm [4] as undergraduate students.{c.ENDC}")
+            if self.circuit:
+                SCOAP(self.circuit, self.debug).print_report()
+            else:
+                print(f"{c.FAIL}Please process the netlist first (Option 0).{c.ENDC}")
         # Exit Program - freely usable at any time
         elif choice == 7:
             print("Exiting...")
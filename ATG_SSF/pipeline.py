@@ -0,0 +1,290 @@
+from .helpers.circuit_cache import load_circuit, store_circuit
+from .helpers.gen_d_algo import DAlgorithm
+from .helpers.gen_podem import PODEM
+from .helpers.parallel_sim import ParallelSim, read_vectors
+from .helpers.fault_sim import FaultSim
+from .helpers.fault_collapse import Faults
+from .helpers.scoap import SCOAP
+from .helpers.helpers import color as c
+from typing import Dict, Iterable, List, Optional, Tuple
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+
+# This modular file contains the headless (non-interactive) batch pipeline
+# It runs the parse, collapse, ATPG and simulate stages in one call, reading vectors / fault selections
+# from files, and returns machine-readable results instead of prompting through Menu
+
+STAGES = ("parse", "scoap", "collapse", "atpg", "simulate")
+# Test generation engines selectable per run
+ENGINES = {"dalg": DAlgorithm, "podem": PODEM}
+# atpg_options keys passed to the engine constructor (search budgets, static learning) rather than solve()
+ENGINE_OPTIONS = ("max_backtracks", "max_decisions", "time_limit", "learn")
+# Stages each stage needs to have run first
+REQUIRES = {
+    "parse": (),
+    "scoap": ("parse",),
+    "collapse": ("parse",),
+    "atpg": ("parse", "collapse"),
+    "simulate": ("parse",),
+}
+
+# Fn for parsing one fault selection, e.g. '3gat s-a-0', '3gat 0' or '3gat,0'
+def parse_fault(text: str) -> Tuple[str, int]:
+    parts = text.replace(',', ' ').split()
+    if len(parts) != 2:
+        raise ValueError(f"expected '<gate> s-a-<0|1>', got '{text}'.")
+    stuck = parts[1].lower().replace("s-a-", "")
+    if stuck not in ('0', '1'):
+        raise ValueError(f"invalid stuck-at value '{parts[1]}'.")
+    return parts[0], int(stuck)
+
+# Fn for reading a fault selection file - one fault per line
+def read_faults(fname: str) -> List[Tuple[str, int]]:
+    faults = []
+    with open(fname, "r") as f:
+        for num, line in enumerate(f, start=1):
+            line = line.split('$')[0].strip()
+            if not line:
+                continue
+            try:
+                faults.append(parse_fault(line))
+            except ValueError as e:
+                raise ValueError(f"Line {num} of '{fname}': {e}") from None
+    return faults
+
+# Fn for turning a refined (possibly DC / D / D') PI assignment into a vector string
+def vector_str(pi_assignments: Dict[str, object], pi_names: List[str]) -> str:
+    to_chr = {0: '0', 1: '1', 'D': '1', "D'": '0'}
+    return ''.join(to_chr.get(pi_assignments.get(pi, 'X'), 'X') for pi in pi_names)
+
+def fault_str(fault: Tuple[str, int]) -> str:
+    return f"{fault[0]} s-a-{fault[1]}"
+
+# High level fn for running the requested stages on one circuit file
+def run_pipeline(fname: str, stages: Iterable[str] = STAGES, vectors: Optional[str] = None,
+                 faults: Optional[str] = None, debug: bool = False, workers: int = 1,
+                 atpg_options: Optional[Dict[str, object]] = None, engine: str = "dalg", use_cache: bool = True) -> Dict[str, object]:
+    """
+    Run the requested stages (plus the stages they need) on one netlist file.
+    vectors: optional vector file for the simulate stage - defaults to the ATPG vectors.
+    faults: optional fault selection file for the simulate stage - defaults to the collapsed fault list.
+    workers: worker processes for the ATPG stage.
+    atpg_options: extra keyword arguments for DAlgorithm.solve (e.g. drop=True, compact=True - which also compacts
+                  the final test set, and the simulate stage then uses it), engine options (ENGINE_OPTIONS),
+                  and 'retry' - a factor to scale the budgets by for one retry of the aborted faults (0 for none).
+    engine: test generation engine - a key of ENGINES.
+    use_cache: load the compiled circuit and collapsed fault list from the on-disk circuit cache when the file is unchanged.
+    Engine progress output is sent to stderr so stdout stays machine-readable.
+    """
+    stages = set(stages)
+    for st in list(stages):
+        if st not in REQUIRES: raise ValueError(f"Unknown stage '{st}'. Expected one of {', '.join(STAGES)}.")
+        stages.update(REQUIRES[st])
+    if engine not in ENGINES: raise ValueError(f"Unknown engine '{engine}'. Expected one of {', '.join(ENGINES)}.")
+    results = {"circuit": fname, "timing": {}}
+
+    with contextlib.redirect_stdout(sys.stderr):
+        # Parse
+        t0 = time.perf_counter()
+        # Collapsing is left to its own stage - unless the cache already holds the collapsed fault list
+        gates, graph, circuit, loaded_faults = load_circuit(fname, use_cache, debug = debug, collapse = False)
+        pi_names = [circuit.names[g] for g in circuit.pis]
+        po_names = [circuit.names[g] for g in circuit.pos]
+        results["parse"] = {
+            "gates": circuit.n,
+            "levels": max(circuit.levels) if circuit.n else 0,
+            "pis": pi_names,
+            "pos": po_names,
+        }
+        results["timing"]["parse"] = time.perf_counter() - t0
+
+        # Testability
+        if "scoap" in stages:
+            t0 = time.perf_counter()
+            results["scoap"] = SCOAP(circuit, debug).report()
+            results["timing"]["scoap"] = time.perf_counter() - t0
+
+        # Collapse
+        fault_list = None
+        if "collapse" in stages:
+            t0 = time.perf_counter()
+            fault_list = loaded_faults
+            cached = fault_list.flist is not None
+            if not cached:
+                fault_list.collapse()
+                if use_cache: store_circuit(fname, circuit, fault_list, debug = debug)
+            classes = fault_list.classes.classes()
+            dominated = set(fault_list.classes.dominated())
+            results["collapse"] = {
+                "cached": cached,
+                "fault_count": fault_list.flist.n_targets,
+                "universe": fault_list.classes.size,
+                "class_count": len(classes),
+                "fault_classes": fault_list.fault_list,
+                "undetectable": fault_list.undetectable_faults,
+                "classes": [
+                    {"representative": fault_str(rep), "members": [fault_str(f) for f in members], "dominated": rep in dominated}
+                    for rep, members in classes.items()
+                ],
+            }
+            results["timing"]["collapse"] = time.perf_counter() - t0
+
+        # ATPG
+        atpg_vectors = []
+        if "atpg" in stages:
+            t0 = time.perf_counter()
+            results["atpg"] = run_atpg(gates, graph, fault_list, circuit, engine, atpg_options, workers, debug)
+            atpg_vectors = results["atpg"]["vectors"]
+            results["timing"]["atpg"] = time.perf_counter() - t0
+
+        # Simulate - bit-parallel good machine, then PPSFP fault grading
+        if "simulate" in stages:
+            t0 = time.perf_counter()
+            vecs = read_vectors(vectors if vectors else atpg_vectors, len(pi_names))
+            targets = read_faults(faults) if faults else fault_list
+            results["simulate"] = run_simulate(circuit, vecs, targets, debug)
+            results["timing"]["simulate"] = time.perf_counter() - t0
+    return results
+
+# Fn for the ATPG stage - runs one engine over the fault list and returns its tests, outcome lists and vectors
+def run_atpg(gates: Dict[str, dict], graph, fault_list, circuit, engine: str = "dalg",
+             atpg_options: Optional[Dict[str, object]] = None, workers: int = 1, debug: bool = False) -> Dict[str, object]:
+    pi_names = [circuit.names[g] for g in circuit.pis]
+    opts = dict(atpg_options or {})
+    engine_opts = {k: opts.pop(k) for k in ENGINE_OPTIONS if k in opts}
+    retry = opts.pop("retry", 0)
+    d_algo = ENGINES[engine](gates, graph, fault_list, debug, circuit = circuit, **engine_opts)
+    d_algo.solve(workers = workers, **opts)
+    if retry and d_algo.aborted:
+        d_algo.retry_aborted(retry, workers, opts.get("drop", False))
+    refined = d_algo.refine_solutions()
+    tests = [{"fault": fault_str(fault), "vector": vector_str(pis, pi_names)} for fault, pis in refined]
+    atpg_vectors = [t["vector"] for t in tests]
+    if opts.get("compact"):
+        compacted = [
+            {"faults": [fault_str(f) for f in faults], "vector": vector_str(pis, pi_names)}
+            for faults, pis in d_algo.compact_solutions()
+        ]
+        atpg_vectors = [t["vector"] for t in compacted]
+    return {
+        "engine": engine,
+        "tests": tests,
+        "untestable": [fault_str(f) for f in d_algo.untestable],
+        "dropped": [fault_str(f) for f in d_algo.dropped],
+        "aborted": [fault_str(f) for f in d_algo.aborted],
+        "vectors": atpg_vectors,
+        "summary": {
+            "detected": len(d_algo.solutions) + len(d_algo.dropped),
+            "redundant": len(d_algo.untestable),
+            "aborted": len(d_algo.aborted),
+        },
+    }
+
+# Fn for the simulate stage - good-machine responses, plus fault grading when targets (faults) are given
+def run_simulate(circuit, vecs: List[List[int]], targets = None, debug: bool = False) -> Dict[str, object]:
+    """
+    targets: a fault list, or a collapsed Faults - graded on its representatives, with the coverage of the
+             whole fault universe (every class, dominated ones included) reported as universe_coverage
+    """
+    responses = ParallelSim(circuit, debug = debug).simulate(vecs)
+    sim = {
+        "vectors": [''.join(map(str, v)) for v in vecs],
+        "responses": [''.join(map(str, r)) for r in responses],
+    }
+    if targets is not None:
+        fsim = FaultSim(circuit, targets, debug = debug)
+        fsim.run(vecs)
+        sim["faults"] = [
+            {"fault": fault_str(f), "first_detection": fsim.first_detection(f), "patterns": fsim.detected[f].bit_count()}
+            for f in fsim.faults
+        ]
+        sim["coverage"] = fsim.coverage()
+        if isinstance(targets, Faults) and targets.classes is not None:
+            # Dominated classes are usually detected along the way, but only simulation shows which
+            dom = FaultSim(circuit, targets.flist, ids = targets.classes.dominated_ids(), debug = debug)
+            dom.run(vecs)
+            sim["universe_coverage"] = targets.classes.coverage(fsim.detected_ids() + dom.detected_ids())
+    return sim
+
+# Fn for writing results as JSON (one document) or CSV (one table per stage)
+def write_results(all_results: List[Dict[str, object]], out: Optional[str] = None, fmt: str = "json"):
+    if fmt == "json":
+        doc = all_results[0] if len(all_results) == 1 else all_results
+        if out:
+            with open(out, "w") as f:
+                json.dump(doc, f, indent = 2)
+        else:
+            json.dump(doc, sys.stdout, indent = 2)
+            print()
+        return
+
+    # CSV - flat rows keyed by circuit, so many circuits land in the same files
+    tables = {
+        "summary": (["circuit", "gates", "pis", "pos", "faults", "tests", "redundant", "aborted", "coverage", "universe_coverage", "error"], []),
+        "tests": (["circuit", "fault", "vector"], []),
+        "simulate": (["circuit", "pattern", "vector", "response"], []),
+        "faults": (["circuit", "fault", "first_detection", "patterns"], []),
+        "scoap": (["circuit", "line", "type", "cc0", "cc1", "co"], []),
+    }
+    for res in all_results:
+        circ = res["circuit"]
+        tables["summary"][1].append([
+            circ,
+            res.get("parse", {}).get("gates", ""),
+            len(res.get("parse", {}).get("pis", [])),
+            len(res.get("parse", {}).get("pos", [])),
+            res.get("collapse", {}).get("fault_count", ""),
+            len(res.get("atpg", {}).get("tests", [])),
+            res.get("atpg", {}).get("summary", {}).get("redundant", ""),
+            res.get("atpg", {}).get("summary", {}).get("aborted", ""),
+            res.get("simulate", {}).get("coverage", ""),
+            res.get("simulate", {}).get("universe_coverage", ""),
+            res.get("error", ""),
+        ])
+        for t in res.get("atpg", {}).get("tests", []):
+            tables["tests"][1].append([circ, t["fault"], t["vector"]])
+        sim = res.get("simulate", {})
+        for p, (v, r) in enumerate(zip(sim.get("vectors", []), sim.get("responses", []))):
+            tables["simulate"][1].append([circ, p, v, r])
+        for fr in sim.get("faults", []):
+            tables["faults"][1].append([circ, fr["fault"], fr["first_detection"], fr["patterns"]])
+        for row in res.get("scoap", []):
+            tables["scoap"][1].append([circ, row["line"], row["type"], row["cc0"], row["cc1"], row["co"]])
+
+    if not out:
+        writer = csv.writer(sys.stdout)
+        for header, rows in tables.values():
+            if rows:
+                writer.writerow(header)
+                writer.writerows(rows)
+        return
+    base = os.path.splitext(out)[0]
+    for name, (header, rows) in tables.items():
+        with open(f"{base}.{name}.csv", "w", newline = "") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+# High level fn for the --batch entrypoint
+def run_batch(fnames: List[str], stages: Iterable[str] = STAGES, vectors: Optional[str] = None, faults: Optional[str] = None,
+              out: Optional[str] = None, fmt: str = "json", debug: bool = False, workers: int = 1,
+              atpg_options: Optional[Dict[str, object]] = None, engine: str = "dalg", use_cache: bool = True) -> int:
+    """
+    Run the pipeline over every circuit file. A failing circuit is recorded with its error, not fatal.
+    Returns a process exit code - 1 if any circuit failed.
+    """
+    all_results = []
+    failed = False
+    for fname in fnames:
+        try:
+            all_results.append(run_pipeline(fname, stages, vectors, faults, debug, workers, atpg_options, engine, use_cache))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"{c.FAIL}Error processing '{fname}': {e}{c.ENDC}", file = sys.stderr)
+            all_results.append({"circuit": fname, "error": str(e)})
+            failed = True
+    write_results(all_results, out, fmt)
+    return 1 if failed else 0
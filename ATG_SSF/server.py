@@ -0,0 +1,240 @@
+from .helpers.circuit_cache import load_circuit
+from .helpers.gen_d_algo import ABORTED
+from .helpers.parallel_sim import read_vectors
+from .helpers.fault_classes import parse_branch
+from .helpers.helpers import color as c
+from .pipeline import ENGINES, ENGINE_OPTIONS, run_atpg, run_simulate, parse_fault, fault_str, vector_str
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+
+# This modular file contains the long-lived circuit server
+# Circuits are loaded once (through the circuit cache) and stay resident - compiled, with their collapsed fault lists
+# and ATPG engines - while clients send simulate, fault-simulate and ATPG requests over a Unix-domain socket or
+# localhost TCP. The protocol is JSON lines: one request object per line, answered in order on each connection.
+#   -> {"id": 1, "op": "simulate", "circuit": "t4_21", "vectors": ["01101", "11100"]}
+#   <- {"id": 1, "ok": true, "result": {"vectors": [...], "responses": [...]}}
+#   <- {"id": 1, "ok": false, "error": "Unknown circuit 't4_2'."}
+# Ops:
+#   ping                                    -> resident circuit names
+#   load      path, [name]                  -> circuit info (name defaults to the file name without extension)
+#   unload    circuit
+#   info      circuit                       -> gates, levels, PIs, POs, collapsed fault count, fault universe size
+#   simulate  circuit, vectors              -> PO responses (vectors: a list of bit strings, never a file path)
+#   faultsim  circuit, vectors, [faults]    -> per-fault first detection and coverage (default: collapsed faults,
+#                                              plus the coverage of the whole fault universe)
+#   atpg      circuit, [faults], [engine], [options]
+#                                           -> with faults: one test per fault from the resident engine;
+#                                              without: a full run over the collapsed faults, as the batch pipeline does
+#   shutdown
+
+# Long request lines (large vector sets) are fine - up to this many bytes
+LINE_LIMIT = 64 * 1024 * 1024
+
+class Resident:
+    """
+    One loaded circuit, its collapsed fault list and the engines built for it so far.
+    Requests on one circuit run one at a time - the engines and simulators keep per-run state.
+    """
+    def __init__(self, name: str, fname: str, use_cache: bool = True, debug: bool = False):
+        self.name = name
+        self.fname = fname
+        self.debug = debug
+        self.gates, self.graph, self.circuit, self.faults = load_circuit(fname, use_cache, debug = debug)
+        self.pi_names = [self.circuit.names[g] for g in self.circuit.pis]
+        self.engines = {}
+        self.lock = asyncio.Lock()
+
+    def info(self) -> Dict[str, object]:
+        cc = self.circuit
+        return {
+            "name": self.name,
+            "path": self.fname,
+            "gates": cc.n,
+            "levels": max(cc.levels),
+            "pis": self.pi_names,
+            "pos": [cc.names[g] for g in cc.pos],
+            "fault_count": self.faults.flist.n_targets,
+            "universe": self.faults.classes.size,
+        }
+
+    def engine(self, name: str, learn: bool = False):
+        key = (name, learn)
+        if key not in self.engines:
+            options = {"learn": True} if learn else {}
+            self.engines[key] = ENGINES[name](self.gates, self.graph, self.faults, self.debug, circuit = self.circuit, **options)
+        return self.engines[key]
+
+    def fault(self, text: str):
+        wire, stuck = parse_fault(text)
+        if wire not in self.circuit.index and parse_branch(self.circuit, wire) is None: raise ValueError(f"Unknown line '{wire}' in circuit '{self.name}'.")
+        return wire, stuck
+
+    def vectors(self, req: dict) -> List[List[int]]:
+        # read_vectors opens a str as a file - a client must not get to read files on the server's host
+        rows = req["vectors"]
+        if not isinstance(rows, list) or not all(isinstance(row, str) for row in rows):
+            raise ValueError("'vectors' must be a list of bit strings, e.g. [\"01101\", \"11100\"].")
+        return read_vectors(rows, len(self.pi_names))
+
+    # --- REQUESTS ---
+    def simulate(self, req: dict) -> Dict[str, object]:
+        return run_simulate(self.circuit, self.vectors(req), debug = self.debug)
+
+    def faultsim(self, req: dict) -> Dict[str, object]:
+        targets = [self.fault(f) for f in req["faults"]] if req.get("faults") else self.faults
+        return run_simulate(self.circuit, self.vectors(req), targets, self.debug)
+
+    def atpg(self, req: dict) -> Dict[str, object]:
+        engine = req.get("engine", "dalg")
+        if engine not in ENGINES: raise ValueError(f"Unknown engine '{engine}'. Expected one of {', '.join(ENGINES)}.")
+        options = dict(req.get("options", {}))
+        if not req.get("faults"):
+            return run_atpg(self.gates, self.graph, self.faults, self.circuit, engine, options, debug = self.debug)
+
+        eng = self.engine(engine, bool(options.pop("learn", False)))
+        # Budgets apply to this request only - the resident engine keeps its defaults
+        budgets = {k: getattr(eng, k) for k in ENGINE_OPTIONS if k != "learn"}
+        for k in budgets:
+            if k in options: setattr(eng, k, options[k])
+        tests = []
+        try:
+            for wire, stuck in [self.fault(f) for f in req["faults"]]:
+                res = eng.generate(wire, stuck)
+                if res == ABORTED:
+                    tests.append({"fault": fault_str((wire, stuck)), "status": "aborted"})
+                elif res is None:
+                    tests.append({"fault": fault_str((wire, stuck)), "status": "redundant"})
+                else:
+                    tests.append({"fault": fault_str((wire, stuck)), "status": "detected", "vector": vector_str(res, self.pi_names)})
+        finally:
+            for k, v in budgets.items():
+                setattr(eng, k, v)
+        return {"engine": engine, "tests": tests}
+
+class CircuitServer:
+    def __init__(self, use_cache: bool = True, debug: bool = False):
+        self.circuits: Dict[str, Resident] = {}
+        self.use_cache = use_cache
+        self.debug = debug
+        self.server = None
+        self.stopped = None
+
+    def load(self, fname: str, name: Optional[str] = None) -> Resident:
+        name = name or os.path.splitext(os.path.basename(fname))[0]
+        if name in self.circuits: raise ValueError(f"Circuit '{name}' is already loaded.")
+        res = Resident(name, fname, self.use_cache, self.debug)
+        self.circuits[name] = res
+        print(f"{c.OKGREEN}Loaded '{name}' from '{fname}' ({res.circuit.n} gates).{c.ENDC}")
+        return res
+
+    def resident(self, req: dict) -> Resident:
+        name = req.get("circuit")
+        if name is None and len(self.circuits) == 1:
+            return next(iter(self.circuits.values())) # the only circuit needs no name
+        if name is None: raise ValueError(f"No circuit given - {len(self.circuits)} are loaded.")
+        if name not in self.circuits: raise ValueError(f"Unknown circuit '{name}'.")
+        return self.circuits[name]
+
+    async def dispatch(self, req: dict) -> object:
+        op = req.get("op")
+        if op == "ping":
+            return {"circuits": list(self.circuits)}
+        if op == "load":
+            # Parsing a big netlist must not stall the other clients
+            res = await asyncio.to_thread(self.load, req["path"], req.get("name"))
+            return res.info()
+        if op == "shutdown":
+            self.stopped.set()
+            return {}
+        res = self.resident(req)
+        if op == "unload":
+            del self.circuits[res.name]
+            return {}
+        if op == "info":
+            return res.info()
+        if op not in ("simulate", "faultsim", "atpg"):
+            raise ValueError(f"Unknown op '{op}'.")
+        # CPU-bound work runs off the event loop, one request per circuit at a time
+        async with res.lock:
+            return await asyncio.to_thread(getattr(res, op), req)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while not reader.at_eof():
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    break # line over LINE_LIMIT - the stream cannot be resynchronized
+                if not line.strip():
+                    continue
+                req_id = None
+                try:
+                    req = json.loads(line)
+                    if not isinstance(req, dict): raise ValueError("a request must be a JSON object.")
+                    req_id = req.get("id")
+                    reply = {"id": req_id, "ok": True, "result": await self.dispatch(req)}
+                except KeyError as e:
+                    reply = {"id": req_id, "ok": False, "error": f"Missing request field {e}."}
+                except (ValueError, TypeError, OSError) as e:
+                    reply = {"id": req_id, "ok": False, "error": str(e)}
+                writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path: Optional[str] = None, host: str = "127.0.0.1", port: int = 0):
+        self.stopped = asyncio.Event()
+        if socket_path:
+            if os.path.exists(socket_path): os.unlink(socket_path) # stale socket from an earlier run
+            self.server = await asyncio.start_unix_server(self.handle, socket_path, limit = LINE_LIMIT)
+            where = socket_path
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port, limit = LINE_LIMIT)
+            where = "{}:{}".format(*self.server.sockets[0].getsockname()[:2])
+        print(f"{c.OKCYAN}{c.BOLD}Serving {len(self.circuits)} circuit(s) on {where}{c.ENDC}", flush = True)
+        async with self.server:
+            await self.stopped.wait()
+        if socket_path and os.path.exists(socket_path): os.unlink(socket_path)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog = "python -m ATG_SSF.server",
+        description = "Keep circuits resident and serve simulate / fault-simulate / ATPG requests as JSON lines.",
+    )
+    parser.add_argument("circuits", nargs = "*", help = "circuit files to load at startup (more can be loaded by clients)")
+    parser.add_argument("--socket", help = "Unix-domain socket path to listen on")
+    parser.add_argument("--host", default = "127.0.0.1", help = "TCP host when no --socket is given (default: 127.0.0.1)")
+    parser.add_argument("--port", type = int, default = 7878, help = "TCP port when no --socket is given (default: 7878, 0 for any)")
+    parser.add_argument("--no-cache", action = "store_true", help = "always re-parse and re-collapse - skip the on-disk circuit cache")
+    parser.add_argument("--debug", default = "false", help = "bool, default false")
+    args = parser.parse_args(argv)
+    args.debug = args.debug.lower() == "true"
+    return args
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    server = CircuitServer(not args.no_cache, args.debug)
+    # Engine progress output goes to the log (stderr), like the batch pipeline
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            for fname in args.circuits:
+                server.load(fname)
+        except (OSError, ValueError) as e:
+            print(f"{c.FAIL}Error loading circuit: {e}{c.ENDC}")
+            return 1
+        try:
+            asyncio.run(server.serve(args.socket, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+# Program entrypoint
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+from ATG_SSF import bench
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+# Baselines only compare like with like, and small timing noise is never a regression
+
+def stage(time: float, peak_kb: float = 100.0):
+    return {"time": time, "peak_kb": peak_kb}
+
+class CompareTests(unittest.TestCase):
+    def test_regressions(self):
+        base = {"c": {"atpg": stage(1.0), "parse": stage(0.001)}}
+        self.assertEqual(bench.compare({"c": {"atpg": stage(1.2), "parse": stage(0.004)}}, base), [])
+        found = bench.compare({"c": {"atpg": stage(1.5), "parse": stage(0.001, 1000.0)}}, base)
+        self.assertEqual(len(found), 2)
+        self.assertTrue(found[0].startswith("c atpg: time"))
+        self.assertTrue(found[1].startswith("c parse: peak memory"))
+
+    def test_new_circuit_ignored(self):
+        self.assertEqual(bench.compare({"new": {"atpg": stage(9.0)}}, {"c": {"atpg": stage(1.0)}}), [])
+
+    def test_engine_mismatch_rejected(self):
+        with tempfile.NamedTemporaryFile("w", suffix = ".json", delete = False) as f:
+            json.dump({"engine": "dalg", "circuits": {}}, f)
+        try:
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                code = bench.main(["--baseline", f.name, "--engine", "podem", "--scales", ""])
+            self.assertEqual(code, 1)
+            self.assertIn("recorded with --engine dalg", out.getvalue())
+        finally:
+            os.unlink(f.name)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+from ATG_SSF.helpers.proc_netlist import process_netlist
+from ATG_SSF.helpers.circuit import Op, Logic5 as L, eval5
+from collections import Counter
+import contextlib
+import glob
+import io
+import itertools
+import os
+import unittest
+
+# The compiled circuit must describe the same netlist as the gates dict and Graph it is built next to
+
+BENCHMARKS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "*.ckt*")))
+
+def load(fname: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return process_netlist(fname)
+
+class CompiledCircuitTests(unittest.TestCase):
+    def test_benchmarks_found(self):
+        self.assertTrue(BENCHMARKS)
+
+    def test_fanin_matches_gates(self):
+        for fname in BENCHMARKS:
+            with self.subTest(fname = os.path.basename(fname)):
+                gates, graph, cc = load(fname)
+                self.assertEqual(cc.names, list(gates))
+                for g, name in enumerate(cc.names):
+                    self.assertEqual([cc.names[x] for x in cc.fanins(g)], gates[name]["inputs"])
+                    self.assertEqual(Op.NAMES[cc.ops[g]], gates[name]["type"])
+                    # Topological numbering - every input comes first
+                    self.assertTrue(all(x < g for x in cc.fanins(g)))
+
+    def test_fanout_matches_graph(self):
+        for fname in BENCHMARKS:
+            with self.subTest(fname = os.path.basename(fname)):
+                gates, graph, cc = load(fname)
+                for g, name in enumerate(cc.names):
+                    self.assertEqual(Counter(cc.names[x] for x in cc.fanouts(g)), Counter(graph.get_neighbors(name)))
+                    self.assertEqual(cc.fanout_count(g), gates[name]["fanout"])
+
+    def test_pis_and_pos(self):
+        for fname in BENCHMARKS:
+            with self.subTest(fname = os.path.basename(fname)):
+                gates, graph, cc = load(fname)
+                self.assertEqual({cc.names[g] for g in cc.pis}, {n for n, info in gates.items() if info["type"] == "PI"})
+                self.assertEqual({cc.names[g] for g in cc.pos}, {n for n, info in gates.items() if info["type"] != "PI" and info["fanout"] == 0})
+                self.assertEqual([g for g in range(cc.n) if cc.is_po(g)], list(cc.pos))
+
+class Logic5Tests(unittest.TestCase):
+    def test_eval5_matches_good_and_faulty_machines(self):
+        ref = {
+            Op.AND: lambda a, b: a & b, Op.NAND: lambda a, b: 1 - (a & b),
+            Op.OR: lambda a, b: a | b, Op.NOR: lambda a, b: 1 - (a | b),
+            Op.XOR: lambda a, b: a ^ b,
+        }
+        known = (L.V0, L.V1, L.D, L.DB)
+        for op, fn in ref.items():
+            for a, b in itertools.product(known, repeat = 2):
+                (ga, fa), (gb, fb) = L.PAIRS[a], L.PAIRS[b]
+                self.assertEqual(eval5(op, (a, b)), L.from_pair(fn(ga, gb), fn(fa, fb)), f"{Op.NAMES[op]}({a}, {b})")
+            # A controlling value decides the output whatever the other input is
+            if op != Op.XOR:
+                c = 0 if op in (Op.AND, Op.NAND) else 1
+                self.assertNotEqual(eval5(op, (c, L.X)), L.X)
+                self.assertEqual(eval5(op, (1 - c, L.X)), L.X)
+
+if __name__ == "__main__":
+    unittest.main()
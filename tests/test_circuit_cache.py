@@ -0,0 +1,104 @@
+from ATG_SSF.helpers.circuit_cache import CircuitCache, load_circuit, file_hash
+from ATG_SSF.helpers.proc_netlist import process_netlist
+from ATG_SSF.helpers.fault_collapse import Faults
+import contextlib
+import glob
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+# A cache entry must rebuild exactly what parsing and collapsing produce, and an edited netlist must miss
+
+BENCHMARKS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "*.ckt*")))
+
+def build(fname: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        gates, graph, circuit = process_netlist(fname)
+        faults = Faults(gates, graph, circuit = circuit)
+        faults.collapse()
+    return gates, graph, circuit, faults
+
+class CircuitCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = CircuitCache(self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def assertSameCircuit(self, got, want):
+        (g1, gr1, cc1, f1), (g2, gr2, cc2, f2) = got, want
+        self.assertEqual(list(g1.items()), list(g2.items()))
+        self.assertEqual(gr1.graph, gr2.graph)
+        self.assertEqual(cc1.names, cc2.names)
+        for attr in ("ops", "levels", "fanin_ptr", "fanin", "fanout_ptr", "fanout", "pis", "pos", "po_mask", "ctrl", "inv"):
+            self.assertEqual(getattr(cc1, attr), getattr(cc2, attr), attr)
+        self.assertEqual(f1.classes.parent, f2.classes.parent)
+        self.assertEqual(f1.classes.dropped, f2.classes.dropped)
+        self.assertEqual(f1.flist.status, f2.flist.status)
+        self.assertEqual(f1.fault_list, f2.fault_list)
+
+    def test_store_load_round_trip(self):
+        for fname in BENCHMARKS:
+            with self.subTest(fname = os.path.basename(fname)):
+                built = build(fname)
+                key = file_hash(fname)
+                self.cache.store(key, built[2], built[3])
+                loaded = self.cache.load(key)
+                self.assertIsNotNone(loaded)
+                self.assertSameCircuit(loaded, built)
+
+    def test_loaded_circuit_is_independent(self):
+        # Loaded arrays are plain copies - writable and picklable, as the engines need
+        built = build(BENCHMARKS[0])
+        self.cache.store("k", built[2], built[3])
+        _, _, circuit, faults = self.cache.load("k")
+        faults.classes.parent[0] = faults.classes.parent[0]
+        faults.classes.dropped[0] = faults.classes.dropped[0]
+        self.assertEqual(pickle.loads(pickle.dumps(circuit)).fanin, circuit.fanin)
+
+    def test_miss_on_missing_or_damaged_entry(self):
+        self.assertIsNone(self.cache.load("absent"))
+        built = build(BENCHMARKS[0])
+        self.cache.store("k", built[2], built[3])
+        path = self.cache.path("k")
+        with open(path, "rb") as f:
+            blob = f.read()
+        with open(path, "wb") as f:
+            f.write(blob[:len(blob) // 2])
+        self.assertIsNone(self.cache.load("k"))
+        with open(path, "wb") as f:
+            f.write(b"XXXX" + blob[4:])
+        self.assertIsNone(self.cache.load("k"))
+
+    def test_edit_invalidates(self):
+        src = os.path.join(self.dir, "c.ckt")
+        shutil.copy(BENCHMARKS[0], src)
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = load_circuit(src, cache_dir = self.dir)
+            again = load_circuit(src, cache_dir = self.dir)
+        self.assertSameCircuit(again, first)
+        self.assertEqual(len([e for e in os.listdir(self.dir) if e.endswith(".atgc")]), 1)
+        # Feed an existing PO into a new gate - the edited file hashes differently and is re-parsed
+        po = first[2].names[first[2].pos[0]]
+        with open(src, "a") as f:
+            f.write(f"\nzz_new and {po} {first[2].names[first[2].pis[0]]}\n")
+        with contextlib.redirect_stdout(io.StringIO()):
+            edited = load_circuit(src, cache_dir = self.dir)
+        self.assertIn("zz_new", edited[0])
+        self.assertNotIn("zz_new", first[0])
+        self.assertSameCircuit(edited, build(src))
+        self.assertEqual(len([e for e in os.listdir(self.dir) if e.endswith(".atgc")]), 2)
+
+    def test_clear(self):
+        built = build(BENCHMARKS[0])
+        self.cache.store("a", built[2], built[3])
+        self.cache.store("b", built[2], built[3])
+        self.assertEqual(self.cache.clear(), 2)
+        self.assertIsNone(self.cache.load("a"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+from ATG_SSF import circuit_gen
+from ATG_SSF.helpers.proc_netlist import process_netlist
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+# Generated netlists parse back to exactly the gates the generator reports - no line may be skipped
+
+def generate(fn, *args, **kwargs):
+    with tempfile.NamedTemporaryFile("w", suffix = ".ckt", delete = False) as f:
+        n = fn(f, *args, **kwargs)
+    try:
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            _, _, circuit = process_netlist(f.name)
+    finally:
+        os.unlink(f.name)
+    return n, circuit, out.getvalue()
+
+class CircuitGenTests(unittest.TestCase):
+    def test_gate_counts_match(self):
+        cases = [
+            (circuit_gen.parity_tree, (9,), {"fanin": 2}),
+            (circuit_gen.parity_tree, (9,), {"fanin": 4}),
+            (circuit_gen.random_dag, (300,), {"pis": 2, "window": 2, "max_fanin": 2}),
+            (circuit_gen.random_dag, (300,), {"pis": 4, "window": 2, "max_fanin": 2, "max_fanout": 2}),
+            (circuit_gen.random_dag, (300,), {"pis": 8, "window": 3, "max_fanin": 5, "max_fanout": 1, "seed": 4}),
+        ]
+        for fn, args, kwargs in cases:
+            with self.subTest(fn = fn.__name__, **kwargs):
+                n, circuit, log = generate(fn, *args, **kwargs)
+                self.assertNotIn("skipping", log)
+                self.assertEqual(circuit.n - len(circuit.pis), n)
+
+    def test_bad_fanin_and_window_rejected(self):
+        with self.assertRaises(ValueError):
+            circuit_gen.parity_tree(io.StringIO(), 8, fanin = 1)
+        for kwargs in ({"max_fanin": 1}, {"window": 1}, {"pis": 1}):
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                circuit_gen.random_dag(io.StringIO(), 10, **kwargs)
+        for argv in (["parity", "8", "--fanin", "1"], ["random", "10", "--window", "1"], ["random", "10", "--fanin", "0"]):
+            with self.subTest(argv = argv), contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                circuit_gen.parse_args(argv)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+from ATG_SSF.circuit_gen import random_dag
+from ATG_SSF.helpers.proc_netlist import process_netlist
+from ATG_SSF.helpers.fault_collapse import Faults
+from ATG_SSF.helpers.fault_sim import FaultSim
+from ATG_SSF.helpers.gen_d_algo import DAlgorithm
+from ATG_SSF.helpers.compaction import Compactor
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+# Dynamic compaction must keep every extended test a test for its primary fault, whatever its don't cares become
+
+GOOD = {'D': 1, "D'": 0, 0: 0, 1: 1}
+
+def build(seed: int, gates: int = 25, pis: int = 6):
+    with tempfile.NamedTemporaryFile("w", suffix = ".ckt", delete = False) as f:
+        random_dag(f, gates, pis = pis, seed = seed, max_fanin = 3)
+    try:
+        gates, graph, circuit = process_netlist(f.name)
+    finally:
+        os.unlink(f.name)
+    faults = Faults(gates, graph, circuit = circuit)
+    faults.collapse()
+    return gates, graph, circuit, faults
+
+class ExtendTestTests(unittest.TestCase):
+    def check_cubes(self, seed: int):
+        gates, graph, circuit, faults = build(seed)
+        engine = DAlgorithm(gates, graph, faults, circuit = circuit)
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.solve(compact = True)
+        for fault, sol in engine.solutions.items():
+            for fill in (0, 1):
+                vec = [GOOD.get(sol[circuit.names[pi]], fill) for pi in circuit.pis]
+                fsim = FaultSim(circuit, [fault])
+                fsim.run([vec])
+                self.assertTrue(fsim.detected[fault], f"seed {seed}: {fault} missed with don't cares filled {fill}")
+
+    def test_extended_cube_detects_primary(self):
+        # seed 12: i2->n0 s-a-0 used to lose i1 to a don't care after compaction
+        self.check_cubes(12)
+
+    def test_extended_cubes_random(self):
+        for seed in range(40):
+            with self.subTest(seed = seed):
+                self.check_cubes(seed)
+
+class StaticCompactionTests(unittest.TestCase):
+    def test_compact_keeps_detections(self):
+        gates, graph, circuit, faults = build(3)
+        targets = [faults.flist.fault(f) for f in faults.flist.targets()]
+        rng = random.Random(3)
+        cubes = [[rng.choice((0, 1, None)) for _ in circuit.pis] for _ in range(30)]
+        compactor = Compactor(circuit, targets, debug = True)
+        out = io.StringIO()
+        with mock.patch.object(Compactor, "merge", wraps = Compactor.merge) as merge, contextlib.redirect_stdout(out):
+            vectors = compactor.compact(cubes)
+        # The debug summary reuses the merged cubes rather than merging again
+        self.assertEqual(merge.call_count, 1)
+        self.assertIn(f"{len(cubes)} cubes -> {len(Compactor.merge(cubes))} merged -> {len(vectors)} vectors", out.getvalue())
+        before = FaultSim(circuit, targets)
+        before.run([[v or 0 for v in cube] for cube in cubes])
+        after = FaultSim(circuit, targets)
+        after.run(vectors)
+        self.assertLessEqual({f for f, w in before.detected.items() if w}, {f for f, w in after.detected.items() if w})
+
+if __name__ == "__main__":
+    unittest.main()
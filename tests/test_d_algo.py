@@ -0,0 +1,73 @@
+from ATG_SSF.circuit_gen import random_dag
+from ATG_SSF.helpers.proc_netlist import process_netlist
+from ATG_SSF.helpers.fault_collapse import Faults
+from ATG_SSF.helpers.gen_d_algo import DAlgorithm
+from ATG_SSF.helpers.fault_sim import FaultSim
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+# Justification branches on the J-frontier gate hardest to control, and every vector found still detects its fault
+
+def random_circuit(seed: int):
+    with tempfile.NamedTemporaryFile("w", suffix = ".ckt", delete = False) as f:
+        random_dag(f, 80, pis = 10, seed = seed)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            gates, graph, circuit = process_netlist(f.name)
+            faults = Faults(gates, graph, circuit = circuit)
+            faults.collapse()
+        return gates, graph, circuit, faults
+    finally:
+        os.unlink(f.name)
+
+class RecordingDAlgorithm(DAlgorithm):
+    # Keeps every justification decision as (J-frontier costs, gate justified, alternatives)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.justified = []
+
+    def _decisions(self):
+        justify = self.j_frontier and self.error_at_PO()
+        costs = {g: self.scoap.cc(g, self._target(g)) for g in self.j_frontier} if justify else None
+        order = self.get_J_frontier() if justify else None
+        alternatives = super()._decisions()
+        if justify:
+            self.justified.append((costs, order[0], alternatives))
+        return alternatives
+
+class JFrontierTests(unittest.TestCase):
+    def test_hardest_gate_justified_first(self):
+        decisions = 0
+        for seed in range(4):
+            with self.subTest(seed = seed):
+                gates, graph, cc, faults = random_circuit(seed)
+                engine = RecordingDAlgorithm(gates, graph, faults, circuit = cc, max_backtracks = 50)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    engine.solve()
+                for costs, G, alternatives in engine.justified:
+                    hardest = max(costs.values())
+                    self.assertEqual(G, min(g for g, c in costs.items() if c == hardest))
+                    for alt in alternatives:
+                        self.assertTrue(all(x in engine.gate_ins[G] for x, _ in alt))
+                decisions += len(engine.justified)
+        self.assertGreater(decisions, 0)
+
+    def test_vectors_detect_their_faults(self):
+        for seed in range(4):
+            with self.subTest(seed = seed):
+                gates, graph, cc, faults = random_circuit(seed)
+                engine = DAlgorithm(gates, graph, faults, circuit = cc, max_backtracks = 50)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    solutions = dict(engine.solve())
+                self.assertGreater(len(solutions), 0)
+                fsim = FaultSim(cc, list(solutions))
+                fsim.run([engine.test_vector(a) for a in solutions.values()])
+                detected = fsim.detected
+                for i, fault in enumerate(solutions):
+                    self.assertTrue((detected[fault] >> i) & 1, fault)
+
+if __name__ == "__main__":
+    unittest.main()
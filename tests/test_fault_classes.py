@@ -0,0 +1,83 @@
+from ATG_SSF.circuit_gen import random_dag
+from ATG_SSF.helpers.proc_netlist import process_netlist
+from ATG_SSF.helpers.fault_collapse import Faults
+from ATG_SSF.helpers.fault_list import Status
+from ATG_SSF.helpers.fault_sim import FaultSim
+from ATG_SSF.pipeline import run_atpg
+import contextlib
+import glob
+import io
+import itertools
+import os
+import tempfile
+import unittest
+
+# Dominance may drop a class only while a fault it relies on is testable - the final vectors must detect
+# every testable fault of the universe, whatever was collapsed
+
+BENCHMARKS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "*.ckt*")))
+T6_24 = next(b for b in BENCHMARKS if "t6_24" in b)
+
+def load(fname: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        gates, graph, circuit = process_netlist(fname)
+        faults = Faults(gates, graph, circuit = circuit)
+        faults.collapse()
+    return gates, graph, circuit, faults
+
+def random_circuit(seed: int):
+    with tempfile.NamedTemporaryFile("w", suffix = ".ckt", delete = False) as f:
+        random_dag(f, 40, pis = 7, seed = seed)
+    try:
+        return load(f.name)
+    finally:
+        os.unlink(f.name)
+
+def testable(circuit, universe):
+    fsim = FaultSim(circuit, universe)
+    fsim.run([list(v) for v in itertools.product((0, 1), repeat = len(circuit.pis))])
+    return {f for f in universe if fsim.detected[f]}
+
+class DominanceTests(unittest.TestCase):
+    def test_single_stem_gate_not_dominated(self):
+        # 8gat nand 5gat 5gat - both input s-a-1 faults are redundant, so 8gat s-a-0 must stay targeted
+        _, _, cc, faults = load(T6_24)
+        classes = faults.classes
+        for gate in ("7gat", "8gat", "9gat"):
+            self.assertFalse(classes.dominates(cc.index[gate]))
+            self.assertTrue(classes.is_target(classes.parent[classes.fault_id((gate, 0))]))
+        self.assertTrue(classes.dominates(cc.index["12gat"]))
+
+    def test_undominate(self):
+        _, _, cc, faults = load(T6_24)
+        classes, flist = faults.classes, faults.flist
+        g = cc.index["12gat"]
+        out = classes.parent[2 * g]
+        self.assertTrue(classes.dropped[out])
+        n_targets = flist.n_targets
+        # 2gat s-a-1 feeds 12gat (nand, c = 0) - were it redundant, 12gat s-a-0 could no longer ride on it
+        freed = flist.undominate(classes.fault_id(("2gat->12gat", 1)))
+        self.assertIn(out, freed)
+        self.assertFalse(classes.dropped[out])
+        self.assertEqual(flist.get(out), Status.UNDETECTED)
+        self.assertEqual(flist.n_targets, n_targets + len(freed))
+        self.assertIn(out, list(flist.targets()))
+        flist.reset()
+        self.assertEqual(flist.get(out), Status.UNDETECTED)
+        self.assertEqual(flist.undominate(classes.fault_id(("2gat->12gat", 1))), [])
+
+    def test_compacted_vectors_detect_every_testable_fault(self):
+        for seed in range(20):
+            for engine in ("dalg", "podem"):
+                with self.subTest(seed = seed, engine = engine):
+                    gates, graph, cc, faults = random_circuit(seed)
+                    universe = [faults.classes.fault(f) for f in range(faults.classes.size)]
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        res = run_atpg(gates, graph, faults, cc, engine, {"compact": True, "drop": True})
+                    fsim = FaultSim(cc, universe)
+                    fsim.run([[int(v) for v in vec] for vec in res["vectors"]])
+                    missed = testable(cc, universe) - {f for f in universe if fsim.detected[f]}
+                    self.assertEqual(missed, set())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+from ATG_SSF.helpers.proc_netlist import process_netlist
+from ATG_SSF.helpers.fault_collapse import Faults
+from ATG_SSF.helpers.fault_list import FaultList, Status
+from ATG_SSF.helpers.gen_d_algo import DAlgorithm
+import contextlib
+import glob
+import io
+import os
+import unittest
+
+# The shared fault list keeps one status byte per fault, and the name-keyed views are built from it
+
+BENCHMARKS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "*.ckt*")))
+
+def load(fname: str, collapse: bool = True):
+    with contextlib.redirect_stdout(io.StringIO()):
+        gates, graph, circuit = process_netlist(fname)
+        faults = Faults(gates, graph, circuit = circuit)
+        if collapse: faults.collapse()
+    return gates, graph, circuit, faults
+
+class FaultListStatusTests(unittest.TestCase):
+    def setUp(self):
+        self.gates, self.graph, self.cc, self.faults = load(BENCHMARKS[0])
+        self.flist: FaultList = self.faults.flist
+
+    def test_initial_status(self):
+        flist, classes = self.flist, self.faults.classes
+        self.assertEqual(len(flist), classes.size)
+        for f in range(len(flist)):
+            self.assertEqual(flist.get(f), Status.UNDETECTED if classes.is_target(f) else Status.COLLAPSED)
+        self.assertEqual(flist.n_targets, flist.count(Status.UNDETECTED))
+        self.assertEqual(list(flist.targets()), list(flist.undetected()))
+
+    def test_transitions(self):
+        flist = self.flist
+        targets = list(flist.targets())
+        self.assertGreaterEqual(len(targets), 3)
+        detected, redundant, aborted = targets[:3]
+        flist.set(detected, Status.DETECTED)
+        flist.set(redundant, Status.REDUNDANT)
+        flist.set(aborted, Status.ABORTED)
+        self.assertEqual(list(flist.ids(Status.DETECTED)), [detected])
+        self.assertEqual(list(flist.ids(Status.REDUNDANT)), [redundant])
+        self.assertEqual(list(flist.ids(Status.ABORTED)), [aborted])
+        self.assertEqual(list(flist.undetected()), targets[3:])
+        self.assertEqual(list(flist.ids(Status.DETECTED, Status.ABORTED)), sorted((detected, aborted)))
+        counts = flist.summary()
+        self.assertEqual((counts["detected"], counts["redundant"], counts["aborted"]), (1, 1, 1))
+        self.assertEqual(counts["undetected"], len(targets) - 3)
+        self.assertEqual(counts["collapsed"], len(flist) - len(targets))
+        # An aborted fault goes back to UNDETECTED for a retry, and reset() restores every targeted fault
+        flist.set(aborted, Status.UNDETECTED)
+        self.assertIn(aborted, list(flist.undetected()))
+        flist.reset()
+        self.assertEqual(list(flist.undetected()), targets)
+        self.assertEqual(flist.count(Status.COLLAPSED), len(flist) - len(targets))
+
+    def test_ids_while_changing_status(self):
+        flist = self.flist
+        seen = []
+        for f in flist.undetected():
+            seen.append(f)
+            flist.set(f, Status.DETECTED)
+        self.assertEqual(seen, list(flist.targets()))
+        self.assertEqual(flist.count(Status.UNDETECTED), 0)
+
+    def test_masks(self):
+        flist = self.flist
+        targets = list(flist.targets())
+        flist.set(targets[0], Status.DETECTED)
+        flist.set(targets[1], Status.ABORTED)
+        done = flist.mask(Status.DETECTED)
+        open_ = flist.mask(Status.UNDETECTED, Status.ABORTED)
+        self.assertEqual(FaultList.mask_ids(FaultList.or_(done, open_)), targets)
+        self.assertEqual(FaultList.mask_ids(FaultList.and_(done, open_)), [])
+        self.assertEqual(FaultList.mask_ids(FaultList.minus(open_, flist.mask(Status.ABORTED))), targets[2:])
+
+    def test_engine_files_every_target(self):
+        # After a run, every targeted fault is detected, redundant or aborted, and collapsed faults are untouched
+        engine = DAlgorithm(self.gates, self.graph, self.faults, circuit = self.cc)
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.solve()
+        flist = self.flist
+        self.assertEqual(flist.count(Status.UNDETECTED), 0)
+        self.assertEqual(flist.count(Status.COLLAPSED), len(flist) - flist.n_targets)
+        self.assertEqual(len(engine.solutions), flist.count(Status.DETECTED))
+
+    def test_drop_keeps_redundant(self):
+        # Dropping only flips undetected and aborted faults - a redundant fault a vector detects is reported, not changed
+        solver = DAlgorithm(self.gates, self.graph, self.faults, circuit = self.cc)
+        with contextlib.redirect_stdout(io.StringIO()):
+            solutions = dict(solver.solve())
+        fault, assignment = next(iter(solutions.items()))
+        engine = DAlgorithm(self.gates, self.graph, self.faults, circuit = self.cc, debug = True)
+        flist = self.flist
+        f = flist.fault_id(fault)
+        flist.set(f, Status.REDUNDANT)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            dropped = engine.drop_detected(("other", 0), assignment)
+        self.assertNotIn(fault, dropped)
+        self.assertEqual(flist.get(f), Status.REDUNDANT)
+        self.assertIn(f"{fault} was marked redundant", out.getvalue())
+        for g in flist.ids(Status.DETECTED):
+            self.assertIn(flist.fault(g), dropped)
+
+class FaultListViewTests(unittest.TestCase):
+    def test_uncollapsed_view(self):
+        gates, _, _, faults = load(BENCHMARKS[0], collapse = False)
+        self.assertEqual(faults.fault_list, {k: [0, 1] for k in gates})
+        self.assertEqual(faults.undetectable_faults, {k: [] for k in gates})
+
+    def test_view_matches_classes(self):
+        # The dicts Faults.collapse used to build - every line of the universe, stems first, then branches
+        for fname in BENCHMARKS:
+            with self.subTest(fname = os.path.basename(fname)):
+                _, _, cc, faults = load(fname)
+                fc = faults.classes
+                expect_list, expect_undet = {}, {}
+                for site in range(fc.n_sites):
+                    line = fc.line_name(site)
+                    expect_list[line] = [v for v in (0, 1) if fc.is_target(2 * site + v)]
+                    expect_undet[line] = [v for v in (0, 1) if not fc.is_target(2 * site + v)]
+                self.assertEqual(list(faults.fault_list.items()), list(expect_list.items()))
+                self.assertEqual(list(faults.undetectable_faults.items()), list(expect_undet.items()))
+                self.assertEqual(sum(len(v) for v in faults.fault_list.values()), faults.flist.n_targets)
+                self.assertEqual(list(faults.fault_list)[:cc.n], cc.names)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+from ATG_SSF.helpers.proc_netlist import process_netlist
+from ATG_SSF.helpers.fault_collapse import Faults
+from ATG_SSF.helpers.fault_classes import parse_branch
+from ATG_SSF.helpers.fault_sim import FaultSim
+from ATG_SSF.helpers.fault_list import Status
+from ATG_SSF.helpers.parallel_sim import ParallelSim
+from ATG_SSF.helpers.circuit import Op
+import contextlib
+import glob
+import io
+import itertools
+import os
+import random
+import unittest
+from unittest import mock
+
+# PPSFP fault simulation must agree with plain serial simulation of one fault and one vector at a time
+
+BENCHMARKS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "*.ckt*")))
+
+def load(fname: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        gates, graph, circuit = process_netlist(fname)
+        faults = Faults(gates, graph, circuit = circuit)
+        faults.collapse()
+    return circuit, faults
+
+def vectors_for(cc, limit: int = 256):
+    n = len(cc.pis)
+    if 2 ** n <= limit:
+        return [list(vec) for vec in itertools.product((0, 1), repeat = n)]
+    rng = random.Random(0)
+    return [[rng.randint(0, 1) for _ in range(n)] for _ in range(limit)]
+
+def serial_outputs(cc, vec, fault = None):
+    """
+    PO values for one vector, with at most one stuck-at fault on a stem or a 'stem->gate' branch
+    """
+    stem = branch = None
+    if fault is not None:
+        line, stuck = fault
+        if line in cc.index:
+            stem = cc.index[line]
+        else:
+            branch = parse_branch(cc, line)
+    vals = [0] * cc.n
+    for k, pi in enumerate(cc.pis):
+        vals[pi] = vec[k]
+    for g in range(cc.n):
+        op = cc.ops[g]
+        if op != Op.PI:
+            ins = [vals[x] for x in cc.fanins(g)]
+            if branch is not None and branch[1] == g:
+                ins[branch[2]] = stuck
+            if op in (Op.AND, Op.NAND):
+                v = int(all(ins))
+            elif op in (Op.OR, Op.NOR):
+                v = int(any(ins))
+            else:
+                v = sum(ins) & 1
+            vals[g] = v ^ (op in (Op.NAND, Op.NOR))
+        if g == stem:
+            vals[g] = stuck
+    return [vals[po] for po in cc.pos]
+
+class ParallelSimTests(unittest.TestCase):
+    def test_matches_serial(self):
+        for fname in BENCHMARKS:
+            with self.subTest(fname = os.path.basename(fname)):
+                cc, _ = load(fname)
+                vecs = vectors_for(cc)
+                # A word size that does not divide the vector count exercises the partial last word
+                psim = ParallelSim(cc, word_size = 7)
+                self.assertEqual(psim.simulate(vecs), [serial_outputs(cc, vec) for vec in vecs])
+
+class FaultSimTests(unittest.TestCase):
+    def universe(self, faults):
+        # Every stem and branch fault, collapsed or not
+        flist = faults.flist
+        return [flist.fault(f) for f in range(len(flist))]
+
+    def expected(self, cc, vecs, fault):
+        good = [serial_outputs(cc, vec) for vec in vecs]
+        return [k for k, vec in enumerate(vecs) if serial_outputs(cc, vec, fault) != good[k]]
+
+    def test_matches_serial(self):
+        branches = 0
+        for fname in BENCHMARKS:
+            cc, faults = load(fname)
+            vecs = vectors_for(cc)
+            universe = self.universe(faults)
+            branches += sum(1 for line, _ in universe if line not in cc.index)
+            fsim = FaultSim(cc, universe, word_size = 16)
+            fsim.run(vecs)
+            detected = fsim.detected
+            for fault in universe:
+                with self.subTest(fname = os.path.basename(fname), fault = fault):
+                    patterns = [k for k in range(len(vecs)) if (detected[fault] >> k) & 1]
+                    self.assertEqual(patterns, self.expected(cc, vecs, fault))
+        self.assertGreater(branches, 0)
+
+    def test_drop_keeps_first_detection(self):
+        for fname in BENCHMARKS:
+            cc, faults = load(fname)
+            vecs = vectors_for(cc)
+            universe = self.universe(faults)
+            fsim = FaultSim(cc, universe, word_size = 16)
+            fsim.run(vecs, drop = True)
+            for fault in universe:
+                with self.subTest(fname = os.path.basename(fname), fault = fault):
+                    hits = self.expected(cc, vecs, fault)
+                    self.assertEqual(fsim.first_detection(fault), hits[0] if hits else None)
+                    # Once detected, later words are skipped - no detection past the first word that had one
+                    if hits:
+                        self.assertEqual(fsim.detected[fault] >> ((hits[0] // 16 + 1) * 16), 0)
+
+    def test_collapsed_list_coverage(self):
+        # A fault list given as Faults simulates the targeted representatives only
+        for fname in BENCHMARKS:
+            with self.subTest(fname = os.path.basename(fname)):
+                cc, faults = load(fname)
+                fsim = FaultSim(cc, faults)
+                self.assertEqual(len(fsim.faults), faults.flist.n_targets)
+                vecs = vectors_for(cc)
+                fsim.run(vecs)
+                self.assertEqual(fsim.undetected(), [f for f in fsim.faults if not self.expected(cc, vecs, f)])
+
+class FaultListSimTests(unittest.TestCase):
+    def test_ids_match_names(self):
+        # A FaultList is simulated by id - located without parsing a branch name - with the same results as by name
+        for fname in BENCHMARKS:
+            with self.subTest(fname = os.path.basename(fname)):
+                cc, faults = load(fname)
+                flist, vecs = faults.flist, vectors_for(cc)
+                universe = list(range(len(flist)))
+                with mock.patch("ATG_SSF.helpers.fault_sim.parse_branch", side_effect = AssertionError("name parsed")):
+                    by_id = FaultSim(cc, flist, word_size = 16, ids = universe)
+                    words = by_id.run(vecs)
+                self.assertEqual(by_id.ids, universe)
+                by_name = FaultSim(cc, [flist.fault(f) for f in universe], word_size = 16)
+                self.assertEqual(words, by_name.run(vecs))
+                self.assertEqual(by_id.detected_ids(), [f for f, word in zip(universe, words) if word])
+                self.assertEqual(by_id.detected, by_name.detected)
+
+    def test_mark_detected(self):
+        cc, faults = load(BENCHMARKS[0])
+        flist, vecs = faults.flist, vectors_for(cc)
+        fsim = FaultSim(cc, faults)
+        self.assertEqual(fsim.ids, list(flist.targets()))
+        fsim.run(vecs)
+        hit = fsim.detected_ids()
+        self.assertGreaterEqual(len(hit), 3)
+        redundant, aborted, done = hit[:3]
+        flist.set(redundant, Status.REDUNDANT)
+        flist.set(aborted, Status.ABORTED)
+        flist.set(done, Status.DETECTED)
+        self.assertEqual(fsim.mark_detected(), [f for f in hit if f not in (redundant, done)])
+        self.assertEqual(flist.get(redundant), Status.REDUNDANT)
+        self.assertEqual(flist.get(aborted), Status.DETECTED)
+        self.assertEqual(list(flist.ids(Status.DETECTED)), [f for f in hit if f != redundant])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+from ATG_SSF.circuit_gen import random_dag
+from ATG_SSF.helpers.proc_netlist import process_netlist
+from ATG_SSF.helpers.fault_collapse import Faults
+from ATG_SSF.helpers.parallel_sim import ParallelSim, pack_vectors
+from ATG_SSF.helpers.gen_podem import PODEM
+from ATG_SSF.helpers import learning
+import contextlib
+import glob
+import io
+import itertools
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+# Every learned implication and constant must hold for every input vector of the fault-free circuit
+
+BENCHMARKS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "*.ckt*")))
+
+def random_circuit(seed: int):
+    with tempfile.NamedTemporaryFile("w", suffix = ".ckt", delete = False) as f:
+        random_dag(f, 60, pis = 8, seed = seed)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return process_netlist(f.name)
+    finally:
+        os.unlink(f.name)
+
+def exhaustive(cc):
+    vecs = list(itertools.product((0, 1), repeat = len(cc.pis)))
+    mask = (1 << len(vecs)) - 1
+    return ParallelSim(cc, word_size = len(vecs)).eval_words(pack_vectors(vecs, len(cc.pis)), mask), mask
+
+class StaticLearningTests(unittest.TestCase):
+    def check(self, cc):
+        sl = learning.StaticLearning(cc)
+        sl.run()
+        words, mask = exhaustive(cc)
+        on = lambda g, v: words[g] if v else words[g] ^ mask
+        for g, v in sl.constants.items():
+            self.assertEqual(on(g, v), mask, f"{cc.names[g]} is not constant {v}")
+        for key, imps in enumerate(sl.index):
+            a, x = key // 2, key % 2
+            for b, y in imps:
+                # Every vector setting a = x sets b = y
+                self.assertEqual(on(a, x) & ~on(b, y), 0, f"{cc.names[a]}={x} -/-> {cc.names[b]}={y}")
+            self.assertLessEqual(len(imps), learning.MAX_LEARNED)
+        return sl
+
+    def test_benchmarks(self):
+        learned = 0
+        for fname in BENCHMARKS:
+            with self.subTest(fname = os.path.basename(fname)):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    _, _, cc = process_netlist(fname)
+                learned += self.check(cc).learned
+        self.assertGreater(learned, 0)
+
+    def test_random_circuits(self):
+        for seed in range(6):
+            with self.subTest(seed = seed):
+                self.check(random_circuit(seed)[2])
+
+    def test_cap(self):
+        _, _, cc = random_circuit(3)
+        full = learning.StaticLearning(cc)
+        full.run()
+        with mock.patch.object(learning, "MAX_LEARNED", 2):
+            capped = self.check(cc)
+        self.assertLess(capped.learned, full.learned)
+        for key, imps in enumerate(capped.index):
+            self.assertTrue(set(imps) <= set(full.index[key]))
+
+class PodemLearnTests(unittest.TestCase):
+    def test_learn_rejected(self):
+        gates, graph, cc = random_circuit(0)
+        faults = Faults(gates, graph, circuit = cc)
+        faults.collapse()
+        with self.assertRaisesRegex(ValueError, "Static learning needs the D-Algorithm"):
+            PODEM(gates, graph, faults, circuit = cc, learn = True)
+        PODEM(gates, graph, faults, circuit = cc, learn = False)
+
+if __name__ == "__main__":
+    unittest.main()
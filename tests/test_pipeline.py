@@ -0,0 +1,63 @@
+from ATG_SSF.pipeline import run_pipeline
+import contextlib
+import glob
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# The headless pipeline runs each stage for real, and gives the same results whether or not the cache is used
+
+BENCHMARKS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "*.ckt*")))
+
+def run(fname: str, **kwargs):
+    with contextlib.redirect_stderr(io.StringIO()):
+        return run_pipeline(fname, **kwargs)
+
+class PipelineTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        patcher = mock.patch("ATG_SSF.helpers.circuit_cache.CACHE_DIR", self.dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def test_collapse_stage_collapses(self):
+        res = run(BENCHMARKS[0], stages = ("collapse",), use_cache = False)
+        self.assertFalse(res["collapse"]["cached"])
+        self.assertGreater(res["collapse"]["fault_count"], 0)
+
+    def test_collapse_stage_skipped(self):
+        res = run(BENCHMARKS[0], stages = ("parse",), use_cache = False)
+        self.assertNotIn("collapse", res)
+        self.assertNotIn("collapse", res["timing"])
+
+    def test_cache_hit_matches_fresh_run(self):
+        for fname in BENCHMARKS:
+            with self.subTest(fname = os.path.basename(fname)):
+                fresh = run(fname, use_cache = False)
+                first = run(fname)
+                second = run(fname)
+                self.assertFalse(first["collapse"]["cached"])
+                self.assertTrue(second["collapse"]["cached"])
+                for res in (first, second):
+                    for stage in ("parse", "atpg", "simulate"):
+                        self.assertEqual(res[stage], fresh[stage], stage)
+                    self.assertEqual({k: v for k, v in res["collapse"].items() if k != "cached"},
+                                     {k: v for k, v in fresh["collapse"].items() if k != "cached"})
+
+    def test_compaction_keeps_universe_coverage(self):
+        # t6_24's single-stem nand gates once had their testable output faults dominated away, lost by compaction
+        fname = next(b for b in BENCHMARKS if "t6_24" in b)
+        full = run(fname, use_cache = False)["simulate"]["universe_coverage"]
+        self.assertEqual(full, 0.925)
+        for options in ({"random_patterns": True, "compact": True}, {"drop": True, "compact": True}):
+            for engine in ("dalg", "podem"):
+                with self.subTest(engine = engine, **options):
+                    res = run(fname, engine = engine, atpg_options = options)
+                    self.assertEqual(res["simulate"]["universe_coverage"], full)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+from ATG_SSF.helpers.proc_netlist import read_netlist, decomp_file, process_netlist
+import contextlib
+import glob
+import io
+import os
+import tempfile
+import unittest
+
+# The netlist reader streams through a memory map, reports bad lines by number and names combinational cycles
+
+BENCHMARKS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "*.ckt*")))
+
+def write(text: str) -> str:
+    with tempfile.NamedTemporaryFile("w", suffix = ".ckt", delete = False, newline = "") as f:
+        f.write(text)
+    return f.name
+
+def parse(lines):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        gates = decomp_file(lines)
+    return gates, out.getvalue()
+
+class ReadNetlistTests(unittest.TestCase):
+    def test_matches_text_read(self):
+        for fname in BENCHMARKS:
+            with self.subTest(fname = os.path.basename(fname)):
+                with open(fname, "r", newline = "") as f:
+                    self.assertEqual(list(read_netlist(fname)), f.readlines())
+
+    def test_no_trailing_newline_and_crlf(self):
+        fname = write("$ comment\r\nz and a b\r\ny or z c")
+        try:
+            self.assertEqual(list(read_netlist(fname)), ["$ comment\r\n", "z and a b\r\n", "y or z c"])
+            gates, _ = parse(read_netlist(fname))
+            self.assertEqual(gates["y"]["inputs"], ["z", "c"])
+        finally:
+            os.unlink(fname)
+
+    def test_empty_file(self):
+        fname = write("")
+        try:
+            self.assertEqual(list(read_netlist(fname)), [])
+            with self.assertRaisesRegex(ValueError, "No gates found"):
+                process_netlist(fname)
+        finally:
+            os.unlink(fname)
+
+    def test_stream_and_lines_agree(self):
+        for fname in BENCHMARKS:
+            with self.subTest(fname = os.path.basename(fname)):
+                with open(fname) as f:
+                    lines = f.read().splitlines()
+                self.assertEqual(parse(read_netlist(fname))[0], parse(lines)[0])
+
+class DecompFileTests(unittest.TestCase):
+    def test_short_line_warns_with_line_number(self):
+        gates, out = parse(["$ header", "z and a b", "w not z", "y or z c"])
+        self.assertIn("Line 3: skipping 'w not z'", out)
+        self.assertNotIn("w", gates)
+        self.assertEqual(set(gates), {"a", "b", "c", "z", "y"})
+
+    def test_unsupported_type_names_line(self):
+        with self.assertRaisesRegex(ValueError, r"^Line 2: unsupported gate type 'buf' for gate 'y'\."):
+            parse(["z and a b", "y buf z c"])
+
+    def test_pi_type_rejected(self):
+        with self.assertRaisesRegex(ValueError, r"^Line 1: unsupported gate type 'pi'"):
+            parse(["z pi a b"])
+
+    def test_duplicate_gate_names_line(self):
+        with self.assertRaisesRegex(ValueError, r"^Line 4: gate 'z' is defined more than once\."):
+            parse(["z and a b", "", "y or z c", "z nor a c"])
+
+    def test_two_gate_cycle(self):
+        with self.assertRaisesRegex(ValueError, r"^Combinational cycle through gates: y -> x -> y\.$"):
+            parse(["x and a y", "y and b x"])
+
+    def test_cycle_behind_acyclic_logic(self):
+        # Gates fed by the loop are unleveled too, but only the loop itself is named
+        with self.assertRaises(ValueError) as ctx:
+            parse(["p and a b", "q or p r", "r nand q c", "s xor r a"])
+        msg = str(ctx.exception)
+        path = msg.split(": ", 1)[1].rstrip(".").split(" -> ")
+        self.assertEqual(path[0], path[-1])
+        self.assertEqual(set(path), {"q", "r"})
+
+    def test_levels(self):
+        gates, _ = parse(["z and a b", "y or z c", "x xor y z"])
+        self.assertEqual({g: info["level"] for g, info in gates.items()}, {"a": 0, "b": 0, "c": 0, "z": 1, "y": 2, "x": 3})
+        # Sorted by level, so every input precedes the gates it feeds
+        order = list(gates)
+        for g, info in gates.items():
+            self.assertTrue(all(order.index(inp) < order.index(g) for inp in info["inputs"]))
+
+    def test_deep_chain_does_not_recurse(self):
+        lines = ["n0 and a b"] + [f"n{k} and n{k - 1} a" for k in range(1, 20000)]
+        gates, _ = parse(lines)
+        self.assertEqual(gates["n19999"]["level"], 20000)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+from ATG_SSF.server import CircuitServer
+import asyncio
+import contextlib
+import glob
+import io
+import json
+import os
+import unittest
+
+# Requests go over a real localhost connection; vectors arrive as data only, never as a path to read
+
+BENCHMARKS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "*.ckt*")))
+
+class ServerTests(unittest.TestCase):
+    def exchange(self, *requests):
+        async def session():
+            server = CircuitServer(use_cache = False)
+            server.load(BENCHMARKS[0], "c")
+            task = asyncio.create_task(server.serve(port = 0))
+            while server.server is None or not server.server.sockets:
+                await asyncio.sleep(0.01)
+            host, port = server.server.sockets[0].getsockname()[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+            replies = []
+            for req in requests + ({"op": "shutdown"},):
+                writer.write(json.dumps(req).encode("utf-8") + b"\n")
+                await writer.drain()
+                replies.append(json.loads(await reader.readline()))
+            writer.close()
+            await task
+            return replies[:-1]
+        with contextlib.redirect_stdout(io.StringIO()):
+            return asyncio.run(session())
+
+    def test_vectors_as_bit_strings(self):
+        info, = self.exchange({"op": "info"})
+        n = len(info["result"]["pis"])
+        sim, fsim = self.exchange({"id": 1, "op": "simulate", "vectors": ["0" * n, "1" * n]},
+                                  {"id": 2, "op": "faultsim", "vectors": ["0" * n, "1" * n]})
+        self.assertTrue(sim["ok"], sim)
+        self.assertEqual(len(sim["result"]["responses"]), 2)
+        self.assertTrue(fsim["ok"], fsim)
+
+    def test_path_rejected(self):
+        for op in ("simulate", "faultsim"):
+            for vectors in (BENCHMARKS[0], [BENCHMARKS[0], [0, 1]], {"f": 1}):
+                with self.subTest(op = op, vectors = vectors):
+                    reply, = self.exchange({"id": 7, "op": op, "vectors": vectors})
+                    self.assertEqual(reply["id"], 7)
+                    self.assertFalse(reply["ok"])
+                    self.assertIn("'vectors' must be a list of bit strings", reply["error"])
+
+if __name__ == "__main__":
+    unittest.main()
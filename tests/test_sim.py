@@ -0,0 +1,72 @@
+from ATG_SSF.helpers.proc_netlist import process_netlist
+from ATG_SSF.helpers.fault_collapse import Faults
+from ATG_SSF.helpers.fault_classes import parse_branch
+from ATG_SSF.helpers.fault_sim import FaultSim
+from ATG_SSF.helpers.event_sim import EventSim
+from ATG_SSF.helpers.sim import Simulate
+import contextlib
+import glob
+import io
+import os
+import random
+import unittest
+
+# Branch faults injected in the interactive simulator must reach the same POs the fault simulator says they do
+
+BENCHMARKS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "*.ckt*")))
+
+def load(fname: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        gates, graph, circuit = process_netlist(fname)
+        faults = Faults(gates, graph, circuit = circuit)
+        faults.collapse()
+    return gates, graph, circuit, faults
+
+def branch_faults(cc, faults):
+    flist = faults.flist
+    return [flist.fault(f) for f in range(len(flist)) if flist.fault(f)[0] not in cc.index]
+
+class BranchFaultTests(unittest.TestCase):
+    def test_event_sim_branch_faults(self):
+        rng = random.Random(0)
+        for fname in BENCHMARKS:
+            gates, graph, cc, faults = load(fname)
+            fsim = FaultSim(cc, branch_faults(cc, faults), word_size = 1)
+            # One engine across every fault - set_faults releases the previous fault incrementally
+            engine = EventSim(cc)
+            for _ in range(8):
+                vec = [rng.randint(0, 1) for _ in cc.pis]
+                engine.set_faults({})
+                engine.apply(pi_changes = dict(zip(cc.pis, vec)))
+                good = [engine.values[po] for po in cc.pos]
+                fsim.run([vec])
+                for line, stuck in fsim.faults:
+                    with self.subTest(fname = os.path.basename(fname), fault = (line, stuck), vec = vec):
+                        stem, g, pos = parse_branch(cc, line)
+                        engine.set_faults({}, {g: {pos: stuck}})
+                        bad = [engine.values[po] for po in cc.pos]
+                        self.assertEqual(bad != good, bool(fsim.detected[(line, stuck)]))
+                        # The stem keeps its fault-free value - only the gate on the branch reads the fault
+                        fresh = EventSim(cc)
+                        fresh.pi_vals.update(zip(cc.pis, vec))
+                        self.assertEqual(engine.values[stem], fresh.full()[stem])
+
+    def test_simulate_branch_fault(self):
+        rng = random.Random(1)
+        checked = 0
+        for fname in BENCHMARKS:
+            gates, graph, cc, faults = load(fname)
+            for line, stuck in branch_faults(cc, faults):
+                vec = {cc.names[pi]: rng.randint(0, 1) for pi in cc.pis}
+                with contextlib.redirect_stdout(io.StringIO()):
+                    sim = Simulate(gates, graph, faults, circuit = cc, inputs = vec, chosen_faults = {line: stuck})
+                diff = {cc.names[po] for po in cc.pos if sim.sim_vals["faulted"][cc.names[po]] != sim.sim_vals["healthy"][cc.names[po]]}
+                fsim = FaultSim(cc, [(line, stuck)], word_size = 1)
+                fsim.run([[vec[cc.names[pi]] for pi in cc.pis]])
+                with self.subTest(fname = os.path.basename(fname), fault = (line, stuck)):
+                    self.assertEqual(bool(diff), bool(fsim.detected[(line, stuck)]))
+                checked += 1
+        self.assertGreater(checked, 0)
+
+if __name__ == "__main__":
+    unittest.main()